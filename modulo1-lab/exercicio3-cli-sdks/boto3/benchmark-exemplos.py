@@ -0,0 +1,868 @@
+#!/usr/bin/env python3
+"""
+Benchmark - DocumentDBManager contra um backend simulado
+Módulo 1 - Conceitos e Consultas (SEM criar recursos)
+
+Executa os métodos públicos do DocumentDBManager (exemplos-basicos.py)
+contra clientes falsos em memória, com frotas sintéticas de 10 a 10.000
+clusters. Mede chamadas à API, tempo, pico de memória e chamadas por
+cluster, e salva os resultados em JSON para comparar com execuções
+anteriores.
+
+Uso:
+    python3 benchmark-exemplos.py --sizes 10,100,1000 --output baseline.json
+    python3 benchmark-exemplos.py --compare baseline.json
+    python3 benchmark-exemplos.py --sizes 10 --record-memory 2000
+    python3 benchmark-exemplos.py --sizes 10 --methods list_clusters --async-speedup
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib.util
+import io
+import json
+import logging
+import os
+import random
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from botocore.exceptions import ClientError
+
+
+def load_exemplos():
+    """
+    Carrega exemplos-basicos.py como módulo (o nome tem hífen)
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'exemplos-basicos.py')
+    spec = importlib.util.spec_from_file_location('exemplos_basicos', path)
+    module = importlib.util.module_from_spec(spec)
+    with contextlib.redirect_stdout(io.StringIO()):
+        spec.loader.exec_module(module)
+    return module
+
+
+# ============================================================================
+# BACKEND SIMULADO
+# ============================================================================
+
+class FakeBackend:
+    """
+    Frota sintética de DocumentDB/CloudWatch em memória
+    Conta as chamadas por operação e simula latência, tamanho de página
+    e throttling
+    """
+
+    def __init__(self, clusters=10, instances_per_cluster=2, snapshots_per_cluster=3,
+                 events_per_cluster=2, parameter_groups=5, parameters_per_group=30,
+                 latency=0.0, max_page_size=100, throttle_rate=0.0, seed=42,
+                 profiler_lines_per_cluster=2000):
+        """
+        Inicializa o backend
+
+        Args:
+            clusters (int): Quantidade de clusters da frota
+            instances_per_cluster (int): Instâncias por cluster
+            snapshots_per_cluster (int): Snapshots por cluster
+            events_per_cluster (int): Eventos recentes por cluster
+            parameter_groups (int): Parameter groups distintos
+            parameters_per_group (int): Parâmetros por parameter group
+            latency (float): Latência simulada por chamada, em segundos
+            max_page_size (int): Maior página devolvida pelas operações describe_*
+            throttle_rate (float): Probabilidade (0-1) de uma chamada sofrer throttling
+            seed (int): Semente do gerador aleatório
+            profiler_lines_per_cluster (int): Linhas no log group do profiler de
+                                              cada cluster (geradas sob demanda)
+        """
+        self.latency = latency
+        self.max_page_size = max_page_size
+        self.throttle_rate = throttle_rate
+        self.profiler_lines_per_cluster = profiler_lines_per_cluster
+        self.calls = {}
+        self.throttles = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        now = datetime.now(timezone.utc)
+        azs = ['us-east-1a', 'us-east-1b', 'us-east-1c']
+        self.parameter_groups = [
+            {
+                'DBClusterParameterGroupName': f'pg-{g}',
+                'DBParameterGroupFamily': 'docdb5.0',
+                'Description': f'Parameter group {g}'
+            }
+            for g in range(parameter_groups)
+        ]
+        self.parameters = {
+            group['DBClusterParameterGroupName']: [
+                {
+                    'ParameterName': f'param_{p}',
+                    'ParameterValue': 'enabled' if (p + g) % 3 else 'disabled',
+                    'Description': f'Parâmetro {p}',
+                    'IsModifiable': True,
+                    'DataType': 'string',
+                    'AllowedValues': 'enabled,disabled'
+                }
+                for p in range(parameters_per_group)
+            ]
+            for g, group in enumerate(self.parameter_groups)
+        }
+
+        self.clusters, self.instances, self.snapshots, self.events = [], [], [], []
+        for c in range(clusters):
+            cluster_id = f'cluster-{c:05d}'
+            self.clusters.append({
+                'DBClusterIdentifier': cluster_id,
+                'Status': 'available',
+                'Engine': 'docdb',
+                'EngineVersion': '5.0.0',
+                'Endpoint': f'{cluster_id}.cluster-xyz.us-east-1.docdb.amazonaws.com',
+                'ReaderEndpoint': f'{cluster_id}.cluster-ro-xyz.us-east-1.docdb.amazonaws.com',
+                'Port': 27017,
+                'MultiAZ': instances_per_cluster > 1,
+                'BackupRetentionPeriod': 7,
+                'ClusterCreateTime': now - timedelta(days=c % 365),
+                'DBClusterParameterGroup': f'pg-{c % max(parameter_groups, 1)}',
+                'AvailabilityZones': azs,
+                'VpcSecurityGroups': [{'VpcSecurityGroupId': 'sg-123', 'Status': 'active'}],
+                'DBClusterMembers': [
+                    {'DBInstanceIdentifier': f'{cluster_id}-{i}', 'IsClusterWriter': i == 0}
+                    for i in range(instances_per_cluster)
+                ]
+            })
+            for i in range(instances_per_cluster):
+                instance_id = f'{cluster_id}-{i}'
+                self.instances.append({
+                    'DBInstanceIdentifier': instance_id,
+                    'DBInstanceStatus': 'available',
+                    'DBInstanceClass': 'db.r6g.large',
+                    'AvailabilityZone': azs[i % len(azs)],
+                    'DBClusterIdentifier': cluster_id,
+                    'Endpoint': {'Address': f'{instance_id}.xyz.us-east-1.docdb.amazonaws.com', 'Port': 27017},
+                    'PromotionTier': i,
+                    'InstanceCreateTime': now - timedelta(days=c % 365)
+                })
+            for s in range(snapshots_per_cluster):
+                self.snapshots.append({
+                    'DBClusterSnapshotIdentifier': f'{cluster_id}-snap-{s}',
+                    'DBClusterIdentifier': cluster_id,
+                    'Status': 'available',
+                    'SnapshotType': 'manual' if s == 0 else 'automated',
+                    'SnapshotCreateTime': now - timedelta(days=s),
+                    'AllocatedStorage': 10 + s,
+                    'Engine': 'docdb',
+                    'EngineVersion': '5.0.0'
+                })
+            for e in range(events_per_cluster):
+                self.events.append({
+                    'SourceIdentifier': cluster_id,
+                    'SourceType': 'db-cluster',
+                    'Message': f'Evento {e} do cluster',
+                    'EventCategories': ['notification'],
+                    'Date': now - timedelta(minutes=30 * (events_per_cluster - e))
+                })
+
+    def session(self):
+        """
+        Sessão falsa para passar como DocumentDBManager(session=...)
+        """
+        return FakeSession(self)
+
+    def reset_counters(self):
+        with self._lock:
+            self.calls = {}
+            self.throttles = 0
+
+    @property
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    def record(self, operation):
+        """
+        Registra a chamada, aplica a latência e eventualmente simula throttling
+        """
+        with self._lock:
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+            throttled = self._random.random() < self.throttle_rate
+            if throttled:
+                self.throttles += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if throttled:
+            raise ClientError({'Error': {'Code': 'Throttling', 'Message': 'Rate exceeded'}}, operation)
+
+    def page(self, items, params, token_key='Marker'):
+        """
+        Devolve uma página de itens no formato das APIs describe_*
+        """
+        size = min(params.get('MaxRecords', 100), self.max_page_size)
+        offset = int(params.get(token_key) or 0)
+        response = {'items': items[offset:offset + size]}
+        if offset + size < len(items):
+            response[token_key] = str(offset + size)
+        return response
+
+
+class FakeSession:
+    """
+    Substitui boto3.Session criando clientes falsos
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def client(self, service_name, region_name=None, config=None, **kwargs):
+        return FakeClient(self.backend, service_name)
+
+
+class FakeClient:
+    """
+    Cliente falso com as operações usadas pelo DocumentDBManager
+    """
+
+    def __init__(self, backend, service_name):
+        self.backend = backend
+        self.service_name = service_name
+
+    def _page(self, operation, result_key, items, params):
+        self.backend.record(operation)
+        page = self.backend.page(items, params)
+        page[result_key] = page.pop('items')
+        return page
+
+    @staticmethod
+    def _filter_values(params, name):
+        for item in params.get('Filters', []):
+            if item['Name'] == name:
+                return set(item['Values'])
+        return None
+
+    def describe_db_clusters(self, **params):
+        clusters = self.backend.clusters
+        if 'DBClusterIdentifier' in params:
+            clusters = [c for c in clusters if c['DBClusterIdentifier'] == params['DBClusterIdentifier']]
+            if not clusters:
+                self.backend.record('DescribeDBClusters')
+                raise ClientError({'Error': {'Code': 'DBClusterNotFoundFault', 'Message': 'Not found'}},
+                                  'DescribeDBClusters')
+        ids = self._filter_values(params, 'db-cluster-id')
+        if ids is not None:
+            clusters = [c for c in clusters if c['DBClusterIdentifier'] in ids]
+        return self._page('DescribeDBClusters', 'DBClusters', clusters, params)
+
+    def describe_db_instances(self, **params):
+        instances = self.backend.instances
+        ids = self._filter_values(params, 'db-cluster-id')
+        if ids is not None:
+            instances = [i for i in instances if i['DBClusterIdentifier'] in ids]
+        ids = self._filter_values(params, 'db-instance-id')
+        if ids is not None:
+            instances = [i for i in instances if i['DBInstanceIdentifier'] in ids]
+        return self._page('DescribeDBInstances', 'DBInstances', instances, params)
+
+    def describe_db_cluster_snapshots(self, **params):
+        snapshots = self.backend.snapshots
+        if 'DBClusterSnapshotIdentifier' in params:
+            snapshots = [s for s in snapshots
+                         if s['DBClusterSnapshotIdentifier'] == params['DBClusterSnapshotIdentifier']]
+            if not snapshots:
+                self.backend.record('DescribeDBClusterSnapshots')
+                raise ClientError({'Error': {'Code': 'DBClusterSnapshotNotFoundFault', 'Message': 'Not found'}},
+                                  'DescribeDBClusterSnapshots')
+        if 'DBClusterIdentifier' in params:
+            snapshots = [s for s in snapshots if s['DBClusterIdentifier'] == params['DBClusterIdentifier']]
+        if 'SnapshotType' in params:
+            snapshots = [s for s in snapshots if s['SnapshotType'] == params['SnapshotType']]
+        ids = self._filter_values(params, 'db-cluster-id')
+        if ids is not None:
+            snapshots = [s for s in snapshots if s['DBClusterIdentifier'] in ids]
+        return self._page('DescribeDBClusterSnapshots', 'DBClusterSnapshots', snapshots, params)
+
+    def describe_db_cluster_parameter_groups(self, **params):
+        return self._page('DescribeDBClusterParameterGroups', 'DBClusterParameterGroups',
+                          self.backend.parameter_groups, params)
+
+    def describe_db_cluster_parameters(self, **params):
+        parameters = self.backend.parameters.get(params['DBClusterParameterGroupName'], [])
+        return self._page('DescribeDBClusterParameters', 'Parameters', parameters, params)
+
+    def describe_events(self, **params):
+        events = [e for e in self.backend.events if e['SourceType'] == params.get('SourceType', 'db-cluster')]
+        if 'SourceIdentifier' in params:
+            events = [e for e in events if e['SourceIdentifier'] == params['SourceIdentifier']]
+        if 'StartTime' in params:
+            start = params['StartTime']
+            if start.tzinfo is None:
+                start = start.replace(tzinfo=timezone.utc)
+            events = [e for e in events if e['Date'] >= start]
+        return self._page('DescribeEvents', 'Events', events, params)
+
+    @staticmethod
+    def _profiler_message(n):
+        """
+        Linha sintética do profiler: poucos formatos, literais e durações variados
+        """
+        collection = f'loja.pedidos{n % 4}'
+        if n % 3:
+            command = {'find': collection.split('.')[1], 'filter': {'cliente': n, 'status': 'novo'},
+                       'limit': 10, 'lsid': {'id': n}, '$db': 'loja'}
+        else:
+            command = {'aggregate': collection.split('.')[1],
+                       'pipeline': [{'$match': {'valor': {'$gt': n}}}, {'$group': {'_id': '$cliente'}}],
+                       'cursor': {}, '$db': 'loja'}
+        return json.dumps({
+            'op': 'command' if n % 3 == 0 else 'query',
+            'ts': 1700000000000 + n,
+            'ns': collection,
+            'command': command,
+            'millis': 5 + (n * 37) % 500,
+            'docsExamined': (n * 13) % 5000,
+            'nreturned': n % 10,
+            'planSummary': 'COLLSCAN' if n % 4 == 0 else 'IXSCAN'
+        })
+
+    def filter_log_events(self, **params):
+        self.backend.record('FilterLogEvents')
+        total = self.backend.profiler_lines_per_cluster
+        if not params['logGroupName'].endswith('/profiler'):
+            total = 0
+        threshold = None
+        match = re.search(r'\$\.millis\s*>=\s*([\d.]+)', params.get('filterPattern', ''))
+        if match:
+            threshold = float(match.group(1))
+        
+        size = min(params.get('limit', 10000), 1000)
+        offset = int(params.get('nextToken') or 0)
+        events = []
+        for n in range(offset, min(offset + size, total)):
+            if threshold is not None and 5 + (n * 37) % 500 < threshold:
+                continue
+            events.append({'timestamp': 1700000000000 + n, 'message': self._profiler_message(n),
+                           'logStreamName': 'instance-1'})
+        
+        response = {'events': events}
+        if offset + size < total:
+            response['nextToken'] = str(offset + size)
+        return response
+
+    def get_metric_data(self, **params):
+        self.backend.record('GetMetricData')
+        queries = params['MetricDataQueries']
+        start, end = params['StartTime'], params['EndTime']
+        if start.tzinfo is None:
+            start = start.replace(tzinfo=timezone.utc)
+        if end.tzinfo is None:
+            end = end.replace(tzinfo=timezone.utc)
+
+        # Cada página traz no máximo 100 consultas, como um NextToken real
+        offset = int(params.get('NextToken') or 0)
+        results = []
+        for query in queries[offset:offset + 100]:
+            period = query['MetricStat']['Period']
+            # StartTime é inclusivo: o primeiro ponto é o primeiro múltiplo do período
+            first = -(-start.timestamp() // period) * period
+            timestamps = [
+                datetime.fromtimestamp(ts, timezone.utc)
+                for ts in range(int(first), int(end.timestamp()), period)
+            ]
+            base = int(query['Id'].lstrip('q') or 0) % 50
+            results.append({
+                'Id': query['Id'],
+                'Timestamps': timestamps,
+                'Values': [float(base + (n % 10)) for n in range(len(timestamps))],
+                'StatusCode': 'Complete'
+            })
+
+        response = {'MetricDataResults': results}
+        if offset + 100 < len(queries):
+            response['NextToken'] = str(offset + 100)
+        return response
+
+
+@contextlib.contextmanager
+def local_listener():
+    """
+    Servidor TCP local que aceita e fecha conexões, para medir o
+    EndpointProber sem depender de rede
+
+    Yields:
+        tuple: (host, porta)
+    """
+    server = socket.create_server(('127.0.0.1', 0))
+    address = server.getsockname()[:2]
+    stop = threading.Event()
+
+    def accept():
+        while True:
+            connection, _ = server.accept()
+            connection.close()
+            if stop.is_set():
+                return
+
+    thread = threading.Thread(target=accept, daemon=True)
+    thread.start()
+    try:
+        yield address
+    finally:
+        # Uma última conexão desbloqueia o accept
+        stop.set()
+        socket.create_connection(address).close()
+        thread.join()
+        server.close()
+
+
+# ============================================================================
+# EXECUÇÃO DO BENCHMARK
+# ============================================================================
+
+def build_cases(exemplos):
+    """
+    Casos de benchmark: nome -> função(manager, backend)
+    """
+    def first_cluster(backend):
+        return backend.clusters[0]['DBClusterIdentifier']
+
+    def fleet_ids(backend):
+        return [c['DBClusterIdentifier'] for c in backend.clusters]
+
+    def consume(iterator):
+        return sum(1 for _ in iterator)
+
+    def since(hours):
+        return datetime.now(timezone.utc) - timedelta(hours=hours)
+
+    def resource_waiter(manager, backend):
+        waiter = exemplos.ResourceWaiter(manager, sleep=lambda seconds: None)
+        for identifier in fleet_ids(backend):
+            waiter.add('cluster', identifier)
+        for instance in backend.instances:
+            waiter.add('instance', instance['DBInstanceIdentifier'])
+        waiter.run()
+
+    def collection_scheduler(manager, backend):
+        # Relógio simulado: as rodadas seguem sem esperar de verdade
+        now = [0.0]
+
+        def sleep(seconds):
+            now[0] += seconds
+
+        scheduler = exemplos.CollectionScheduler(manager, fleet_ids(backend),
+                                                 clock=lambda: now[0], sleep=sleep)
+        scheduler.run(max_ticks=10)
+
+    def endpoint_prober(manager, backend):
+        with local_listener() as (host, port):
+            endpoints = [dict(instance, endpoint=host, port=port)
+                         for instance in manager.list_instances(first_cluster(backend))]
+            exemplos.EndpointProber(tls=False).probe(endpoints)
+
+    def event_follower(manager, backend):
+        with tempfile.TemporaryDirectory() as directory:
+            follower = exemplos.EventFollower(manager, os.path.join(directory, 'cursors.json'),
+                                              {'db-cluster': None}, initial_hours=24)
+            consume(follower.poll())
+            # Segundo poll: só a sobreposição volta da API, nada é entregue
+            consume(follower.poll())
+
+    def inventory_tracker(manager, backend):
+        with tempfile.TemporaryDirectory() as directory:
+            tracker = exemplos.InventoryTracker(manager, os.path.join(directory, 'inventory.json'))
+            tracker.poll()
+            tracker.poll()
+
+    def inventory_cache(manager, backend):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'inventory.json')
+            exemplos.InventoryCache(manager, path).get('clusters')
+            # Nova inicialização da CLI: responde do disco, sem chamadas
+            exemplos.InventoryCache(manager, path).get('clusters')
+
+    def snapshot_catalog(manager, backend):
+        catalog = exemplos.SnapshotCatalog(manager)
+        catalog.refresh()
+        catalog.latest_per_cluster('manual')
+        catalog.older_than(1, min_storage_gb=11)
+        catalog.storage_totals()
+        catalog.refresh()
+        catalog.close()
+
+    def async_summary(manager, backend):
+        async def run():
+            async with exemplos.AsyncDocumentDBManager(manager=manager) as async_manager:
+                await async_manager.print_cluster_summary(first_cluster(backend))
+        asyncio.run(run())
+
+    return {
+        'list_clusters': lambda m, b: m.list_clusters(),
+        'list_instances': lambda m, b: m.list_instances(),
+        'list_snapshots': lambda m, b: m.list_snapshots(),
+        'list_parameter_groups': lambda m, b: m.list_parameter_groups(),
+        'get_parameter_group_parameters': lambda m, b: m.get_parameter_group_parameters('pg-0'),
+        'get_cluster_details': lambda m, b: m.get_cluster_details(first_cluster(b)),
+        'get_cluster_metrics': lambda m, b: m.get_cluster_metrics(first_cluster(b)),
+        'get_fleet_metrics': lambda m, b: m.get_fleet_metrics(fleet_ids(b)),
+        'check_cluster_events': lambda m, b: m.check_cluster_events(first_cluster(b)),
+        'generate_connection_string': lambda m, b: m.generate_connection_string(first_cluster(b)),
+        'print_cluster_summary': lambda m, b: m.print_cluster_summary(first_cluster(b)),
+        'print_fleet_summary': lambda m, b: m.print_fleet_summary(),
+        'list_instances_by_cluster': lambda m, b: m.list_instances_by_cluster(fleet_ids(b)),
+        'list_snapshots_by_cluster': lambda m, b: m.list_snapshots_by_cluster(fleet_ids(b),
+                                                                               fleet_size=len(b.clusters)),
+        'snapshot_catalog': snapshot_catalog,
+        'parameter_drift': lambda m, b: exemplos.ParameterGroupAuditor(m).refresh(),
+        'fleet_report_ndjson': lambda m, b: exemplos.FleetReportExporter(m).write_ndjson(io.StringIO()),
+        'async_print_cluster_summary': async_summary,
+        'slow_query_analysis': lambda m, b: exemplos.SlowQueryAnalyzer().ingest_log_group(
+            m, first_cluster(b), since(1)),
+        'iter_clusters': lambda m, b: consume(m.iter_clusters()),
+        'iter_instances': lambda m, b: consume(m.iter_instances()),
+        'iter_snapshots': lambda m, b: consume(m.iter_snapshots()),
+        'iter_parameter_groups': lambda m, b: consume(m.iter_parameter_groups()),
+        'iter_events': lambda m, b: consume(m.iter_events('db-cluster', since(24))),
+        'resource_waiter': resource_waiter,
+        'collection_scheduler': collection_scheduler,
+        'endpoint_prober': endpoint_prober,
+        'event_follower': event_follower,
+        'inventory_tracker': inventory_tracker,
+        'inventory_cache': inventory_cache,
+    }
+
+
+def run_case(exemplos, backend, case, measure_memory=True):
+    """
+    Executa um caso com um manager novo (cache frio)
+
+    Returns:
+        dict: Chamadas à API, tempo, pico de memória e chamadas por cluster
+    """
+    def new_manager():
+        # Sem limite de taxa nem esperas longas: mede o trabalho, não o throttling
+        executor = exemplos.RequestExecutor(
+            rate_limits={'docdb': 1e9, 'cloudwatch': 1e9, 'logs': 1e9},
+            base_delay=0.001
+        )
+        return exemplos.DocumentDBManager(session=backend.session(), executor=executor)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        manager = new_manager()
+        backend.reset_counters()
+        start = time.perf_counter()
+        case(manager, backend)
+        wall = time.perf_counter() - start
+        calls = dict(backend.calls)
+        throttles = backend.throttles
+
+        peak = None
+        if measure_memory:
+            # Segunda execução só para memória: o tracemalloc distorce o tempo
+            manager = new_manager()
+            tracemalloc.start()
+            try:
+                case(manager, backend)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+    total_calls = sum(calls.values())
+    return {
+        'api_calls': total_calls,
+        'calls_by_operation': calls,
+        'throttles': throttles,
+        'wall_seconds': round(wall, 6),
+        'peak_kib': round(peak / 1024, 1) if peak is not None else None,
+        'calls_per_cluster': round(total_calls / max(len(backend.clusters), 1), 4)
+    }
+
+
+def run_benchmarks(sizes=(10, 100, 1000), methods=None, measure_memory=True, **backend_options):
+    """
+    Executa todos os casos para cada tamanho de frota
+
+    Args:
+        sizes (tuple): Quantidades de clusters das frotas sintéticas
+        methods (list, optional): Subconjunto de casos a executar
+        measure_memory (bool): Mede o pico de memória (execução extra)
+        **backend_options: Opções do FakeBackend (latency, max_page_size...)
+
+    Returns:
+        dict: Resultados por tamanho de frota e método
+    """
+    exemplos = load_exemplos()
+    cases = build_cases(exemplos)
+    # Mede o trabalho das chamadas, não a formatação das mensagens de andamento
+    exemplos.logger.setLevel(logging.CRITICAL)
+    # Aquece os imports feitos sob demanda (botocore.config) fora das medições
+    with contextlib.redirect_stdout(io.StringIO()):
+        exemplos.DocumentDBManager(session=FakeBackend(clusters=0).session()).docdb_client
+    if methods:
+        cases = {name: cases[name] for name in methods}
+
+    results = {}
+    for size in sizes:
+        backend = FakeBackend(clusters=size, **backend_options)
+        results[str(size)] = {}
+        for name, case in cases.items():
+            results[str(size)][name] = run_case(exemplos, backend, case, measure_memory)
+            result = results[str(size)][name]
+            print(f"  {size:>6} clusters | {name:<32} {result['api_calls']:>6} chamadas "
+                  f"{result['wall_seconds']:>9.4f}s  pico={result['peak_kib']} KiB")
+
+    return {
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'backend': backend_options,
+        'results': results
+    }
+
+
+def _decoded(value):
+    """
+    Cópia de um item bruto com strings novas, como o parser do botocore
+    entrega cada resposta (sem compartilhar os literais do backend)
+    """
+    if isinstance(value, str):
+        return (value + ' ')[:-1]
+    if isinstance(value, dict):
+        return {_decoded(key): _decoded(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decoded(item) for item in value]
+    return value
+
+
+def measure_record_memory(size):
+    """
+    Compara a memória retida pelos dicts de hoje e pelos registros compactos
+    
+    Normaliza os mesmos itens brutos dos dois jeitos e mede, com tracemalloc,
+    o que continua alocado pela lista resultante.
+    
+    Args:
+        size (int): Quantidade de clusters da frota sintética
+        
+    Returns:
+        dict: Por tipo de registro, itens, KiB com dicts, KiB compactos e razão
+    """
+    exemplos = load_exemplos()
+    manager = exemplos.DocumentDBManager
+    backend = FakeBackend(clusters=size, snapshots_per_cluster=30, events_per_cluster=20)
+    kinds = {
+        'cluster': (backend.clusters, manager._normalize_cluster, exemplos.ClusterRecord.from_api),
+        'instance': (backend.instances, manager._normalize_instance, exemplos.InstanceRecord.from_api),
+        'snapshot': (backend.snapshots, manager._normalize_snapshot, exemplos.SnapshotRecord.from_api),
+        'event': (backend.events, manager._normalize_event, exemplos.EventRecord.from_api),
+        'parameter': ([p for params in backend.parameters.values() for p in params],
+                      manager._normalize_parameter, exemplos.ParameterRecord.from_api),
+    }
+
+    def retained(items, normalize):
+        # Conta também as strings e datas que cada formato mantém vivas
+        # depois que a resposta bruta é descartada
+        tracemalloc.start()
+        try:
+            raw = [_decoded(item) for item in items]
+            records = [normalize(item) for item in raw]
+            del raw
+            current = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        del records
+        return current
+
+    results = {}
+    for kind, (items, as_dict, as_record) in kinds.items():
+        dict_bytes = retained(items, as_dict)
+        compact_bytes = retained(items, as_record)
+        results[kind] = {
+            'items': len(items),
+            'dict_kib': round(dict_bytes / 1024, 1),
+            'compact_kib': round(compact_bytes / 1024, 1),
+            'ratio': round(compact_bytes / max(dict_bytes, 1), 3)
+        }
+        print(f"  memória | {kind:<10} {len(items):>8} itens  dict={results[kind]['dict_kib']:>10} KiB  "
+              f"compacto={results[kind]['compact_kib']:>10} KiB  ({results[kind]['ratio']:.0%})")
+    return results
+
+
+COLD_START_SCRIPT = """
+import contextlib, importlib.util, io, json, sys, time
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location('exemplos_basicos', sys.argv[1])
+exemplos = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(exemplos)
+imported = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    manager = exemplos.DocumentDBManager(region_name='us-east-1')
+    if sys.argv[2] == 'fake':
+        spec = importlib.util.spec_from_file_location('benchmark_exemplos', sys.argv[3])
+        benchmark = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(benchmark)
+        manager = exemplos.DocumentDBManager(session=benchmark.FakeBackend(clusters=10).session())
+        manager.list_clusters()
+    else:
+        # Cliente real, sem chamada de rede: mede só a carga do boto3 e do modelo
+        manager.docdb_client
+ready = time.perf_counter()
+print(json.dumps({'import_seconds': imported - start, 'ready_seconds': ready - start}))
+"""
+
+
+def measure_cold_start(runs=5):
+    """
+    Mede a inicialização a frio em processos novos (mediana de várias execuções)
+    
+    Cenários:
+        fake: import + um list_clusters contra o backend simulado
+        boto3_client: import + criação do cliente docdb real (sem rede)
+    
+    Returns:
+        dict: Tempos medianos de import e de prontidão por cenário
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    exemplos_path = os.path.join(here, 'exemplos-basicos.py')
+    benchmark_path = os.path.abspath(__file__)
+    results = {}
+    for scenario in ('fake', 'boto3_client'):
+        samples = []
+        for _ in range(runs):
+            output = subprocess.run(
+                [sys.executable, '-c', COLD_START_SCRIPT, exemplos_path, scenario, benchmark_path],
+                capture_output=True, text=True, check=True,
+                env=dict(os.environ, AWS_DEFAULT_REGION=os.environ.get('AWS_DEFAULT_REGION', 'us-east-1'))
+            ).stdout
+            samples.append(json.loads(output.strip().splitlines()[-1]))
+        results[scenario] = {
+            key: round(statistics.median(sample[key] for sample in samples), 4)
+            for key in ('import_seconds', 'ready_seconds')
+        }
+        print(f"  cold start | {scenario:<14} import={results[scenario]['import_seconds']:.4f}s "
+              f"pronto={results[scenario]['ready_seconds']:.4f}s")
+    return results
+
+
+def measure_async_speedup(latencies=(0.0, 0.02, 0.05), runs=5, clusters=10):
+    """
+    Compara print_cluster_summary síncrono e assíncrono (mediana de várias execuções)
+    
+    O assíncrono busca detalhes, instâncias e métricas ao mesmo tempo, então
+    o ganho cresce com a latência de cada chamada.
+    
+    Args:
+        latencies (tuple): Latências simuladas por chamada, em segundos
+        runs (int): Execuções de cada caso por latência
+        clusters (int): Tamanho da frota sintética
+        
+    Returns:
+        dict: Por latência (ms), medianas síncrona e assíncrona e o ganho
+    """
+    exemplos = load_exemplos()
+    exemplos.logger.setLevel(logging.CRITICAL)
+    cases = build_cases(exemplos)
+    results = {}
+    for latency in latencies:
+        backend = FakeBackend(clusters=clusters, latency=latency)
+        medians = {}
+        for name in ('print_cluster_summary', 'async_print_cluster_summary'):
+            medians[name] = statistics.median(
+                run_case(exemplos, backend, cases[name], measure_memory=False)['wall_seconds']
+                for _ in range(runs)
+            )
+        sync, concurrent = medians['print_cluster_summary'], medians['async_print_cluster_summary']
+        results[str(round(latency * 1000))] = {
+            'sync_seconds': round(sync, 4),
+            'async_seconds': round(concurrent, 4),
+            'speedup': round(sync / concurrent, 2) if concurrent else None
+        }
+        print(f"  sync x async | latência={latency * 1000:>5.0f}ms sync={sync:.4f}s "
+              f"async={concurrent:.4f}s ganho={results[str(round(latency * 1000))]['speedup']}x")
+    return results
+
+
+def compare_baselines(current, previous, tolerance=0.25):
+    """
+    Compara com uma baseline anterior
+
+    Args:
+        current (dict): Resultado de run_benchmarks
+        previous (dict): Baseline carregada do JSON
+        tolerance (float): Aumento relativo de tempo tolerado
+
+    Returns:
+        list: Regressões encontradas (mensagens)
+    """
+    regressions = []
+    for size, methods in current['results'].items():
+        for name, result in methods.items():
+            old = previous.get('results', {}).get(size, {}).get(name)
+            if not old:
+                continue
+            if result['api_calls'] > old['api_calls']:
+                regressions.append(f"{name} ({size} clusters): chamadas {old['api_calls']} -> {result['api_calls']}")
+            # Ignora variações em tempos muito curtos (ruído)
+            if result['wall_seconds'] > max(old['wall_seconds'] * (1 + tolerance), old['wall_seconds'] + 0.005):
+                regressions.append(f"{name} ({size} clusters): tempo {old['wall_seconds']}s -> {result['wall_seconds']}s")
+    for scenario, timings in current.get('cold_start', {}).items():
+        old = previous.get('cold_start', {}).get(scenario)
+        if old and timings['ready_seconds'] > old['ready_seconds'] * (1 + tolerance):
+            regressions.append(f"cold start {scenario}: {old['ready_seconds']}s -> {timings['ready_seconds']}s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do DocumentDBManager com backend simulado')
+    parser.add_argument('--sizes', default='10,100,1000', help='Tamanhos de frota, separados por vírgula')
+    parser.add_argument('--methods', help='Casos a executar, separados por vírgula')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Latência simulada por chamada')
+    parser.add_argument('--page-size', type=int, default=100, help='Maior página devolvida pela API')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Probabilidade de throttling (0-1)')
+    parser.add_argument('--no-memory', action='store_true', help='Não mede pico de memória')
+    parser.add_argument('--cold-start', action='store_true', help='Mede também a inicialização a frio')
+    parser.add_argument('--async-speedup', action='store_true',
+                        help='Compara print_cluster_summary síncrono e assíncrono com latência simulada')
+    parser.add_argument('--record-memory', type=int, metavar='CLUSTERS',
+                        help='Compara a memória de dicts e registros compactos numa frota deste tamanho')
+    parser.add_argument('--output', help='Arquivo JSON onde salvar os resultados')
+    parser.add_argument('--compare', help='Baseline JSON para detectar regressões')
+    args = parser.parse_args()
+
+    print("⏱️ Benchmark DocumentDBManager (backend simulado)")
+    report = run_benchmarks(
+        sizes=[int(size) for size in args.sizes.split(',')],
+        methods=args.methods.split(',') if args.methods else None,
+        measure_memory=not args.no_memory,
+        latency=args.latency_ms / 1000,
+        max_page_size=args.page_size,
+        throttle_rate=args.throttle_rate
+    )
+    if args.cold_start:
+        report['cold_start'] = measure_cold_start()
+    if args.async_speedup:
+        report['async_speedup'] = measure_async_speedup()
+    if args.record_memory:
+        report['record_memory'] = measure_record_memory(args.record_memory)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Resultados salvos em {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare_baselines(report, json.load(f))
+        for regression in regressions:
+            print(f"⚠️ Regressão: {regression}")
+        if not regressions:
+            print("✅ Nenhuma regressão em relação à baseline")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
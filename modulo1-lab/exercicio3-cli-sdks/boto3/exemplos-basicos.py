@@ -7,483 +7,6038 @@ Este arquivo contém exemplos teóricos de como usar Boto3 com DocumentDB.
 IMPORTANTE: Estes são exemplos conceituais para aprendizado.
 """
 
-import boto3
+import argparse
+import functools
+import hashlib
+import heapq
 import json
-from datetime import datetime, timedelta
-from botocore.exceptions import ClientError, NoCredentialsError
+import logging
+import math
+import mmap
+import os
+import random
+import socket
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from collections.abc import Mapping
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+from datetime import datetime, timedelta, timezone
+from botocore.exceptions import ClientError, HTTPClientError, NoCredentialsError
+from botocore.exceptions import ConnectionError as BotocoreConnectionError
 
+# boto3, botocore.config, asyncio, sqlite3 e NumPy são importados só quando usados:
+# juntos custam centenas de milissegundos na inicialização de CLIs e Lambdas
+np = None
 
-class DocumentDBManager:
+
+# Mensagens de andamento das classes; desligue com logger.setLevel(logging.WARNING)
+# ou logging.disable(). O script configura a saída em configure_logging()
+logger = logging.getLogger('docdb.exemplos')
+
+
+def configure_logging(level=logging.INFO):
     """
-    Classe para gerenciar operações do DocumentDB via Boto3
-    Foco em operações de consulta e monitoramento
+    Configura a saída das mensagens de andamento no terminal
+    
+    Args:
+        level (int): Nível mínimo exibido (ex: logging.WARNING para só avisos e erros)
+    """
+    logging.basicConfig(format='%(message)s')
+    logger.setLevel(level)
+
+
+def _load_numpy():
+    """
+    Importa o NumPy sob demanda (dependência opcional de MetricAnalytics)
+    """
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("MetricAnalytics requer NumPy: pip install numpy") from None
+        np = numpy
+    return np
+
+
+class DocumentDBError(Exception):
+    """
+    Erro base das chamadas feitas pelo DocumentDBManager
+    """
+    
+    def __init__(self, message, code=None, operation=None, attempts=1):
+        super().__init__(message)
+        self.code = code
+        self.operation = operation
+        self.attempts = attempts
+
+
+class ThrottlingError(DocumentDBError):
+    """
+    A API continuou limitando as requisições após todas as tentativas
+    """
+
+
+class ResourceNotFoundError(DocumentDBError):
+    """
+    O recurso consultado (cluster, instância, snapshot...) não existe
+    """
+
+
+class AccessDeniedError(DocumentDBError):
+    """
+    As credenciais não têm permissão IAM para a operação
+    """
+
+
+class QuotaExceededError(DocumentDBError):
     """
+    Uma cota da conta foi atingida; repetir a chamada não resolve
+    """
+
+
+class TransientError(DocumentDBError):
+    """
+    Falha temporária de rede ou do serviço que persistiu após as tentativas
+    """
+
+
+class WaiterError(DocumentDBError):
+    """
+    O recurso aguardado chegou a um estado de falha ou o tempo de espera acabou
+    """
+
+
+def translate_client_error(error, operation, attempts=1):
+    """
+    Converte um ClientError/erro de conexão do botocore no erro tipado correspondente
+    
+    Args:
+        error (Exception): Erro original do botocore
+        operation (str): Operação que falhou
+        attempts (int): Tentativas realizadas
+        
+    Returns:
+        DocumentDBError: Erro tipado, com o original em __cause__
+    """
+    if isinstance(error, ClientError):
+        code = error.response.get('Error', {}).get('Code', 'Unknown')
+        message = error.response.get('Error', {}).get('Message', str(error))
+    else:
+        code = type(error).__name__
+        message = str(error)
+    
+    if code in THROTTLING_ERROR_CODES:
+        error_class = ThrottlingError
+    elif code in NOT_FOUND_ERROR_CODES:
+        error_class = ResourceNotFoundError
+    elif code in ACCESS_DENIED_ERROR_CODES:
+        error_class = AccessDeniedError
+    elif code in QUOTA_ERROR_CODES:
+        error_class = QuotaExceededError
+    elif code in TRANSIENT_ERROR_CODES or isinstance(error, (HTTPClientError, BotocoreConnectionError)):
+        error_class = TransientError
+    else:
+        error_class = DocumentDBError
     
-    def __init__(self, region_name='us-east-1'):
+    typed_error = error_class(f"{operation}: {code} - {message}", code, operation, attempts)
+    typed_error.__cause__ = error
+    return typed_error
+
+
+class TokenBucket:
+    """
+    Limitador de taxa (token bucket) com ajuste adaptativo
+    A taxa cai pela metade a cada throttling e se recupera aos poucos
+    a cada sucesso, até o limite configurado
+    """
+    
+    def __init__(self, rate, capacity=None, min_rate=0.5, clock=time.monotonic, sleep=time.sleep):
         """
-        Inicializa o cliente DocumentDB
+        Inicializa o bucket
         
         Args:
-            region_name (str): Região AWS para conectar
+            rate (float): Requisições por segundo permitidas
+            capacity (float, optional): Rajada máxima (padrão: rate)
+            min_rate (float): Taxa mínima após sucessivos throttlings
+            clock (callable): Relógio monotônico (substituível em testes)
+            sleep (callable): Função de espera (substituível em testes)
         """
-        try:
-            self.docdb_client = boto3.client('docdb', region_name=region_name)
-            self.cloudwatch_client = boto3.client('cloudwatch', region_name=region_name)
-            self.logs_client = boto3.client('logs', region_name=region_name)
-            self.region = region_name
-            print(f"✅ Cliente DocumentDB inicializado na região: {region_name}")
-        except NoCredentialsError:
-            print("❌ Erro: Credenciais AWS não configuradas")
-            raise
-        except Exception as e:
-            print(f"❌ Erro ao inicializar cliente: {e}")
-            raise
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = min(float(min_rate), self.rate)
+        self.capacity = float(capacity or rate)
+        self.tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
 
-    def list_clusters(self):
+    def try_acquire(self, tokens=1):
         """
-        Lista todos os clusters DocumentDB na região
+        Consome tokens sem esperar
         
         Returns:
-            list: Lista de clusters com informações básicas
+            float: 0 se conseguiu, ou os segundos até haver tokens suficientes
         """
-        try:
-            response = self.docdb_client.describe_db_clusters()
-            clusters = []
-            
-            for cluster in response['DBClusters']:
-                cluster_info = {
-                    'identifier': cluster['DBClusterIdentifier'],
-                    'status': cluster['Status'],
-                    'engine': cluster['Engine'],
-                    'engine_version': cluster['EngineVersion'],
-                    'endpoint': cluster.get('Endpoint', 'N/A'),
-                    'reader_endpoint': cluster.get('ReaderEndpoint', 'N/A'),
-                    'port': cluster.get('Port', 27017),
-                    'multi_az': cluster.get('MultiAZ', False),
-                    'backup_retention': cluster.get('BackupRetentionPeriod', 0),
-                    'created_time': cluster.get('ClusterCreateTime', 'N/A')
-                }
-                clusters.append(cluster_info)
+        with self._lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+
+    def available(self):
+        """
+        Tokens disponíveis agora, sem consumir
+        
+        Returns:
+            float: Tokens no bucket
+        """
+        with self._lock:
+            self._refill()
+            return self.tokens
+
+    def acquire(self, tokens=1):
+        """
+        Consome tokens, esperando se necessário
+        
+        Returns:
+            float: Segundos de espera
+        """
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(tokens)
+            if not wait:
+                return waited
+            self._sleep(wait)
+            waited += wait
+
+    def on_throttle(self):
+        """
+        Reduz a taxa após um throttling (decréscimo multiplicativo)
+        """
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def on_success(self):
+        """
+        Recupera a taxa após um sucesso (acréscimo aditivo)
+        """
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+
+class RetryBudget:
+    """
+    Orçamento de retentativas compartilhado
+    Cada sucesso deposita uma fração de retentativa e cada retentativa
+    consome uma inteira, evitando que throttling vire uma avalanche
+    """
+    
+    def __init__(self, ratio=0.2, capacity=20):
+        """
+        Inicializa o orçamento
+        
+        Args:
+            ratio (float): Retentativas ganhas por requisição bem-sucedida
+            capacity (float): Saldo máximo acumulado
+        """
+        self.ratio = ratio
+        self.capacity = float(capacity)
+        self.balance = float(capacity)
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.balance = min(self.capacity, self.balance + self.ratio)
+
+    def withdraw(self):
+        """
+        Tenta consumir uma retentativa
+        
+        Returns:
+            bool: True se ainda havia saldo
+        """
+        with self._lock:
+            if self.balance < 1:
+                return False
+            self.balance -= 1
+            return True
+
+
+class RequestExecutor:
+    """
+    Camada de execução de requisições usada por todos os métodos do manager
+    Aplica limite de taxa por serviço, retentativas com backoff exponencial
+    e jitter, orçamento de retentativas e um hook de métricas por chamada
+    """
+    
+    def __init__(self, rate_limits=None, max_attempts=5, base_delay=0.2, max_delay=20.0,
+                 retry_budget=None, metrics_hook=None, sleep=time.sleep):
+        """
+        Inicializa o executor
+        
+        Args:
+            rate_limits (dict, optional): Requisições/segundo por serviço (padrão: RATE_LIMITS)
+            max_attempts (int): Tentativas por chamada, incluindo a primeira
+            base_delay (float): Espera base do backoff em segundos
+            max_delay (float): Espera máxima entre tentativas
+            retry_budget (RetryBudget, optional): Orçamento de retentativas compartilhado
+            metrics_hook (callable or list, optional): Recebe um dict por chamada com
+                                                       retentativas, throttlings, latência,
+                                                       tamanho da resposta e itens da página
+            sleep (callable): Função de espera (substituível em testes)
+        """
+        self.rate_limits = dict(RATE_LIMITS if rate_limits is None else rate_limits)
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_budget = retry_budget or RetryBudget()
+        if metrics_hook is None:
+            self.metrics_hooks = []
+        elif callable(metrics_hook):
+            self.metrics_hooks = [metrics_hook]
+        else:
+            self.metrics_hooks = list(metrics_hook)
+        self._sleep = sleep
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, service):
+        """
+        Obtém o token bucket de um serviço
+        """
+        with self._lock:
+            if service not in self._buckets:
+                rate = self.rate_limits.get(service, DEFAULT_RATE_LIMIT)
+                self._buckets[service] = TokenBucket(rate, sleep=self._sleep)
+            return self._buckets[service]
+
+    def _backoff(self, attempt, throttled):
+        # Full jitter; throttling parte de uma base maior que erros de rede
+        base = self.base_delay * (4 if throttled else 1)
+        return random.uniform(0, min(self.max_delay, base * 2 ** attempt))
+
+    def run(self, service, operation, func):
+        """
+        Executa uma função que faz uma requisição, com limite de taxa e retentativas
+        
+        Args:
+            service (str): Serviço AWS (chave do limite de taxa)
+            operation (str): Nome da operação (para erros e métricas)
+            func (callable): Função sem argumentos que faz a requisição
             
-            print(f"📋 Encontrados {len(clusters)} clusters")
-            return clusters
+        Returns:
+            Resultado de func
             
-        except ClientError as e:
-            print(f"❌ Erro ao listar clusters: {e}")
-            return []
+        Raises:
+            DocumentDBError: Subclasse tipada conforme o erro final
+        """
+        bucket = self.bucket(service)
+        stats = {
+            'service': service,
+            'operation': operation,
+            'attempts': 0,
+            'retries': 0,
+            'throttles': 0,
+            'rate_limit_wait': 0.0,
+            'error': None
+        }
+        start = time.perf_counter()
+        try:
+            while True:
+                stats['rate_limit_wait'] += bucket.acquire()
+                stats['attempts'] += 1
+                try:
+                    result = func()
+                except (ClientError, HTTPClientError, BotocoreConnectionError) as e:
+                    # EndpointConnectionError/ConnectTimeoutError não herdam de HTTPClientError
+                    typed_error = translate_client_error(e, operation, stats['attempts'])
+                    throttled = isinstance(typed_error, ThrottlingError)
+                    if throttled:
+                        stats['throttles'] += 1
+                        bucket.on_throttle()
+                    
+                    retryable = throttled or isinstance(typed_error, TransientError)
+                    if (not retryable or stats['attempts'] >= self.max_attempts
+                            or not self.retry_budget.withdraw()):
+                        stats['error'] = typed_error.code
+                        raise typed_error
+                    
+                    stats['retries'] += 1
+                    self._sleep(self._backoff(stats['attempts'] - 1, throttled))
+                    continue
+                
+                bucket.on_success()
+                self.retry_budget.deposit()
+                if self.metrics_hooks:
+                    stats['response_bytes'], stats['items'] = self._response_size(result)
+                return result
+        finally:
+            stats['latency_seconds'] = time.perf_counter() - start
+            for hook in self.metrics_hooks:
+                hook(stats)
 
-    def get_cluster_details(self, cluster_identifier):
+    @staticmethod
+    def _response_size(result):
         """
-        Obtém detalhes específicos de um cluster
+        Tamanho e número de itens de uma resposta da API, sem reserializá-la
+        
+        Returns:
+            tuple: (bytes segundo o Content-Length ou None, itens da página ou None)
+        """
+        if not isinstance(result, dict):
+            return None, None
+        headers = result.get('ResponseMetadata', {}).get('HTTPHeaders', {})
+        size = headers.get('content-length')
+        items = None
+        for key, value in result.items():
+            if key != 'ResponseMetadata' and isinstance(value, list):
+                items = len(value)
+                break
+        return (int(size) if size else None), items
+
+    def call(self, service, client, operation, **params):
+        """
+        Executa uma operação de um cliente boto3
         
         Args:
-            cluster_identifier (str): Identificador do cluster
+            service (str): Serviço AWS (chave do limite de taxa)
+            client: Cliente boto3
+            operation (str): Nome da operação (ex: 'describe_db_clusters')
+            **params: Parâmetros da operação
             
         Returns:
-            dict: Detalhes completos do cluster
+            dict: Resposta da API
         """
-        try:
-            response = self.docdb_client.describe_db_clusters(
-                DBClusterIdentifier=cluster_identifier
-            )
+        method = getattr(client, operation)
+        return self.run(service, operation, lambda: method(**params))
+
+
+class ClientRegistry:
+    """
+    Registro de clientes boto3 compartilhado por todo o processo
+    
+    Clientes são reaproveitados por (serviço, região, profile), evitando
+    refazer sessão, resolução de credenciais e pool HTTP a cada manager.
+    Clientes boto3 são thread-safe depois de criados; a criação (e a das
+    sessões) é serializada por um lock.
+    """
+    
+    def __init__(self, max_pool_connections=50, connect_timeout=5, read_timeout=30,
+                 tcp_keepalive=True, retry_mode='standard', max_attempts=1):
+        """
+        Inicializa o registro
+        
+        Args:
+            max_pool_connections (int): Conexões HTTP mantidas por cliente
+            connect_timeout (float): Timeout de conexão em segundos
+            read_timeout (float): Timeout de leitura em segundos
+            tcp_keepalive (bool): Habilita keep-alive TCP nas conexões
+            retry_mode (str): Modo de retentativa do botocore ('standard', 'adaptive', 'legacy')
+            max_attempts (int): Tentativas do botocore por chamada; 1 deixa as
+                                retentativas a cargo do RequestExecutor
+        """
+        self.options = {
+            'max_pool_connections': max_pool_connections,
+            'connect_timeout': connect_timeout,
+            'read_timeout': read_timeout,
+            'tcp_keepalive': tcp_keepalive,
+            'retries': {'mode': retry_mode, 'total_max_attempts': max_attempts}
+        }
+        self._sessions = {}
+        self._clients = {}
+        self._uses = {}
+        self.sessions_created = 0
+        self.clients_created = 0
+        self.clients_reused = 0
+        self._lock = threading.Lock()
+
+    def configure(self, **options):
+        """
+        Altera opções do botocore Config para os próximos clientes criados
+        
+        Args:
+            **options: Mesmos parâmetros de __init__
+        """
+        with self._lock:
+            if 'retry_mode' in options or 'max_attempts' in options:
+                retries = dict(self.options['retries'])
+                retries['mode'] = options.pop('retry_mode', retries['mode'])
+                retries['total_max_attempts'] = options.pop('max_attempts', retries['total_max_attempts'])
+                self.options['retries'] = retries
+            self.options.update(options)
+
+    def session(self, profile_name=None):
+        """
+        Obtém (ou cria) a sessão boto3 de um profile
+        """
+        with self._lock:
+            return self._session(profile_name)
+
+    def _session(self, profile_name):
+        if profile_name not in self._sessions:
+            import boto3
+            self._sessions[profile_name] = boto3.Session(profile_name=profile_name)
+            self.sessions_created += 1
+        return self._sessions[profile_name]
+
+    def client(self, service, region_name, profile_name=None):
+        """
+        Empresta o cliente compartilhado de um serviço/região/profile
+        
+        Args:
+            service (str): Serviço AWS ('docdb', 'cloudwatch', 'logs'...)
+            region_name (str): Região AWS
+            profile_name (str, optional): Profile de credenciais
             
-            if not response['DBClusters']:
-                print(f"❌ Cluster '{cluster_identifier}' não encontrado")
-                return None
+        Returns:
+            Cliente boto3 reutilizável
+        """
+        key = (service, region_name, profile_name)
+        with self._lock:
+            if key in self._clients:
+                self.clients_reused += 1
+            else:
+                from botocore.config import Config
+                
+                session = self._session(profile_name)
+                self._clients[key] = session.client(service, region_name=region_name,
+                                                    config=Config(**self.options))
+                self.clients_created += 1
+            self._uses[key] = self._uses.get(key, 0) + 1
+            return self._clients[key]
+
+    def clear(self):
+        """
+        Descarta clientes e sessões (ex: após trocar credenciais)
+        """
+        with self._lock:
+            self._sessions.clear()
+            self._clients.clear()
+            self._uses.clear()
+
+    def stats(self):
+        """
+        Contadores de reaproveitamento
+        
+        Returns:
+            dict: Sessões e clientes criados, reaproveitamentos e usos por cliente
+        """
+        with self._lock:
+            return {
+                'sessions_created': self.sessions_created,
+                'clients_created': self.clients_created,
+                'clients_reused': self.clients_reused,
+                'clients': {
+                    f"{service}/{region}/{profile or 'default'}": uses
+                    for (service, region, profile), uses in self._uses.items()
+                }
+            }
+
+
+# Registro padrão, compartilhado por DocumentDBManager e pelos exemplos
+client_registry = ClientRegistry()
+
+
+class ResponseCache:
+    """
+    Cache LRU com TTL por operação para respostas da API
+    Chaveado pela operação e pelos parâmetros da chamada
+    """
+    
+    def __init__(self, max_entries=256, default_ttl=30, ttls=None):
+        """
+        Inicializa o cache
+        
+        Args:
+            max_entries (int): Número máximo de respostas guardadas
+            default_ttl (int): Validade padrão em segundos
+            ttls (dict, optional): Validade por operação (padrão: CACHE_TTLS)
+        """
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.ttls = dict(CACHE_TTLS if ttls is None else ttls)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(operation, params):
+        """
+        Monta a chave do cache a partir da operação e dos parâmetros
+        """
+        return operation, json.dumps(params, sort_keys=True, default=str)
+
+    def get(self, operation, params):
+        """
+        Busca uma resposta válida no cache
+        
+        Returns:
+            tuple: (encontrado, resposta)
+        """
+        key = self.make_key(operation, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return False, None
             
-            cluster = response['DBClusters'][0]
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def put(self, operation, params, response):
+        """
+        Guarda uma resposta, descartando a menos usada se o cache estiver cheio
+        """
+        ttl = self.ttls.get(operation, self.default_ttl)
+        if ttl <= 0:
+            return
+        
+        key = self.make_key(operation, params)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, operation=None, **params):
+        """
+        Remove respostas do cache
+        
+        Args:
+            operation (str, optional): Operação a invalidar (None = todas)
+            **params: Parâmetros exatos da chamada; sem parâmetros, remove
+                      todas as entradas da operação
             
-            details = {
-                'basic_info': {
-                    'identifier': cluster['DBClusterIdentifier'],
-                    'status': cluster['Status'],
-                    'engine': f"{cluster['Engine']} {cluster['EngineVersion']}",
-                    'created': cluster.get('ClusterCreateTime', 'N/A')
-                },
-                'connectivity': {
-                    'endpoint': cluster.get('Endpoint', 'N/A'),
-                    'reader_endpoint': cluster.get('ReaderEndpoint', 'N/A'),
-                    'port': cluster.get('Port', 27017),
-                    'vpc_security_groups': [sg['VpcSecurityGroupId'] for sg in cluster.get('VpcSecurityGroups', [])]
-                },
-                'configuration': {
-                    'multi_az': cluster.get('MultiAZ', False),
-                    'backup_retention_period': cluster.get('BackupRetentionPeriod', 0),
-                    'preferred_backup_window': cluster.get('PreferredBackupWindow', 'N/A'),
-                    'preferred_maintenance_window': cluster.get('PreferredMaintenanceWindow', 'N/A'),
-                    'storage_encrypted': cluster.get('StorageEncrypted', False),
-                    'kms_key_id': cluster.get('KmsKeyId', 'Default')
-                },
-                'network': {
-                    'db_subnet_group_name': cluster.get('DBSubnetGroup', 'N/A'),
-                    'availability_zones': cluster.get('AvailabilityZones', [])
-                }
+        Returns:
+            int: Quantidade de entradas removidas
+        """
+        with self._lock:
+            if operation is None:
+                keys = list(self._entries)
+            elif params:
+                key = self.make_key(operation, params)
+                keys = [key] if key in self._entries else []
+            else:
+                keys = [key for key in self._entries if key[0] == operation]
+            
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def stats(self):
+        """
+        Retorna os contadores do cache
+        
+        Returns:
+            dict: Acertos, falhas, descartes e tamanho atual
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries)
             }
+
+
+class DocumentDBManager:
+    """
+    Classe para gerenciar operações do DocumentDB via Boto3
+    Foco em operações de consulta e monitoramento
+    """
+    
+    def __init__(self, region_name='us-east-1', session=None, cache=None, executor=None,
+                 metric_store=None, profile_name=None, registry=None, metric_planner=None):
+        """
+        Inicializa o cliente DocumentDB
+        
+        Args:
+            region_name (str): Região AWS para conectar
+            session (boto3.Session, optional): Sessão própria para criar os clientes,
+                                               fora do registro compartilhado
+            cache (ResponseCache, optional): Cache de respostas da API
+            executor (RequestExecutor, optional): Camada de limite de taxa e retentativas
+            metric_store (MetricStore, optional): Histórico local de métricas; quando
+                                                  informado, só lacunas vão ao CloudWatch
+            profile_name (str, optional): Profile de credenciais (ex: outra conta)
+            registry (ClientRegistry, optional): Registro de clientes (padrão: client_registry)
+            metric_planner (MetricQueryPlanner, optional): Planejador das consultas
+                                                           de métricas (compartilha buscas
+                                                           entre chamadas concorrentes)
+        """
+        self.cache = cache or ResponseCache()
+        self.metric_planner = metric_planner or MetricQueryPlanner()
+        self.executor = executor or RequestExecutor()
+        self.metric_store = metric_store
+        self.region = region_name
+        # Os clientes são criados no primeiro uso (ver _client)
+        self._session = session
+        self._profile_name = profile_name
+        self._registry = registry or client_registry
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+        logger.info("✅ Cliente DocumentDB inicializado na região: %s", region_name)
+
+    def _client(self, service):
+        """
+        Obtém o cliente boto3 de um serviço, criando-o no primeiro uso
+        
+        Cada cliente carrega o modelo do serviço (dezenas de ms e alguns MB),
+        então só pagamos por docdb/cloudwatch/logs quando são realmente usados.
+        Sem sessão própria, o cliente é emprestado do registro compartilhado.
+        
+        Args:
+            service (str): 'docdb', 'cloudwatch' ou 'logs'
             
-            print(f"✅ Detalhes obtidos para cluster: {cluster_identifier}")
-            return details
+        Returns:
+            Cliente boto3 do serviço
+        """
+        client = self._clients.get(service)
+        if client is not None:
+            return client
+        
+        with self._clients_lock:
+            if service not in self._clients:
+                try:
+                    if self._session is None:
+                        self._clients[service] = self._registry.client(
+                            service, self.region, self._profile_name
+                        )
+                    else:
+                        from botocore.config import Config
+                        
+                        # As retentativas ficam a cargo do RequestExecutor
+                        config = Config(retries={'total_max_attempts': 1})
+                        self._clients[service] = self._session.client(
+                            service, region_name=self.region, config=config
+                        )
+                except NoCredentialsError:
+                    logger.error("❌ Erro: Credenciais AWS não configuradas")
+                    raise
+                except Exception as e:
+                    logger.error("❌ Erro ao inicializar cliente %s: %s", service, e)
+                    raise
+            return self._clients[service]
+
+    @property
+    def docdb_client(self):
+        return self._client('docdb')
+
+    @property
+    def cloudwatch_client(self):
+        return self._client('cloudwatch')
+
+    @property
+    def logs_client(self):
+        return self._client('logs')
+
+    def _call(self, service, operation, **params):
+        """
+        Executa uma operação pela camada de limite de taxa e retentativas
+        
+        Args:
+            service (str): 'docdb', 'cloudwatch' ou 'logs'
+            operation (str): Nome da operação
+            **params: Parâmetros da operação
             
-        except ClientError as e:
-            print(f"❌ Erro ao obter detalhes do cluster: {e}")
-            return None
+        Returns:
+            dict: Resposta da API
+            
+        Raises:
+            DocumentDBError: Subclasse tipada conforme o erro final
+        """
+        return self.executor.call(service, self._client(service), operation, **params)
+
+    def _cached_call(self, operation, **params):
+        """
+        Executa uma operação do DocumentDB passando pelo cache de respostas
+        
+        Args:
+            operation (str): Nome da operação (ex: 'describe_db_clusters')
+            **params: Parâmetros da operação
+            
+        Returns:
+            dict: Resposta da API (possivelmente vinda do cache)
+        """
+        found, response = self.cache.get(operation, params)
+        if not found:
+            response = self._call('docdb', operation, **params)
+            self.cache.put(operation, params, response)
+        return response
+
+    def invalidate_cache(self, operation=None, **params):
+        """
+        Invalida respostas em cache, ex: após modificar um cluster
+        
+        Args:
+            operation (str, optional): Operação a invalidar (None = todas)
+            **params: Parâmetros exatos da chamada a invalidar
+            
+        Returns:
+            int: Quantidade de entradas removidas
+        """
+        return self.cache.invalidate(operation, **params)
+
+    def _paginate(self, operation, result_key, page_size=None, **params):
+        """
+        Percorre todas as páginas de uma operação describe_* do DocumentDB
+        
+        Args:
+            operation (str): Nome da operação (ex: 'describe_db_clusters')
+            result_key (str): Chave da lista de itens na resposta
+            page_size (int, optional): Itens por página (padrão: DEFAULT_PAGE_SIZE)
+            **params: Parâmetros repassados à operação
+            
+        Yields:
+            dict: Itens brutos da resposta, à medida que cada página chega
+        """
+        # Cada página passa pelo executor, então uma página com throttling é
+        # repetida a partir do mesmo Marker em vez de reiniciar a listagem
+        params['MaxRecords'] = page_size or DEFAULT_PAGE_SIZE
+        while True:
+            response = self._call('docdb', operation, **params)
+            yield from response[result_key]
+            
+            if not response.get('Marker'):
+                break
+            params['Marker'] = response['Marker']
+
+    @staticmethod
+    def _normalize_cluster(cluster):
+        """
+        Converte um cluster da resposta describe_db_clusters no formato resumido
+        
+        Args:
+            cluster (dict): Item de DBClusters
+            
+        Returns:
+            dict: Cluster com informações básicas
+        """
+        return {
+            'identifier': cluster['DBClusterIdentifier'],
+            'status': cluster['Status'],
+            'engine': cluster['Engine'],
+            'engine_version': cluster['EngineVersion'],
+            'endpoint': cluster.get('Endpoint', 'N/A'),
+            'reader_endpoint': cluster.get('ReaderEndpoint', 'N/A'),
+            'port': cluster.get('Port', 27017),
+            'multi_az': cluster.get('MultiAZ', False),
+            'backup_retention': cluster.get('BackupRetentionPeriod', 0),
+            'created_time': cluster.get('ClusterCreateTime', 'N/A')
+        }
+
+    def iter_clusters(self, page_size=None, compact=False):
+        """
+        Itera sobre todos os clusters DocumentDB na região
+        
+        Args:
+            page_size (int, optional): Itens por página da API
+            compact (bool): Devolve ClusterRecord em vez de dict
+            
+        Yields:
+            dict: Cluster com informações básicas
+        """
+        normalize = ClusterRecord.from_api if compact else self._normalize_cluster
+        for cluster in self._paginate('describe_db_clusters', 'DBClusters', page_size):
+            yield normalize(cluster)
+
+    def list_clusters(self, page_size=None, compact=False):
+        """
+        Lista todos os clusters DocumentDB na região
+        
+        Args:
+            page_size (int, optional): Itens por página da API
+            compact (bool): Devolve ClusterRecord em vez de dict (menos memória
+                            em inventários grandes)
+            
+        Returns:
+            list: Lista de clusters com informações básicas
+        """
+        try:
+            clusters = list(self.iter_clusters(page_size, compact))
+            
+            logger.info("📋 Encontrados %s clusters", len(clusters))
+            return clusters
+            
+        except (ThrottlingError, AccessDeniedError, TransientError):
+            raise
+        except DocumentDBError as e:
+            logger.error("❌ Erro ao listar clusters: %s", e)
+            return []
+
+    @staticmethod
+    def _normalize_cluster_details(cluster):
+        """
+        Converte um cluster da resposta describe_db_clusters no dicionário de detalhes
+        
+        Args:
+            cluster (dict): Item de DBClusters
+            
+        Returns:
+            dict: Detalhes completos do cluster
+        """
+        return {
+            'basic_info': {
+                'identifier': cluster['DBClusterIdentifier'],
+                'status': cluster['Status'],
+                'engine': f"{cluster['Engine']} {cluster['EngineVersion']}",
+                'created': cluster.get('ClusterCreateTime', 'N/A')
+            },
+            'connectivity': {
+                'endpoint': cluster.get('Endpoint', 'N/A'),
+                'reader_endpoint': cluster.get('ReaderEndpoint', 'N/A'),
+                'port': cluster.get('Port', 27017),
+                'vpc_security_groups': [sg['VpcSecurityGroupId'] for sg in cluster.get('VpcSecurityGroups', [])]
+            },
+            'configuration': {
+                'multi_az': cluster.get('MultiAZ', False),
+                'backup_retention_period': cluster.get('BackupRetentionPeriod', 0),
+                'preferred_backup_window': cluster.get('PreferredBackupWindow', 'N/A'),
+                'preferred_maintenance_window': cluster.get('PreferredMaintenanceWindow', 'N/A'),
+                'storage_encrypted': cluster.get('StorageEncrypted', False),
+                'kms_key_id': cluster.get('KmsKeyId', 'Default'),
+                'parameter_group': cluster.get('DBClusterParameterGroup', 'N/A')
+            },
+            'network': {
+                'db_subnet_group_name': cluster.get('DBSubnetGroup', 'N/A'),
+                'availability_zones': cluster.get('AvailabilityZones', [])
+            },
+            'members': [
+                {
+                    'identifier': member['DBInstanceIdentifier'],
+                    'is_writer': member.get('IsClusterWriter', False)
+                }
+                for member in cluster.get('DBClusterMembers', [])
+            ]
+        }
+
+    def get_cluster_details(self, cluster_identifier):
+        """
+        Obtém detalhes específicos de um cluster
+        
+        Args:
+            cluster_identifier (str): Identificador do cluster
+            
+        Returns:
+            dict: Detalhes completos do cluster
+        """
+        try:
+            response = self._cached_call(
+                'describe_db_clusters',
+                DBClusterIdentifier=cluster_identifier
+            )
+            
+            if not response['DBClusters']:
+                logger.error("❌ Cluster '%s' não encontrado", cluster_identifier)
+                return None
+            
+            details = self._normalize_cluster_details(response['DBClusters'][0])
+            
+            logger.info("✅ Detalhes obtidos para cluster: %s", cluster_identifier)
+            return details
+            
+        except ResourceNotFoundError:
+            logger.error("❌ Cluster '%s' não encontrado", cluster_identifier)
+            return None
+        except (ThrottlingError, AccessDeniedError, TransientError):
+            raise
+        except DocumentDBError as e:
+            logger.error("❌ Erro ao obter detalhes do cluster: %s", e)
+            return None
+
+    def iter_cluster_details(self, page_size=None):
+        """
+        Itera sobre os detalhes de todos os clusters da região
+        
+        Args:
+            page_size (int, optional): Itens por página da API
+            
+        Yields:
+            dict: Detalhes no formato de get_cluster_details
+        """
+        for cluster in self._paginate('describe_db_clusters', 'DBClusters', page_size):
+            yield self._normalize_cluster_details(cluster)
+
+    @staticmethod
+    def _normalize_instance(instance):
+        """
+        Converte uma instância da resposta describe_db_instances no formato resumido
+        
+        Args:
+            instance (dict): Item de DBInstances
+            
+        Returns:
+            dict: Instância com informações básicas
+        """
+        return {
+            'identifier': instance['DBInstanceIdentifier'],
+            'status': instance['DBInstanceStatus'],
+            'instance_class': instance['DBInstanceClass'],
+            'availability_zone': instance.get('AvailabilityZone', 'N/A'),
+            'cluster_identifier': instance.get('DBClusterIdentifier', 'N/A'),
+            'endpoint': instance.get('Endpoint', {}).get('Address', 'N/A'),
+            'port': instance.get('Endpoint', {}).get('Port', 27017),
+            'promotion_tier': instance.get('PromotionTier', 0),
+            'created_time': instance.get('InstanceCreateTime', 'N/A')
+        }
+
+    def iter_instances(self, cluster_identifier=None, page_size=None, compact=False):
+        """
+        Itera sobre instâncias DocumentDB
+        
+        Args:
+            cluster_identifier (str, optional): Filtrar por cluster específico
+            page_size (int, optional): Itens por página da API
+            compact (bool): Devolve InstanceRecord em vez de dict
+            
+        Yields:
+            dict: Instância com informações básicas
+        """
+        params = {}
+        if cluster_identifier:
+            params['Filters'] = [
+                {
+                    'Name': 'db-cluster-id',
+                    'Values': [cluster_identifier]
+                }
+            ]
+        
+        normalize = InstanceRecord.from_api if compact else self._normalize_instance
+        for instance in self._paginate('describe_db_instances', 'DBInstances', page_size, **params):
+            yield normalize(instance)
+
+    def list_instances(self, cluster_identifier=None, page_size=None, compact=False):
+        """
+        Lista instâncias DocumentDB
+        
+        Args:
+            cluster_identifier (str, optional): Filtrar por cluster específico
+            page_size (int, optional): Itens por página da API
+            compact (bool): Devolve InstanceRecord em vez de dict
+            
+        Returns:
+            list: Lista de instâncias
+        """
+        try:
+            instances = list(self.iter_instances(cluster_identifier, page_size, compact))
+            
+            logger.info("📋 Encontradas %s instâncias", len(instances))
+            return instances
+            
+        except (ThrottlingError, AccessDeniedError, TransientError):
+            raise
+        except DocumentDBError as e:
+            logger.error("❌ Erro ao listar instâncias: %s", e)
+            return []
+
+    @staticmethod
+    def _normalize_snapshot(snapshot):
+        """
+        Converte um snapshot da resposta describe_db_cluster_snapshots no formato resumido
+        
+        Args:
+            snapshot (dict): Item de DBClusterSnapshots
+            
+        Returns:
+            dict: Snapshot com informações básicas
+        """
+        return {
+            'identifier': snapshot['DBClusterSnapshotIdentifier'],
+            'cluster_identifier': snapshot['DBClusterIdentifier'],
+            'status': snapshot['Status'],
+            'snapshot_type': snapshot['SnapshotType'],
+            'created_time': snapshot.get('SnapshotCreateTime', 'N/A'),
+            'allocated_storage': snapshot.get('AllocatedStorage', 0),
+            'engine': snapshot.get('Engine', 'N/A'),
+            'engine_version': snapshot.get('EngineVersion', 'N/A')
+        }
+
+    def iter_snapshots(self, cluster_identifier=None, snapshot_type='all', page_size=None, compact=False):
+        """
+        Itera sobre snapshots disponíveis
+        
+        Args:
+            cluster_identifier (str, optional): Filtrar por cluster
+            snapshot_type (str): 'manual', 'automated', ou 'all'
+            page_size (int, optional): Itens por página da API
+            compact (bool): Devolve SnapshotRecord em vez de dict
+            
+        Yields:
+            dict: Snapshot com informações básicas
+        """
+        params = {}
+        if cluster_identifier:
+            params['DBClusterIdentifier'] = cluster_identifier
+        if snapshot_type != 'all':
+            params['SnapshotType'] = snapshot_type
+        
+        normalize = SnapshotRecord.from_api if compact else self._normalize_snapshot
+        for snapshot in self._paginate('describe_db_cluster_snapshots', 'DBClusterSnapshots', page_size, **params):
+            yield normalize(snapshot)
+
+    def list_snapshots(self, cluster_identifier=None, snapshot_type='all', page_size=None, compact=False):
+        """
+        Lista snapshots disponíveis
+        
+        Args:
+            cluster_identifier (str, optional): Filtrar por cluster
+            snapshot_type (str): 'manual', 'automated', ou 'all'
+            page_size (int, optional): Itens por página da API
+            compact (bool): Devolve SnapshotRecord em vez de dict
+            
+        Returns:
+            list: Lista de snapshots
+        """
+        try:
+            snapshots = list(self.iter_snapshots(cluster_identifier, snapshot_type, page_size, compact))
+            
+            logger.info("📋 Encontrados %s snapshots", len(snapshots))
+            return snapshots
+            
+        except (ThrottlingError, AccessDeniedError, TransientError):
+            raise
+        except DocumentDBError as e:
+            logger.error("❌ Erro ao listar snapshots: %s", e)
+            return []
+
+    @staticmethod
+    def _chunked(values, size):
+        """
+        Divide uma lista em blocos de tamanho máximo fixo
+        
+        Args:
+            values (list): Valores a dividir
+            size (int): Tamanho máximo de cada bloco
+            
+        Yields:
+            list: Bloco de valores
+        """
+        for start in range(0, len(values), size):
+            yield values[start:start + size]
+
+    def get_clusters_details(self, cluster_identifiers=None, page_size=None):
+        """
+        Obtém detalhes de vários clusters com poucas chamadas describe_db_clusters
+        
+        Os identificadores são agrupados em filtros db-cluster-id com vários
+        valores; sem identificadores, a frota inteira é lida de uma vez. Cada
+        resultado também alimenta o cache usado por get_cluster_details.
+        
+        Args:
+            cluster_identifiers (list, optional): Clusters desejados (todos se None)
+            page_size (int, optional): Itens por página da API
+            
+        Returns:
+            dict: Identificador do cluster -> detalhes (None se não encontrado
+                  ou se o bloco de filtros dele falhou)
+        """
+        if cluster_identifiers is None:
+            batches = [{}]
+            details = {}
+        else:
+            cluster_identifiers = list(dict.fromkeys(cluster_identifiers))
+            batches = [
+                {'Filters': [{'Name': 'db-cluster-id', 'Values': chunk}]}
+                for chunk in self._chunked(cluster_identifiers, MAX_FILTER_VALUES)
+            ]
+            details = {identifier: None for identifier in cluster_identifiers}
+        
+        for params in batches:
+            try:
+                for cluster in self._paginate('describe_db_clusters', 'DBClusters', page_size, **params):
+                    identifier = cluster['DBClusterIdentifier']
+                    self.cache.put(
+                        'describe_db_clusters',
+                        {'DBClusterIdentifier': identifier},
+                        {'DBClusters': [cluster]}
+                    )
+                    details[identifier] = self._normalize_cluster_details(cluster)
+            except (ThrottlingError, AccessDeniedError, TransientError):
+                raise
+            except DocumentDBError as e:
+                # Um bloco com erro não derruba os demais; os clusters dele ficam None
+                logger.error("❌ Erro ao obter detalhes dos clusters: %s", e)
+        
+        return details
+
+    def list_instances_by_cluster(self, cluster_identifiers, page_size=None, strategy='auto'):
+        """
+        Lista as instâncias de vários clusters com um número fixo de chamadas
+        
+        Args:
+            cluster_identifiers (list): Clusters desejados
+            page_size (int, optional): Itens por página da API
+            strategy (str): 'filter' (db-cluster-id com até MAX_FILTER_VALUES
+                valores por chamada), 'scan' (leitura de todas as instâncias da
+                região) ou 'auto' (scan a partir de BULK_SCAN_THRESHOLD clusters)
+            
+        Returns:
+            dict: Identificador do cluster -> lista de instâncias
+        """
+        cluster_identifiers = list(dict.fromkeys(cluster_identifiers))
+        grouped = {identifier: [] for identifier in cluster_identifiers}
+        if not cluster_identifiers:
+            return grouped
+        
+        if strategy == 'auto':
+            strategy = 'scan' if len(cluster_identifiers) >= BULK_SCAN_THRESHOLD else 'filter'
+        
+        if strategy == 'scan':
+            batches = [{}]
+        elif strategy == 'filter':
+            batches = [
+                {'Filters': [{'Name': 'db-cluster-id', 'Values': chunk}]}
+                for chunk in self._chunked(cluster_identifiers, MAX_FILTER_VALUES)
+            ]
+        else:
+            raise ValueError(f"Estratégia inválida: {strategy}")
+        
+        try:
+            for params in batches:
+                for instance in self._paginate('describe_db_instances', 'DBInstances', page_size, **params):
+                    cluster_id = instance.get('DBClusterIdentifier')
+                    if cluster_id in grouped:
+                        grouped[cluster_id].append(self._normalize_instance(instance))
+            
+            total = sum(len(items) for items in grouped.values())
+            logger.info("📋 Encontradas %s instâncias em %s clusters", total, len(grouped))
+            return grouped
+            
+        except (ThrottlingError, AccessDeniedError, TransientError):
+            raise
+        except DocumentDBError as e:
+            logger.error("❌ Erro ao listar instâncias: %s", e)
+            return grouped
+
+    def list_snapshots_by_cluster(self, cluster_identifiers, snapshot_type='all', page_size=None,
+                                  strategy='auto', fleet_size=None):
+        """
+        Lista os snapshots de vários clusters
+        
+        A API describe_db_cluster_snapshots não aceita filtros com vários
+        clusters: ou se faz uma chamada por cluster, ou uma leitura paginada
+        de todos os snapshots da conta, agrupada localmente. O scan só
+        compensa quando os clusters pedidos são boa parte da frota (ver
+        SNAPSHOT_SCAN_FRACTION); sem fleet_size, vale BULK_SCAN_THRESHOLD.
+        
+        Args:
+            cluster_identifiers (list): Clusters desejados
+            snapshot_type (str): 'manual', 'automated', ou 'all'
+            page_size (int, optional): Itens por página da API
+            strategy (str): 'cluster' (uma chamada por cluster), 'scan' ou 'auto'
+            fleet_size (int, optional): Clusters na região, quando já conhecido
+            
+        Returns:
+            dict: Identificador do cluster -> lista de snapshots
+        """
+        cluster_identifiers = list(dict.fromkeys(cluster_identifiers))
+        grouped = {identifier: [] for identifier in cluster_identifiers}
+        if not cluster_identifiers:
+            return grouped
+        
+        if strategy == 'auto':
+            if fleet_size:
+                scan = len(cluster_identifiers) >= max(1, fleet_size) * SNAPSHOT_SCAN_FRACTION
+            else:
+                scan = len(cluster_identifiers) >= BULK_SCAN_THRESHOLD
+            strategy = 'scan' if scan else 'cluster'
+        if strategy not in ('scan', 'cluster'):
+            raise ValueError(f"Estratégia inválida: {strategy}")
+        
+        try:
+            if strategy == 'scan':
+                for snapshot in self.iter_snapshots(None, snapshot_type, page_size):
+                    if snapshot['cluster_identifier'] in grouped:
+                        grouped[snapshot['cluster_identifier']].append(snapshot)
+            else:
+                for identifier in cluster_identifiers:
+                    grouped[identifier].extend(self.iter_snapshots(identifier, snapshot_type, page_size))
+            
+            total = sum(len(items) for items in grouped.values())
+            logger.info("📋 Encontrados %s snapshots em %s clusters", total, len(grouped))
+            return grouped
+            
+        except (ThrottlingError, AccessDeniedError, TransientError):
+            raise
+        except DocumentDBError as e:
+            logger.error("❌ Erro ao listar snapshots: %s", e)
+            return grouped
+
+    def get_cluster_metrics(self, cluster_identifier, hours=1):
+        """
+        Obtém métricas do CloudWatch para um cluster
+        
+        Args:
+            cluster_identifier (str): Identificador do cluster
+            hours (int): Número de horas para buscar métricas
+            
+        Returns:
+            dict: Métricas do cluster
+        """
+        fleet_metrics = self.get_fleet_metrics([cluster_identifier], hours)
+        if cluster_identifier not in fleet_metrics:
+            return {}
+        
+        logger.info("📊 Métricas obtidas para cluster: %s", cluster_identifier)
+        return fleet_metrics[cluster_identifier]
+
+    def get_fleet_metrics(self, cluster_identifiers, hours=1, metric_names=None, period=None):
+        """
+        Obtém métricas do CloudWatch para vários clusters de uma só vez
+        
+        Todas as combinações cluster/métrica/estatística são agrupadas em
+        chamadas GetMetricData de até 500 consultas cada, em vez de uma
+        chamada get_metric_statistics por métrica. Janelas longas são
+        divididas em blocos pelo metric_planner.
+        
+        Args:
+            cluster_identifiers (list): Identificadores dos clusters
+            hours (int): Número de horas para buscar métricas
+            metric_names (list, optional): Métricas desejadas (padrão: DEFAULT_METRICS)
+            period (int or str, optional): Período em segundos (padrão: 300); 'auto'
+                                           usa o menor disponível para a janela
+                                           (metric_planner.choose_period)
+            
+        Returns:
+            dict: Métricas por cluster, no mesmo formato de get_cluster_metrics;
+                  com period informado, cada métrica traz também 'period_seconds'
+        """
+        try:
+            end_time = datetime.utcnow()
+            start_time = end_time - timedelta(hours=hours)
+            metric_names = list(metric_names or DEFAULT_METRICS)
+            report_period = period is not None
+            if period == 'auto':
+                period = self.metric_planner.choose_period(start_time, end_time)
+            resolved_period = period or 300  # 5 minutos
+            
+            # Com histórico local, só as lacunas são buscadas no CloudWatch; o
+            # histórico guarda só a resolução base, outros períodos vão direto à API
+            if self.metric_store and resolved_period == MetricStore.RESOLUTIONS[0][1]:
+                fetch = functools.partial(self.metric_store.fetch, self._fetch_metric_series)
+            else:
+                fetch = self._fetch_metric_series
+            
+            series = fetch(
+                cluster_identifiers,
+                metric_names,
+                start_time,
+                end_time,
+                period=resolved_period,
+                statistics=('Average', 'Maximum')
+            )
+            
+            fleet_metrics = {}
+            for cluster_identifier in cluster_identifiers:
+                metrics = {}
+                for metric_name in metric_names:
+                    stats = series[cluster_identifier][metric_name]
+                    if stats is None:
+                        metrics[metric_name] = None
+                        continue
+                    
+                    average = stats['Average']
+                    maximum = stats['Maximum']
+                    timestamps = {ts for ts, _ in average} | {ts for ts, _ in maximum}
+                    metrics[metric_name] = {
+                        'latest_average': average[-1][1] if average else 0,
+                        'latest_maximum': maximum[-1][1] if maximum else 0,
+                        'datapoints_count': len(timestamps),
+                        'period_hours': hours
+                    }
+                    if report_period:
+                        metrics[metric_name]['period_seconds'] = resolved_period
+                fleet_metrics[cluster_identifier] = metrics
+            
+            return fleet_metrics
+            
+        except (ThrottlingError, AccessDeniedError, TransientError):
+            raise
+        except Exception as e:
+            logger.error("❌ Erro ao obter métricas: %s", e)
+            return {}
+
+    def _fetch_metric_series(self, cluster_identifiers, metric_names, start_time,
+                             end_time, period=None, statistics=('Average',)):
+        """
+        Busca séries de métricas via GetMetricData, em blocos planejados
+        
+        Args:
+            cluster_identifiers (list): Identificadores dos clusters
+            metric_names (list): Nomes das métricas
+            start_time (datetime): Início da janela
+            end_time (datetime): Fim da janela
+            period (int, optional): Período em segundos (padrão: escolhido pelo
+                                    metric_planner conforme a janela)
+            statistics (tuple): Estatísticas desejadas
+            
+        Returns:
+            dict: {cluster: {métrica: {estatística: [(timestamp, valor), ...]}}}
+                  com None nas métricas cuja consulta ou bloco falhou
+                  
+        Raises:
+            ThrottlingError, AccessDeniedError, TransientError: Só quando todas
+                                                                as consultas falharam
+        """
+        period = period or self.metric_planner.choose_period(start_time, end_time)
+        keys = [
+            (cluster, metric, stat)
+            for cluster in cluster_identifiers
+            for metric in metric_names
+            for stat in statistics
+        ]
+        results = self.metric_planner.fetch(self._get_metric_data, keys, start_time, end_time, period)
+        
+        series = {
+            cluster: {metric: {} for metric in metric_names}
+            for cluster in cluster_identifiers
+        }
+        errors = [points for points in results.values() if isinstance(points, Exception)]
+        if errors and len(errors) == len(results):
+            # Nada a devolver: o erro tipado vai para quem decide esperar ou desistir
+            for error in errors:
+                if isinstance(error, (ThrottlingError, AccessDeniedError, TransientError)):
+                    raise error
+        
+        failures = set()
+        for (cluster, metric, stat), points in results.items():
+            if isinstance(points, Exception):
+                # Um bloco que falhou afeta muitas séries: registra o erro uma vez
+                if id(points) not in failures:
+                    failures.add(id(points))
+                    logger.warning("⚠️ Erro ao obter lote de métricas: %s", points)
+                series[cluster][metric] = None
+            elif series[cluster][metric] is not None:
+                series[cluster][metric][stat] = points
+        return series
+
+    def _get_metric_data(self, keys, start_time, end_time, period):
+        """
+        Uma consulta GetMetricData (com todas as páginas) para até 500 séries
+        
+        Args:
+            keys (list): Séries (cluster, métrica, estatística)
+            start_time (datetime): Início do bloco
+            end_time (datetime): Fim do bloco
+            period (int): Período em segundos
+            
+        Returns:
+            dict: (cluster, métrica, estatística) -> [(timestamp, valor), ...], ou
+                  DocumentDBError para consultas que o CloudWatch recusou
+        """
+        # Cada consulta recebe um Id curto; o índice devolve o resultado à série
+        queries = []
+        query_index = {}
+        for key in keys:
+            cluster, metric, stat = key
+            query_id = f"q{len(queries)}"
+            query_index[query_id] = key
+            queries.append({
+                'Id': query_id,
+                'MetricStat': {
+                    'Metric': {
+                        'Namespace': 'AWS/DocDB',
+                        'MetricName': metric,
+                        'Dimensions': [
+                            {
+                                'Name': 'DBClusterIdentifier',
+                                'Value': cluster
+                            }
+                        ]
+                    },
+                    'Period': period,
+                    'Stat': stat
+                },
+                'ReturnData': True
+            })
+        
+        points = {key: [] for key in keys}
+        params = {
+            'MetricDataQueries': queries,
+            'StartTime': start_time,
+            'EndTime': end_time,
+            'ScanBy': 'TimestampAscending'
+        }
+        # Resultados de uma mesma consulta podem vir em várias páginas
+        while True:
+            response = self._call('cloudwatch', 'get_metric_data', **params)
+            for result in response['MetricDataResults']:
+                key = query_index[result['Id']]
+                if result.get('StatusCode') in METRIC_DATA_FAILED_STATUSES:
+                    # Uma consulta com erro não invalida as outras do lote
+                    messages = '; '.join(m.get('Value', '') for m in result.get('Messages', []))
+                    points[key] = DocumentDBError(
+                        f"GetMetricData: {result['StatusCode']} - {messages or key}",
+                        result['StatusCode'], 'GetMetricData'
+                    )
+                elif isinstance(points[key], list):
+                    points[key].extend(zip(result['Timestamps'], result['Values']))
+            
+            if not response.get('NextToken'):
+                break
+            params['NextToken'] = response['NextToken']
+        return points
+
+    def iter_parameter_groups(self, page_size=None):
+        """
+        Itera sobre parameter groups disponíveis
+        
+        Args:
+            page_size (int, optional): Itens por página da API
+            
+        Yields:
+            dict: Parameter group com nome, família e descrição
+        """
+        for pg in self._paginate('describe_db_cluster_parameter_groups', 'DBClusterParameterGroups', page_size):
+            yield {
+                'name': pg['DBClusterParameterGroupName'],
+                'family': pg['DBParameterGroupFamily'],
+                'description': pg.get('Description', 'N/A')
+            }
+
+    def list_parameter_groups(self, page_size=None):
+        """
+        Lista parameter groups disponíveis
+        
+        Args:
+            page_size (int, optional): Itens por página da API
+            
+        Returns:
+            list: Lista de parameter groups
+        """
+        try:
+            parameter_groups = list(self.iter_parameter_groups(page_size))
+            
+            logger.info("📋 Encontrados %s parameter groups", len(parameter_groups))
+            return parameter_groups
+            
+        except (ThrottlingError, AccessDeniedError, TransientError):
+            raise
+        except DocumentDBError as e:
+            logger.error("❌ Erro ao listar parameter groups: %s", e)
+            return []
+
+    @staticmethod
+    def _normalize_parameter(param):
+        """
+        Converte um parâmetro da resposta describe_db_cluster_parameters no formato resumido
+        
+        Args:
+            param (dict): Item de Parameters
+            
+        Returns:
+            dict: Parâmetro com valor e metadados
+        """
+        return {
+            'name': param['ParameterName'],
+            'value': param.get('ParameterValue', 'N/A'),
+            'description': param.get('Description', 'N/A'),
+            'is_modifiable': param.get('IsModifiable', False),
+            'data_type': param.get('DataType', 'N/A'),
+            'allowed_values': param.get('AllowedValues', 'N/A')
+        }
+
+    def iter_parameter_group_parameters(self, parameter_group_name, page_size=None, compact=False):
+        """
+        Itera sobre os parâmetros de um parameter group específico
+        
+        Args:
+            parameter_group_name (str): Nome do parameter group
+            page_size (int, optional): Itens por página da API
+            compact (bool): Devolve ParameterRecord em vez de dict
+            
+        Yields:
+            dict: Parâmetro com valor e metadados
+        """
+        normalize = ParameterRecord.from_api if compact else self._normalize_parameter
+        for param in self._paginate('describe_db_cluster_parameters', 'Parameters', page_size,
+                                    DBClusterParameterGroupName=parameter_group_name):
+            yield normalize(param)
+
+    def get_parameter_group_parameters(self, parameter_group_name, page_size=None, compact=False):
+        """
+        Obtém parâmetros de um parameter group específico
+        
+        Args:
+            parameter_group_name (str): Nome do parameter group
+            page_size (int, optional): Itens por página da API
+            compact (bool): Devolve ParameterRecord em vez de dict
+            
+        Returns:
+            list: Lista de parâmetros
+        """
+        try:
+            parameters = list(self.iter_parameter_group_parameters(parameter_group_name, page_size, compact))
+            
+            logger.info("📋 Encontrados %s parâmetros", len(parameters))
+            return parameters
+            
+        except (ThrottlingError, AccessDeniedError, TransientError):
+            raise
+        except DocumentDBError as e:
+            logger.error("❌ Erro ao obter parâmetros: %s", e)
+            return []
+
+    def iter_cluster_events(self, cluster_identifier, hours=24, page_size=None, compact=False):
+        """
+        Itera sobre eventos recentes de um cluster
+        
+        Args:
+            cluster_identifier (str): Identificador do cluster
+            hours (int): Horas para buscar eventos
+            page_size (int, optional): Itens por página da API
+            compact (bool): Devolve EventRecord em vez de dict
+            
+        Yields:
+            dict: Evento com data, mensagem e categorias
+        """
+        start_time = datetime.utcnow() - timedelta(hours=hours)
+        
+        for event in self._paginate('describe_events', 'Events', page_size,
+                                    SourceIdentifier=cluster_identifier,
+                                    SourceType='db-cluster',
+                                    StartTime=start_time,
+                                    Duration=hours * 60):  # em minutos
+            yield EventRecord.from_api(event, 'db-cluster') if compact else self._normalize_event(event)
+
+    def iter_events(self, source_type, start_time, source_identifier=None, page_size=None, compact=False):
+        """
+        Itera sobre eventos de um tipo de fonte a partir de um instante
+        
+        Sem source_identifier, uma única listagem paginada cobre todas as
+        fontes do tipo (todos os clusters ou todas as instâncias)
+        
+        Args:
+            source_type (str): 'db-cluster', 'db-instance', 'db-cluster-snapshot'...
+            start_time (datetime): Início da janela
+            source_identifier (str, optional): Fonte específica
+            page_size (int, optional): Itens por página da API
+            compact (bool): Devolve EventRecord em vez de dict
+            
+        Yields:
+            dict: Evento com data, mensagem, categorias, fonte e tipo da fonte
+        """
+        params = {'SourceType': source_type, 'StartTime': start_time}
+        if source_identifier:
+            params['SourceIdentifier'] = source_identifier
+        
+        for event in self._paginate('describe_events', 'Events', page_size, **params):
+            if compact:
+                yield EventRecord.from_api(event, source_type)
+                continue
+            event_info = self._normalize_event(event)
+            event_info['source_type'] = event.get('SourceType', source_type)
+            yield event_info
+
+    @staticmethod
+    def _normalize_event(event):
+        """
+        Converte um evento da API no formato usado pelo manager
+        """
+        return {
+            'date': event.get('Date', 'N/A'),
+            'message': event.get('Message', 'N/A'),
+            'event_categories': event.get('EventCategories', []),
+            'source_id': event.get('SourceIdentifier', 'N/A')
+        }
+
+    @staticmethod
+    def log_group_name(cluster_identifier, kind='profiler'):
+        """
+        Nome do log group exportado pelo cluster para o CloudWatch Logs
+        
+        Args:
+            cluster_identifier (str): Identificador do cluster
+            kind (str): 'profiler' ou 'audit'
+            
+        Returns:
+            str: Nome do log group
+        """
+        return f"/aws/docdb/{cluster_identifier}/{kind}"
+
+    def iter_log_events(self, log_group_name, start_time, end_time=None, filter_pattern=None,
+                        page_size=None):
+        """
+        Itera sobre eventos de um log group, uma página de filter_log_events por vez
+        
+        Args:
+            log_group_name (str): Log group (ver log_group_name)
+            start_time (datetime): Início da janela
+            end_time (datetime, optional): Fim da janela (padrão: agora)
+            filter_pattern (str, optional): Filtro aplicado pelo CloudWatch Logs,
+                                            ex: '{ $.millis >= 100 }'
+            page_size (int, optional): Eventos por página (máximo 10.000)
+            
+        Yields:
+            dict: Evento com timestamp (ms), mensagem e log stream
+        """
+        params = {
+            'logGroupName': log_group_name,
+            'startTime': int(_to_epoch(start_time) * 1000)
+        }
+        if end_time is not None:
+            params['endTime'] = int(_to_epoch(end_time) * 1000)
+        if filter_pattern:
+            params['filterPattern'] = filter_pattern
+        if page_size:
+            params['limit'] = page_size
+        
+        while True:
+            response = self._call('logs', 'filter_log_events', **params)
+            for event in response.get('events', []):
+                yield {
+                    'timestamp': event['timestamp'],
+                    'message': event['message'],
+                    'stream': event.get('logStreamName')
+                }
+            
+            # Páginas vazias com nextToken são normais: a busca continua no servidor
+            if not response.get('nextToken'):
+                break
+            params['nextToken'] = response['nextToken']
+
+    def check_cluster_events(self, cluster_identifier, hours=24, page_size=None, compact=False):
+        """
+        Verifica eventos recentes de um cluster
+        
+        Args:
+            cluster_identifier (str): Identificador do cluster
+            hours (int): Horas para buscar eventos
+            page_size (int, optional): Itens por página da API
+            compact (bool): Devolve EventRecord em vez de dict
+            
+        Returns:
+            list: Lista de eventos
+        """
+        try:
+            events = list(self.iter_cluster_events(cluster_identifier, hours, page_size, compact))
+            
+            logger.info("📋 Encontrados %s eventos nas últimas %s horas", len(events), hours)
+            return events
+            
+        except (ThrottlingError, AccessDeniedError, TransientError):
+            raise
+        except DocumentDBError as e:
+            logger.error("❌ Erro ao verificar eventos: %s", e)
+            return []
+
+    @staticmethod
+    def _build_connection_string(cluster_details, username='docdbadmin'):
+        """
+        Monta a string de conexão MongoDB a partir dos detalhes do cluster
+        
+        Args:
+            cluster_details (dict): Resultado de get_cluster_details
+            username (str): Nome de usuário
+            
+        Returns:
+            str: String de conexão MongoDB
+        """
+        endpoint = cluster_details['connectivity']['endpoint']
+        port = cluster_details['connectivity']['port']
+        
+        # String de conexão básica (sem senha por segurança)
+        return (
+            f"mongodb://{username}:PASSWORD@{endpoint}:{port}/"
+            f"?tls=true&tlsCAFile=global-bundle.pem&replicaSet=rs0"
+            f"&readPreference=secondaryPreferred&retryWrites=false"
+        )
+
+    def generate_connection_string(self, cluster_identifier, username='docdbadmin'):
+        """
+        Gera string de conexão MongoDB para o cluster
+        
+        Args:
+            cluster_identifier (str): Identificador do cluster
+            username (str): Nome de usuário
+            
+        Returns:
+            str: String de conexão MongoDB
+        """
+        try:
+            cluster_details = self.get_cluster_details(cluster_identifier)
+            if not cluster_details:
+                return None
+            
+            connection_string = self._build_connection_string(cluster_details, username)
+            
+            logger.info("🔗 String de conexão gerada para: %s", cluster_identifier)
+            logger.info("⚠️ Substitua 'PASSWORD' pela senha real")
+            
+            return connection_string
+            
+        except (ThrottlingError, AccessDeniedError, TransientError):
+            raise
+        except Exception as e:
+            logger.error("❌ Erro ao gerar string de conexão: %s", e)
+            return None
+
+    def probe_instance_endpoints(self, cluster_identifier, prober=None):
+        """
+        Mede a latência até cada instância do cluster
+        
+        Args:
+            cluster_identifier (str): Identificador do cluster
+            prober (EndpointProber, optional): Medidor configurado (padrão: EndpointProber())
+            
+        Returns:
+            list: Instâncias com as latências, da mais rápida à mais lenta
+        """
+        instances = self.list_instances(cluster_identifier)
+        return (prober or EndpointProber()).probe(instances)
+
+    @staticmethod
+    def _build_latency_aware_connection(cluster_details, ranking, username='docdbadmin',
+                                        local_threshold_ms=15):
+        """
+        Monta strings de conexão a partir do ranking de latência das instâncias
+        
+        Args:
+            cluster_details (dict): Resultado de get_cluster_details
+            ranking (list): Resultado de EndpointProber.probe
+            username (str): Nome de usuário
+            local_threshold_ms (int): Janela de latência do driver para escolher
+                                      entre os membros mais próximos
+            
+        Returns:
+            dict: 'connection_string' (lista de hosts ordenada por latência e
+                  readPreference=nearest), 'nearest_reader' (conexão direta à
+                  réplica mais próxima), 'hosts', 'local_az' e 'ranking'
+        """
+        reachable = [r for r in ranking if r['connect_ms'] is not None]
+        if not reachable:
+            # Sem medições (ex: fora da VPC): volta ao endpoint do cluster
+            return {
+                'connection_string': DocumentDBManager._build_connection_string(cluster_details, username),
+                'nearest_reader': None,
+                'hosts': [],
+                'local_az': None,
+                'ranking': ranking
+            }
+        
+        tls_options = "tls=true&tlsCAFile=global-bundle.pem"
+        writers = {m['identifier'] for m in cluster_details.get('members', []) if m['is_writer']}
+        hosts = [f"{r['endpoint']}:{r['port']}" for r in reachable]
+        readers = [r for r in reachable if r['identifier'] not in writers]
+        
+        # A lista de sementes segue a latência; com nearest o driver lê do
+        # membro mais próximo (réplica ou primário) dentro de localThresholdMS
+        connection_string = (
+            f"mongodb://{username}:PASSWORD@{','.join(hosts)}/"
+            f"?{tls_options}&replicaSet=rs0&readPreference=nearest"
+            f"&localThresholdMS={local_threshold_ms}&retryWrites=false"
+        )
+        
+        nearest_reader = None
+        if readers:
+            nearest_reader = (
+                f"mongodb://{username}:PASSWORD@{readers[0]['endpoint']}:{readers[0]['port']}/"
+                f"?{tls_options}&directConnection=true&readPreference=secondaryPreferred"
+                f"&retryWrites=false"
+            )
+        
+        return {
+            'connection_string': connection_string,
+            'nearest_reader': nearest_reader,
+            'hosts': hosts,
+            'local_az': reachable[0].get('availability_zone'),
+            'ranking': ranking
+        }
+
+    def generate_latency_aware_connection_string(self, cluster_identifier, username='docdbadmin',
+                                                 prober=None, local_threshold_ms=15):
+        """
+        Gera strings de conexão ajustadas à latência medida a partir deste cliente
+        
+        Args:
+            cluster_identifier (str): Identificador do cluster
+            username (str): Nome de usuário
+            prober (EndpointProber, optional): Medidor configurado
+            local_threshold_ms (int): Janela de latência do driver (localThresholdMS)
+            
+        Returns:
+            dict: Ver _build_latency_aware_connection (None se o cluster não existir)
+        """
+        try:
+            cluster_details = self.get_cluster_details(cluster_identifier)
+            if not cluster_details:
+                return None
+            
+            ranking = self.probe_instance_endpoints(cluster_identifier, prober)
+            connection = self._build_latency_aware_connection(
+                cluster_details, ranking, username, local_threshold_ms
+            )
+            
+            logger.info("🔗 String de conexão por latência gerada para: %s (AZ mais próxima: %s)",
+                        cluster_identifier, connection['local_az'])
+            logger.info("⚠️ Substitua 'PASSWORD' pela senha real")
+            return connection
+            
+        except (ThrottlingError, AccessDeniedError, TransientError):
+            raise
+        except Exception as e:
+            logger.error("❌ Erro ao gerar string de conexão: %s", e)
+            return None
+
+    def print_cluster_summary(self, cluster_identifier, inventory=None):
+        """
+        Imprime um resumo completo do cluster
+        
+        Args:
+            cluster_identifier (str): Identificador do cluster
+            inventory (InventoryCache, optional): Lê detalhes e instâncias do último
+                                                  estado conhecido, sem describe na
+                                                  API; o cache vencido se atualiza
+                                                  em segundo plano
+        """
+        if inventory is None:
+            details = self.get_cluster_details(cluster_identifier)
+            instances = self.list_instances(cluster_identifier)
+            conn_str = self.generate_connection_string(cluster_identifier)
+        else:
+            details = next((
+                cluster for cluster in inventory.get('cluster_details')
+                if cluster['basic_info']['identifier'] == cluster_identifier
+            ), None)
+            instances = [
+                instance for instance in inventory.get('instances')
+                if instance['cluster_identifier'] == cluster_identifier
+            ]
+            conn_str = self._build_connection_string(details) if details else None
+        metrics = self.get_cluster_metrics(cluster_identifier, 1)
+        
+        self._print_summary_report(cluster_identifier, details, instances, metrics, conn_str)
+
+    def print_fleet_summary(self, cluster_identifiers=None, page_size=None):
+        """
+        Imprime o resumo de vários clusters com um número fixo de chamadas
+        
+        Detalhes, instâncias e métricas são obtidos em lote (describe com
+        filtros de vários valores e GetMetricData agrupado), em vez de
+        repetir as chamadas de print_cluster_summary para cada cluster.
+        
+        Args:
+            cluster_identifiers (list, optional): Clusters desejados (todos se None)
+            page_size (int, optional): Itens por página da API
+        """
+        try:
+            details = self.get_clusters_details(cluster_identifiers, page_size)
+        except (ThrottlingError, AccessDeniedError, TransientError):
+            raise
+        except DocumentDBError as e:
+            logger.error("❌ Erro ao obter detalhes dos clusters: %s", e)
+            return
+        
+        identifiers = list(details)
+        found = [identifier for identifier in identifiers if details[identifier]]
+        for identifier in identifiers:
+            if not details[identifier]:
+                logger.error("❌ Cluster '%s' não encontrado", identifier)
+        
+        instances = self.list_instances_by_cluster(found, page_size)
+        metrics = self.get_fleet_metrics(found, 1) if found else {}
+        
+        for identifier in found:
+            self._print_summary_report(
+                identifier,
+                details[identifier],
+                instances.get(identifier, []),
+                metrics.get(identifier, {}),
+                self._build_connection_string(details[identifier])
+            )
+
+    @staticmethod
+    def _print_summary_report(cluster_identifier, details, instances, metrics, conn_str):
+        """
+        Imprime o resumo de um cluster a partir dos dados já coletados
+        
+        Args:
+            cluster_identifier (str): Identificador do cluster
+            details (dict): Resultado de get_cluster_details
+            instances (list): Resultado de list_instances
+            metrics (dict): Resultado de get_cluster_metrics
+            conn_str (str): Resultado de generate_connection_string
+        """
+        print(f"\n{'='*60}")
+        print(f"RESUMO DO CLUSTER: {cluster_identifier}")
+        print(f"{'='*60}")
+        
+        # Detalhes básicos
+        if details:
+            print(f"\n📋 INFORMAÇÕES BÁSICAS:")
+            for key, value in details['basic_info'].items():
+                print(f"  {key.replace('_', ' ').title()}: {value}")
+            
+            print(f"\n🔗 CONECTIVIDADE:")
+            for key, value in details['connectivity'].items():
+                print(f"  {key.replace('_', ' ').title()}: {value}")
+            
+            print(f"\n⚙️ CONFIGURAÇÃO:")
+            for key, value in details['configuration'].items():
+                print(f"  {key.replace('_', ' ').title()}: {value}")
+        
+        # Instâncias
+        print(f"\n🖥️ INSTÂNCIAS:")
+        for instance in instances:
+            print(f"  • {instance['identifier']} ({instance['instance_class']}) - {instance['status']}")
+        
+        # Métricas recentes
+        print(f"\n📊 MÉTRICAS (última hora):")
+        for metric_name, metric_data in metrics.items():
+            if metric_data:
+                avg = metric_data['latest_average']
+                max_val = metric_data['latest_maximum']
+                print(f"  • {metric_name}: Avg={avg:.2f}, Max={max_val:.2f}")
+        
+        # String de conexão
+        print(f"\n🔗 STRING DE CONEXÃO:")
+        if conn_str:
+            print(f"  {conn_str}")
+        
+        print(f"\n{'='*60}")
+
+
+# ============================================================================
+# REGISTROS COMPACTOS
+# ============================================================================
+
+def _intern(value):
+    """
+    Interna strings repetidas (status, engine, classe...) para compartilhar o objeto
+    """
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class CompactRecord(Mapping):
+    """
+    Base dos registros com __slots__ usados no lugar dos dicionários
+    
+    Cada registro guarda só os valores, sem dicionário por item; campos que
+    a API não devolveu ficam como None nos atributos. A visão de dicionário
+    (record['status'], get, items, dict(record)) devolve 'N/A' nesses
+    campos, como os dicionários de sempre, então quem já consome as listas
+    continua funcionando.
+    """
+    __slots__ = ()
+    # Campos exibidos como 'N/A' na visão de dicionário quando ausentes
+    OPTIONAL = ()
+    
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+    
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        value = getattr(self, key)
+        if value is None and key in self.OPTIONAL:
+            return 'N/A'
+        return value
+    
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+    
+    def __iter__(self):
+        return iter(self.__slots__)
+    
+    def __len__(self):
+        return len(self.__slots__)
+    
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+    
+    def to_dict(self, legacy=True):
+        """
+        Converte o registro em dicionário
+        
+        Args:
+            legacy (bool): Usa 'N/A' nos campos ausentes (False mantém None)
+            
+        Returns:
+            dict: Campos do registro
+        """
+        if legacy:
+            return dict(self)
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class ClusterRecord(CompactRecord):
+    """
+    Cluster no formato resumido de list_clusters
+    """
+    __slots__ = ('identifier', 'status', 'engine', 'engine_version', 'endpoint',
+                 'reader_endpoint', 'port', 'multi_az', 'backup_retention', 'created_time')
+    OPTIONAL = ('endpoint', 'reader_endpoint', 'created_time')
+    
+    @classmethod
+    def from_api(cls, cluster):
+        """
+        Cria o registro a partir de um item de DBClusters
+        """
+        return cls(
+            cluster['DBClusterIdentifier'],
+            _intern(cluster['Status']),
+            _intern(cluster['Engine']),
+            _intern(cluster['EngineVersion']),
+            cluster.get('Endpoint'),
+            cluster.get('ReaderEndpoint'),
+            cluster.get('Port', 27017),
+            cluster.get('MultiAZ', False),
+            cluster.get('BackupRetentionPeriod', 0),
+            cluster.get('ClusterCreateTime')
+        )
+
+
+class InstanceRecord(CompactRecord):
+    """
+    Instância no formato resumido de list_instances
+    """
+    __slots__ = ('identifier', 'status', 'instance_class', 'availability_zone', 'cluster_identifier',
+                 'endpoint', 'port', 'promotion_tier', 'created_time')
+    OPTIONAL = ('availability_zone', 'cluster_identifier', 'endpoint', 'created_time')
+    
+    @classmethod
+    def from_api(cls, instance):
+        """
+        Cria o registro a partir de um item de DBInstances
+        """
+        endpoint = instance.get('Endpoint') or {}
+        return cls(
+            instance['DBInstanceIdentifier'],
+            _intern(instance['DBInstanceStatus']),
+            _intern(instance['DBInstanceClass']),
+            _intern(instance.get('AvailabilityZone')),
+            _intern(instance.get('DBClusterIdentifier')),
+            endpoint.get('Address'),
+            endpoint.get('Port', 27017),
+            instance.get('PromotionTier', 0),
+            instance.get('InstanceCreateTime')
+        )
+
+
+class SnapshotRecord(CompactRecord):
+    """
+    Snapshot no formato resumido de list_snapshots
+    """
+    __slots__ = ('identifier', 'cluster_identifier', 'status', 'snapshot_type', 'created_time',
+                 'allocated_storage', 'engine', 'engine_version')
+    OPTIONAL = ('created_time', 'engine', 'engine_version')
+    
+    @classmethod
+    def from_api(cls, snapshot):
+        """
+        Cria o registro a partir de um item de DBClusterSnapshots
+        """
+        return cls(
+            snapshot['DBClusterSnapshotIdentifier'],
+            _intern(snapshot['DBClusterIdentifier']),
+            _intern(snapshot['Status']),
+            _intern(snapshot['SnapshotType']),
+            snapshot.get('SnapshotCreateTime'),
+            snapshot.get('AllocatedStorage', 0),
+            _intern(snapshot.get('Engine')),
+            _intern(snapshot.get('EngineVersion'))
+        )
+
+
+class EventRecord(CompactRecord):
+    """
+    Evento no formato de check_cluster_events e iter_events
+    
+    As categorias viram uma tupla de strings internadas; a mensagem não é
+    internada, porque costuma ser única por evento.
+    """
+    __slots__ = ('date', 'message', 'event_categories', 'source_id', 'source_type')
+    OPTIONAL = ('date', 'message', 'source_id')
+    
+    @classmethod
+    def from_api(cls, event, source_type=None):
+        """
+        Cria o registro a partir de um item de Events
+        """
+        return cls(
+            event.get('Date'),
+            event.get('Message'),
+            tuple(_intern(category) for category in event.get('EventCategories', ())),
+            _intern(event.get('SourceIdentifier')),
+            _intern(event.get('SourceType', source_type))
+        )
+
+
+class ParameterRecord(CompactRecord):
+    """
+    Parâmetro no formato de get_parameter_group_parameters
+    
+    Nome, descrição, tipo e valores permitidos se repetem em todos os
+    parameter groups da mesma família e são internados.
+    """
+    __slots__ = ('name', 'value', 'description', 'is_modifiable', 'data_type', 'allowed_values')
+    OPTIONAL = ('value', 'description', 'data_type', 'allowed_values')
+    
+    @classmethod
+    def from_api(cls, param):
+        """
+        Cria o registro a partir de um item de Parameters
+        """
+        return cls(
+            _intern(param['ParameterName']),
+            _intern(param.get('ParameterValue')),
+            _intern(param.get('Description')),
+            param.get('IsModifiable', False),
+            _intern(param.get('DataType')),
+            _intern(param.get('AllowedValues'))
+        )
+
+
+# ============================================================================
+# INSTRUMENTAÇÃO DAS CHAMADAS
+# ============================================================================
+
+class MetricsRecorder:
+    """
+    Sink em memória para o metrics_hook do RequestExecutor
+    
+    Agrega por serviço/operação: chamadas, erros por código, retentativas,
+    throttlings, espera no limite de taxa, histograma de latência (buckets
+    fixos, como no Prometheus), bytes recebidos e itens por página.
+    """
+    
+    def __init__(self, latency_buckets=None):
+        """
+        Inicializa o sink
+        
+        Args:
+            latency_buckets (tuple, optional): Limites superiores dos buckets de
+                                               latência em segundos (padrão: LATENCY_BUCKETS)
+        """
+        self.latency_buckets = tuple(latency_buckets or LATENCY_BUCKETS)
+        self._operations = {}
+        self._lock = threading.Lock()
+
+    def _new_entry(self):
+        return {
+            'calls': 0,
+            'errors': {},
+            'attempts': 0,
+            'retries': 0,
+            'throttles': 0,
+            'rate_limit_wait': 0.0,
+            'latency_sum': 0.0,
+            # Um bucket a mais para latências acima do último limite (+Inf)
+            'latency_buckets': [0] * (len(self.latency_buckets) + 1),
+            'response_bytes': 0,
+            'pages': 0,
+            'items': 0
+        }
+
+    def __call__(self, stats):
+        """
+        Registra uma chamada (assinatura de metrics_hook)
+        
+        Args:
+            stats (dict): Estatísticas da chamada geradas pelo RequestExecutor
+        """
+        key = (stats['service'], stats['operation'])
+        latency = stats['latency_seconds']
+        bucket = bisect_left(self.latency_buckets, latency)
+        
+        with self._lock:
+            entry = self._operations.get(key)
+            if entry is None:
+                entry = self._operations[key] = self._new_entry()
+            entry['calls'] += 1
+            entry['attempts'] += stats['attempts']
+            entry['retries'] += stats['retries']
+            entry['throttles'] += stats['throttles']
+            entry['rate_limit_wait'] += stats['rate_limit_wait']
+            entry['latency_sum'] += latency
+            entry['latency_buckets'][bucket] += 1
+            if stats['error']:
+                entry['errors'][stats['error']] = entry['errors'].get(stats['error'], 0) + 1
+            if stats.get('response_bytes'):
+                entry['response_bytes'] += stats['response_bytes']
+            if stats.get('items') is not None:
+                entry['pages'] += 1
+                entry['items'] += stats['items']
+
+    def snapshot(self):
+        """
+        Cópia das métricas agregadas
+        
+        Returns:
+            dict: (serviço, operação) -> métricas
+        """
+        with self._lock:
+            return {
+                key: dict(entry, errors=dict(entry['errors']),
+                          latency_buckets=list(entry['latency_buckets']))
+                for key, entry in self._operations.items()
+            }
+
+    def latency_percentile(self, service, operation, percentile):
+        """
+        Estimativa de percentil de latência a partir do histograma
+        
+        Args:
+            service (str): Serviço AWS
+            operation (str): Nome da operação
+            percentile (float): Percentil entre 0 e 100
+            
+        Returns:
+            float: Limite superior do bucket que contém o percentil (None sem dados;
+                   inf se cair acima do último bucket)
+        """
+        entry = self.snapshot().get((service, operation))
+        if not entry or not entry['calls']:
+            return None
+        
+        target = entry['calls'] * percentile / 100
+        cumulative = 0
+        for limit, count in zip(self.latency_buckets + (float('inf'),), entry['latency_buckets']):
+            cumulative += count
+            if cumulative >= target:
+                return limit
+        return float('inf')
+
+    def reset(self):
+        """
+        Descarta as métricas acumuladas
+        """
+        with self._lock:
+            self._operations.clear()
+
+
+class PrometheusExporter:
+    """
+    Expõe as métricas de um MetricsRecorder no formato texto do Prometheus
+    """
+    
+    def __init__(self, recorder, prefix='docdb_api'):
+        """
+        Inicializa o exportador
+        
+        Args:
+            recorder (MetricsRecorder): Fonte das métricas
+            prefix (str): Prefixo dos nomes de métricas
+        """
+        self.recorder = recorder
+        self.prefix = prefix
+        self._server = None
+
+    @staticmethod
+    def _labels(**labels):
+        pairs = ','.join(
+            '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+            for name, value in labels.items()
+        )
+        return '{' + pairs + '}'
+
+    def render(self):
+        """
+        Gera o texto de exposição (versão 0.0.4)
+        
+        Returns:
+            str: Métricas no formato do Prometheus
+        """
+        p = self.prefix
+        snapshot = sorted(self.recorder.snapshot().items())
+        counters = [
+            ('calls_total', 'calls', 'Chamadas à API (com retentativas contadas uma vez)'),
+            ('attempts_total', 'attempts', 'Tentativas, incluindo retentativas'),
+            ('retries_total', 'retries', 'Retentativas'),
+            ('throttles_total', 'throttles', 'Respostas de throttling'),
+            ('rate_limit_wait_seconds_total', 'rate_limit_wait', 'Espera no limite de taxa local'),
+            ('response_bytes_total', 'response_bytes', 'Bytes recebidos (Content-Length)'),
+            ('pages_total', 'pages', 'Páginas de resultados recebidas'),
+            ('items_total', 'items', 'Itens recebidos nas páginas')
+        ]
+        
+        lines = []
+        for suffix, field, help_text in counters:
+            lines.append(f"# HELP {p}_{suffix} {help_text}")
+            lines.append(f"# TYPE {p}_{suffix} counter")
+            for (service, operation), entry in snapshot:
+                labels = self._labels(service=service, operation=operation)
+                lines.append(f"{p}_{suffix}{labels} {entry[field]}")
+        
+        lines.append(f"# HELP {p}_errors_total Chamadas que terminaram em erro, por código")
+        lines.append(f"# TYPE {p}_errors_total counter")
+        for (service, operation), entry in snapshot:
+            for code, count in sorted(entry['errors'].items()):
+                labels = self._labels(service=service, operation=operation, code=code)
+                lines.append(f"{p}_errors_total{labels} {count}")
+        
+        lines.append(f"# HELP {p}_call_duration_seconds Latência por chamada, com retentativas")
+        lines.append(f"# TYPE {p}_call_duration_seconds histogram")
+        for (service, operation), entry in snapshot:
+            cumulative = 0
+            limits = [repr(float(limit)) for limit in self.recorder.latency_buckets] + ['+Inf']
+            for limit, count in zip(limits, entry['latency_buckets']):
+                cumulative += count
+                labels = self._labels(service=service, operation=operation, le=limit)
+                lines.append(f"{p}_call_duration_seconds_bucket{labels} {cumulative}")
+            labels = self._labels(service=service, operation=operation)
+            lines.append(f"{p}_call_duration_seconds_sum{labels} {entry['latency_sum']}")
+            lines.append(f"{p}_call_duration_seconds_count{labels} {entry['calls']}")
+        
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port=9108, host='127.0.0.1'):
+        """
+        Inicia um endpoint HTTP /metrics em uma thread em segundo plano
+        
+        Args:
+            port (int): Porta TCP (0 escolhe uma livre)
+            host (str): Endereço de escuta
+            
+        Returns:
+            int: Porta efetivamente usada
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        
+        exporter = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                # Cada scrape não precisa virar uma linha no terminal
+                pass
+        
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server.server_address[1]
+
+    def shutdown(self):
+        """
+        Encerra o endpoint HTTP, se ativo
+        """
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class JsonLogSink:
+    """
+    Sink que grava cada chamada como uma linha JSON em um logger
+    """
+    
+    def __init__(self, log=None, level=logging.INFO):
+        """
+        Inicializa o sink
+        
+        Args:
+            log (logging.Logger, optional): Destino (padrão: logger 'docdb.exemplos.calls')
+            level (int): Nível das mensagens
+        """
+        self.log = log or logging.getLogger('docdb.exemplos.calls')
+        self.level = level
+
+    def __call__(self, stats):
+        # Sem handler habilitado para o nível, nem serializa
+        if self.log.isEnabledFor(self.level):
+            self.log.log(self.level, json.dumps(stats, sort_keys=True))
+
+
+# ============================================================================
+# ACOMPANHAMENTO INCREMENTAL DE EVENTOS
+# ============================================================================
+
+class EventFollower:
+    """
+    Acompanha eventos do DocumentDB de forma incremental
+    
+    Para cada fonte guarda um cursor persistido em JSON: a data do último
+    evento entregue e as impressões digitais dos eventos daquele trecho final,
+    para não entregar duplicados quando janelas se sobrepõem. Cada poll faz
+    uma listagem paginada por tipo de fonte, a partir do instante do último
+    poll completo daquele tipo (menos a sobreposição), então uma fonte sem
+    eventos há dias não obriga a listar tudo de novo. Cursores mais antigos
+    que a retenção de eventos da API são descartados.
+    """
+    
+    STATE_VERSION = 2
+    
+    def __init__(self, manager, state_path, sources, initial_hours=1, overlap_seconds=60):
+        """
+        Inicializa o acompanhamento
+        
+        Args:
+            manager (DocumentDBManager): Manager usado para as chamadas
+            state_path (str): Arquivo JSON onde os cursores são persistidos
+            sources (dict): Fontes por tipo, ex: {'db-cluster': ['c1', 'c2'],
+                            'db-instance': None}; None acompanha todas do tipo
+            initial_hours (int): Janela inicial para fontes sem cursor
+            overlap_seconds (int): Sobreposição de segurança entre polls
+        """
+        self.manager = manager
+        self.state_path = state_path
+        self.sources = {
+            source_type: set(ids) if ids is not None else None
+            for source_type, ids in sources.items()
+        }
+        self.initial_hours = initial_hours
+        self.overlap = timedelta(seconds=overlap_seconds)
+        self.cursors, self.polled_until = self._load()
+
+    def _load(self):
+        """
+        Lê os cursores persistidos (ou começa vazio)
+        
+        Returns:
+            tuple: (cursores por fonte, instante do último poll por tipo de fonte)
+        """
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return {}, {}
+        
+        if state.get('version') not in (1, self.STATE_VERSION):
+            return {}, {}
+        cursors = {
+            key: {
+                'last_date': datetime.fromisoformat(cursor['last_date']),
+                'seen': {
+                    fingerprint: datetime.fromisoformat(date)
+                    for fingerprint, date in cursor['seen'].items()
+                }
+            }
+            for key, cursor in state['cursors'].items()
+        }
+        if state['version'] == 1:
+            # Versão 1 não guardava o último poll: parte do cursor mais antigo, como antes
+            polled_until = {}
+            for key, cursor in cursors.items():
+                source_type = key.split('/', 1)[0]
+                polled_until[source_type] = min(polled_until.get(source_type, cursor['last_date']),
+                                                cursor['last_date'])
+            return cursors, polled_until
+        return cursors, {
+            source_type: datetime.fromisoformat(date)
+            for source_type, date in state['polled_until'].items()
+        }
+
+    def save(self):
+        """
+        Persiste os cursores com escrita atômica
+        """
+        state = {
+            'version': self.STATE_VERSION,
+            'cursors': {
+                key: {
+                    'last_date': cursor['last_date'].isoformat(),
+                    'seen': {
+                        fingerprint: date.isoformat()
+                        for fingerprint, date in cursor['seen'].items()
+                    }
+                }
+                for key, cursor in self.cursors.items()
+            },
+            'polled_until': {
+                source_type: date.isoformat()
+                for source_type, date in self.polled_until.items()
+            }
+        }
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    @staticmethod
+    def _fingerprint(event):
+        raw = f"{event['source_id']}|{event['date'].isoformat()}|{event['message']}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+    def _start_time(self, source_type, now):
+        """
+        Calcula o início da janela de um tipo de fonte
+        
+        Parte do último poll completo do tipo, e não do evento mais antigo
+        entre os cursores: uma fonte quieta não alarga a listagem das outras
+        """
+        polled_until = self.polled_until.get(source_type)
+        if polled_until is None:
+            return now - timedelta(hours=self.initial_hours)
+        # A API não devolve eventos além da retenção; pedir antes disso é desperdício
+        return max(polled_until - self.overlap, now - timedelta(seconds=EVENT_RETENTION_SECONDS))
+
+    def poll(self, page_size=None):
+        """
+        Busca apenas os eventos novos desde o último poll
+        
+        Args:
+            page_size (int, optional): Itens por página da API
+            
+        Yields:
+            dict: Eventos novos, em ordem cronológica por tipo de fonte
+        """
+        now = datetime.now(timezone.utc)
+        for source_type, ids in self.sources.items():
+            start_time = self._start_time(source_type, now)
+            
+            for event in self.manager.iter_events(source_type, start_time, page_size=page_size):
+                source_id = event['source_id']
+                if ids is not None and source_id not in ids:
+                    continue
+                # Sem Date (o normalizador devolve 'N/A') não há como posicionar o cursor
+                if not isinstance(event['date'], datetime):
+                    logger.warning("⚠️ Evento sem data ignorado (%s): %s", source_id, event['message'])
+                    continue
+                
+                key = f"{source_type}/{source_id}"
+                cursor = self.cursors.get(key)
+                fingerprint = self._fingerprint(event)
+                if cursor is not None:
+                    if event['date'] < cursor['last_date'] - self.overlap:
+                        continue
+                    if fingerprint in cursor['seen']:
+                        continue
+                
+                if cursor is None:
+                    cursor = self.cursors[key] = {'last_date': event['date'], 'seen': {}}
+                cursor['last_date'] = max(cursor['last_date'], event['date'])
+                cursor['seen'][fingerprint] = event['date']
+                yield event
+            
+            # Listagem completa: o próximo poll do tipo começa daqui
+            self.polled_until[source_type] = now
+            self._prune_seen(now)
+            self.save()
+
+    def _prune_seen(self, now):
+        """
+        Descarta impressões digitais de eventos fora da janela de sobreposição,
+        que nunca mais serão retornados por um poll, e cursores de fontes sem
+        eventos dentro da retenção da API
+        """
+        expired = now - timedelta(seconds=EVENT_RETENTION_SECONDS)
+        self.cursors = {key: cursor for key, cursor in self.cursors.items() if cursor['last_date'] >= expired}
+        for cursor in self.cursors.values():
+            oldest = cursor['last_date'] - self.overlap
+            cursor['seen'] = {
+                fingerprint: date
+                for fingerprint, date in cursor['seen'].items()
+                if date >= oldest
+            }
+
+    def follow(self, interval=60, stop_event=None, page_size=None):
+        """
+        Entrega eventos novos continuamente, um poll a cada intervalo
+        
+        Args:
+            interval (int): Segundos entre polls
+            stop_event (threading.Event, optional): Sinal para encerrar
+            page_size (int, optional): Itens por página da API
+            
+        Yields:
+            dict: Eventos novos, à medida que aparecem
+        """
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            yield from self.poll(page_size)
+            stop_event.wait(interval)
+
+
+# ============================================================================
+# INVENTÁRIO INCREMENTAL
+# ============================================================================
+
+def _json_default(value):
+    """
+    Serializa valores que o módulo json não conhece (datas e registros compactos)
+    """
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, CompactRecord):
+        return value.to_dict()
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+class InventoryTracker:
+    """
+    Compara o inventário atual com o anterior e entrega só as mudanças
+    
+    O último estado conhecido de cada recurso (identificador -> impressão
+    digital do conteúdo e registro) fica persistido em JSON. Cada poll faz
+    uma listagem completa, mas entrega apenas registros adicionados,
+    removidos ou modificados, com a transição de status quando houver.
+    """
+    
+    STATE_VERSION = 1
+    
+    # Tipo de recurso -> método iter_* do manager
+    RESOURCES = {
+        'clusters': 'iter_clusters',
+        'instances': 'iter_instances',
+        'snapshots': 'iter_snapshots'
+    }
+    
+    def __init__(self, manager, state_path, resources=None, emit_initial=True):
+        """
+        Inicializa o acompanhamento do inventário
+        
+        Args:
+            manager (DocumentDBManager): Manager usado para as chamadas
+            state_path (str): Arquivo JSON onde o último estado é persistido
+            resources (list, optional): Tipos acompanhados (padrão: todos de RESOURCES)
+            emit_initial (bool): Se False, o primeiro poll de um tipo sem estado
+                                 salvo só registra o inventário, sem entregar 'added'
+        """
+        self.manager = manager
+        self.state_path = state_path
+        self.resources = list(resources or self.RESOURCES)
+        for resource in self.resources:
+            if resource not in self.RESOURCES:
+                raise ValueError(f"Tipo de recurso inválido: {resource}")
+        self.emit_initial = emit_initial
+        self.state = self._load()
+
+    def _load(self):
+        """
+        Lê o último estado persistido (ou começa vazio)
+        """
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return {}
+        
+        if state.get('version') != self.STATE_VERSION:
+            return {}
+        return state['resources']
+
+    def save(self):
+        """
+        Persiste o último estado com escrita atômica
+        """
+        state = {'version': self.STATE_VERSION, 'resources': self.state}
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    @staticmethod
+    def _fingerprint(record):
+        """
+        Impressão digital do conteúdo de um registro já serializável
+        """
+        raw = json.dumps(record, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+    @staticmethod
+    def _diff(resource, identifier, previous, current):
+        """
+        Descreve a mudança entre duas versões de um registro
+        
+        Args:
+            resource (str): Tipo de recurso
+            identifier (str): Identificador do registro
+            previous (dict): Registro anterior (None se adicionado)
+            current (dict): Registro atual (None se removido)
+            
+        Returns:
+            dict: Mudança com tipo, campos alterados (só em 'modified') e
+                  transição de status
+        """
+        if previous is None:
+            change = 'added'
+        elif current is None:
+            change = 'removed'
+        else:
+            change = 'modified'
+        
+        before = previous or {}
+        after = current or {}
+        changed_fields = []
+        if change == 'modified':
+            changed_fields = sorted(
+                key for key in set(before) | set(after)
+                if before.get(key) != after.get(key)
+            )
+        
+        status_transition = None
+        if before.get('status') != after.get('status'):
+            status_transition = (before.get('status'), after.get('status'))
+        
+        return {
+            'resource': resource,
+            'change': change,
+            'identifier': identifier,
+            'record': current if current is not None else previous,
+            'previous': previous,
+            'changed_fields': changed_fields,
+            'status_transition': status_transition
+        }
+
+    def _poll_resource(self, resource, page_size):
+        """
+        Compara a listagem atual de um tipo de recurso com o estado salvo
+        
+        Returns:
+            list: Mudanças encontradas
+        """
+        iterator = getattr(self.manager, self.RESOURCES[resource])
+        previous_state = self.state.get(resource)
+        current_state = {}
+        changes = []
+        
+        for record in iterator(page_size=page_size):
+            # Ida e volta pelo JSON: compara exatamente o que é persistido
+            record = json.loads(json.dumps(record, default=_json_default))
+            identifier = record['identifier']
+            fingerprint = self._fingerprint(record)
+            current_state[identifier] = {'fingerprint': fingerprint, 'record': record}
+            
+            if previous_state is None:
+                if self.emit_initial:
+                    changes.append(self._diff(resource, identifier, None, record))
+                continue
+            
+            known = previous_state.get(identifier)
+            if known is None:
+                changes.append(self._diff(resource, identifier, None, record))
+            elif known['fingerprint'] != fingerprint:
+                changes.append(self._diff(resource, identifier, known['record'], record))
+        
+        for identifier, known in (previous_state or {}).items():
+            if identifier not in current_state:
+                changes.append(self._diff(resource, identifier, known['record'], None))
+        
+        self.state[resource] = current_state
+        return changes
+
+    def poll(self, page_size=None):
+        """
+        Busca o inventário atual e retorna apenas o que mudou desde o último poll
+        
+        Um tipo de recurso cuja listagem falha mantém o estado anterior, para
+        que uma falha temporária não apareça como remoção de toda a frota.
+        
+        Args:
+            page_size (int, optional): Itens por página da API
+            
+        Returns:
+            list: Mudanças ('added', 'removed' ou 'modified') de todos os tipos
+        """
+        changes = []
+        for resource in self.resources:
+            try:
+                changes.extend(self._poll_resource(resource, page_size))
+            except (ThrottlingError, AccessDeniedError):
+                raise
+            except DocumentDBError as e:
+                logger.error("❌ Erro ao listar %s, estado anterior mantido: %s", resource, e)
+        
+        self.save()
+        if changes:
+            logger.info("🔄 %s mudanças no inventário", len(changes))
+        return changes
+
+    def follow(self, interval=300, stop_event=None, page_size=None):
+        """
+        Entrega mudanças continuamente, um poll a cada intervalo
+        
+        Args:
+            interval (int): Segundos entre polls
+            stop_event (threading.Event, optional): Sinal para encerrar
+            page_size (int, optional): Itens por página da API
+            
+        Yields:
+            dict: Mudanças, à medida que aparecem
+        """
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            yield from self.poll(page_size)
+            stop_event.wait(interval)
+
+
+# ============================================================================
+# CACHE PERSISTENTE DO INVENTÁRIO
+# ============================================================================
+
+class InventoryCache:
+    """
+    Cache em disco do inventário para inicializações rápidas da CLI
+    
+    Cada tipo de recurso é guardado com o instante da busca. Dentro do
+    max_age o cache responde sozinho; depois disso, responde com o último
+    estado conhecido e dispara uma atualização em segundo plano
+    (stale-while-revalidate). O arquivo é JSON versionado, com colunas e
+    linhas em vez de um dicionário por item, e é substituído
+    atomicamente: leitores concorrentes veem sempre o arquivo antigo ou o
+    novo inteiro, e gravações de processos diferentes são mescladas por
+    tipo de recurso, mantendo a busca mais recente.
+    """
+    
+    RESOURCES = {
+        'clusters': 'iter_clusters',
+        'cluster_details': 'iter_cluster_details',
+        'instances': 'iter_instances',
+        'snapshots': 'iter_snapshots',
+        'parameter_groups': 'iter_parameter_groups'
+    }
+    
+    def __init__(self, manager, path=None, max_ages=None, background=True, clock=time.time):
+        """
+        Inicializa o cache
+        
+        Args:
+            manager (DocumentDBManager): Manager usado nas atualizações
+            path (str, optional): Arquivo do cache (padrão: um por região em
+                                  INVENTORY_CACHE_DIR)
+            max_ages (dict, optional): Idade máxima em segundos por recurso
+                                       (padrão: INVENTORY_MAX_AGES)
+            background (bool): Atualiza dados vencidos em segundo plano (False
+                               atualiza antes de responder)
+            clock (callable): Relógio em segundos (substituível em testes)
+        """
+        self.manager = manager
+        self.path = path or os.path.join(
+            os.path.expanduser(INVENTORY_CACHE_DIR), f"inventory-{manager.region or 'default'}.json"
+        )
+        self.max_ages = dict(INVENTORY_MAX_AGES, **(max_ages or {}))
+        self.background = background
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._refreshing = {}
+        self.state = self._load()
+    
+    def _load(self):
+        """
+        Lê o cache do disco (vazio se ausente, corrompido ou de outra versão)
+        """
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            logger.warning("⚠️ Cache de inventário ilegível, ignorando: %s", self.path)
+            return {}
+        
+        if state.get('version') != INVENTORY_CACHE_VERSION or state.get('region') != self.manager.region:
+            return {}
+        return state['resources']
+    
+    def save(self):
+        """
+        Persiste o cache com escrita atômica, mesclando com o que outro processo gravou
+        """
+        with self._lock:
+            resources = dict(self.state)
+        # Outro processo pode ter atualizado tipos diferentes desde a leitura
+        for resource, entry in self._load().items():
+            if resource not in resources or entry['fetched_at'] > resources[resource]['fetched_at']:
+                resources[resource] = entry
+        
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        state = {'version': INVENTORY_CACHE_VERSION, 'region': self.manager.region, 'resources': resources}
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, default=_json_default, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+    
+    @staticmethod
+    def _pack(items):
+        """
+        Colunas + linhas: as chaves de cada item são gravadas uma vez só
+        """
+        columns = list(items[0]) if items else []
+        return {'columns': columns, 'rows': [[item.get(column) for column in columns] for item in items]}
+    
+    @staticmethod
+    def _unpack(entry):
+        columns = entry['columns']
+        return [dict(zip(columns, row)) for row in entry['rows']]
+    
+    def age(self, resource):
+        """
+        Idade em segundos do último estado conhecido de um recurso
+        
+        Args:
+            resource (str): Tipo de recurso
+            
+        Returns:
+            float: Segundos desde a busca (None se nunca buscado)
+        """
+        entry = self.state.get(resource)
+        return self.clock() - entry['fetched_at'] if entry else None
+    
+    def refresh(self, resource, page_size=None):
+        """
+        Busca um recurso na API e atualiza o cache em memória e em disco
+        
+        Args:
+            resource (str): Tipo de recurso
+            page_size (int, optional): Itens por página da API
+            
+        Returns:
+            list: Itens atualizados
+        """
+        if resource not in self.RESOURCES:
+            raise ValueError(f"Tipo de recurso inválido: {resource}")
+        fetched_at = self.clock()
+        items = list(getattr(self.manager, self.RESOURCES[resource])(page_size=page_size))
+        # Ida e volta pelo JSON: a resposta fresca tem o mesmo formato da do cache
+        packed = json.loads(json.dumps(self._pack(items), default=_json_default))
+        with self._lock:
+            self.state[resource] = dict(packed, fetched_at=fetched_at)
+        self.save()
+        return self._unpack(packed)
+    
+    def _refresh_in_background(self, resource, page_size):
+        """
+        Atualiza um recurso numa thread, no máximo uma por recurso
+        """
+        def run():
+            try:
+                self.refresh(resource, page_size)
+            except DocumentDBError as e:
+                logger.warning("⚠️ Atualização em segundo plano de %s falhou: %s", resource, e)
+            finally:
+                with self._lock:
+                    self._refreshing.pop(resource, None)
+        
+        with self._lock:
+            if resource in self._refreshing:
+                return
+            # Thread não-daemon: a CLI responde e o processo só sai depois de gravar
+            thread = self._refreshing[resource] = threading.Thread(
+                target=run, name=f'inventory-refresh-{resource}'
+            )
+        thread.start()
+    
+    def get(self, resource, force=False, page_size=None):
+        """
+        Itens de um recurso, do cache quando possível
+        
+        Args:
+            resource (str): 'clusters', 'cluster_details', 'instances', 'snapshots'
+                            ou 'parameter_groups'
+            force (bool): Ignora o cache e busca na API antes de responder
+            page_size (int, optional): Itens por página da API
+            
+        Returns:
+            list: Itens no formato de list_<recurso> (datas como texto ISO 8601)
+        """
+        if resource not in self.RESOURCES:
+            raise ValueError(f"Tipo de recurso inválido: {resource}")
+        entry = self.state.get(resource)
+        if force or entry is None:
+            return self.refresh(resource, page_size)
+        
+        if self.clock() - entry['fetched_at'] > self.max_ages.get(resource, 0):
+            if not self.background:
+                return self.refresh(resource, page_size)
+            self._refresh_in_background(resource, page_size)
+        return self._unpack(entry)
+    
+    def wait(self, timeout=None):
+        """
+        Aguarda as atualizações em segundo plano em andamento
+        
+        Args:
+            timeout (float, optional): Espera máxima por atualização, em segundos
+        """
+        with self._lock:
+            threads = list(self._refreshing.values())
+        for thread in threads:
+            thread.join(timeout)
+
+
+# ============================================================================
+# ESPERA POR VÁRIOS RECURSOS
+# ============================================================================
+
+class ResourceWaiter:
+    """
+    Aguarda vários clusters e instâncias ao mesmo tempo
+    
+    Substitui um waiter do boto3 por recurso: cada poll faz uma listagem
+    paginada por tipo de recurso (filtro com vários identificadores) e
+    resolve o Future de cada recurso que chegou ao estado desejado. Recursos
+    resolvidos saem dos polls seguintes. O intervalo é curto logo após uma
+    mudança de status ou perto do tempo esperado de conclusão, e cresce
+    enquanto nada muda.
+    """
+    
+    # Tipo -> (operação, chave do resultado, filtro, normalizador do manager)
+    RESOURCE_TYPES = {
+        'cluster': ('describe_db_clusters', 'DBClusters', 'db-cluster-id', '_normalize_cluster'),
+        'instance': ('describe_db_instances', 'DBInstances', 'db-instance-id', '_normalize_instance')
+    }
+    
+    def __init__(self, manager, min_interval=5, max_interval=60, backoff=2.0,
+                 clock=time.monotonic, sleep=time.sleep):
+        """
+        Inicializa o waiter
+        
+        Args:
+            manager (DocumentDBManager): Manager usado para as chamadas
+            min_interval (float): Intervalo após mudanças ou perto da conclusão
+            max_interval (float): Intervalo máximo enquanto nada muda
+            backoff (float): Fator de crescimento do intervalo sem mudanças
+            clock (callable): Relógio monotônico (substituível em testes)
+            sleep (callable): Função de espera (substituível em testes)
+        """
+        self.manager = manager
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.clock = clock
+        self.sleep = sleep
+        self.interval = min_interval
+        self.targets = []
+        self.polls = 0
+        self._lock = threading.Lock()
+
+    def add(self, resource_type, identifier, desired_states=('available',),
+            failure_states=None, timeout=None, expected_seconds=None, callback=None):
+        """
+        Registra um recurso a aguardar
+        
+        Args:
+            resource_type (str): 'cluster' ou 'instance'
+            identifier (str): Identificador do recurso
+            desired_states (tuple): Estados que encerram a espera com sucesso;
+                                    'deleted' é atingido quando o recurso some
+            failure_states (set, optional): Estados que encerram com WaiterError
+                                            (padrão: WAITER_FAILURE_STATES)
+            timeout (float, optional): Segundos até desistir com WaiterError
+            expected_seconds (float, optional): Duração esperada da operação,
+                                                usada para apertar o intervalo
+            callback (callable, optional): Chamado com o Future ao terminar
+            
+        Returns:
+            Future: Resolvido com o registro do recurso (None se 'deleted')
+        """
+        if resource_type not in self.RESOURCE_TYPES:
+            raise ValueError(f"Tipo de recurso inválido: {resource_type}")
+        
+        now = self.clock()
+        future = Future()
+        if callback:
+            future.add_done_callback(callback)
+        
+        with self._lock:
+            self.targets.append({
+                'type': resource_type,
+                'identifier': identifier,
+                'desired': set(desired_states),
+                'failure': set(WAITER_FAILURE_STATES if failure_states is None else failure_states),
+                'deadline': now + timeout if timeout else None,
+                'near_at': now + 0.8 * expected_seconds if expected_seconds else None,
+                'status': None,
+                'future': future
+            })
+            # Um novo alvo merece uma verificação rápida
+            self.interval = self.min_interval
+        return future
+
+    def pending(self):
+        """
+        Returns:
+            int: Recursos ainda aguardados
+        """
+        with self._lock:
+            return len(self.targets)
+
+    def _describe(self, resource_type, identifiers):
+        """
+        Busca o estado atual de vários recursos do mesmo tipo
+        
+        Returns:
+            dict: Identificador -> registro normalizado (ausentes não aparecem)
+        """
+        operation, result_key, filter_name, normalizer = self.RESOURCE_TYPES[resource_type]
+        normalize = getattr(self.manager, normalizer)
+        
+        if len(identifiers) >= BULK_SCAN_THRESHOLD:
+            batches = [{}]
+        else:
+            batches = [
+                {'Filters': [{'Name': filter_name, 'Values': chunk}]}
+                for chunk in self.manager._chunked(identifiers, MAX_FILTER_VALUES)
+            ]
+        
+        wanted = set(identifiers)
+        found = {}
+        for params in batches:
+            for item in self.manager._paginate(operation, result_key, None, **params):
+                record = normalize(item)
+                if record['identifier'] in wanted:
+                    found[record['identifier']] = record
+        return found
+
+    def _resolve(self, target, record, now):
+        """
+        Verifica um alvo contra o estado atual
+        
+        Returns:
+            bool: True se o alvo terminou (com sucesso ou falha)
+        """
+        status = record['status'] if record else None
+        future = target['future']
+        label = f"{target['type']} '{target['identifier']}'"
+        
+        if record is None and 'deleted' in target['desired']:
+            future.set_result(None)
+        elif record is not None and status in target['desired']:
+            future.set_result(record)
+        elif status in target['failure']:
+            future.set_exception(WaiterError(
+                f"{label} entrou no estado de falha '{status}'", 'WaiterFailure'
+            ))
+        elif target['deadline'] is not None and now >= target['deadline']:
+            future.set_exception(WaiterError(
+                f"{label} não chegou a {sorted(target['desired'])} "
+                f"(último estado: {status})", 'WaiterTimeout'
+            ))
+        else:
+            return False
+        return True
+
+    def poll(self):
+        """
+        Verifica todos os recursos pendentes uma vez
+        
+        Returns:
+            float: Segundos até o próximo poll
+        """
+        with self._lock:
+            targets = list(self.targets)
+        if not targets:
+            return self.interval
+        
+        self.polls += 1
+        by_type = {}
+        for target in targets:
+            by_type.setdefault(target['type'], []).append(target)
+        
+        changed = False
+        finished = []
+        for resource_type, type_targets in by_type.items():
+            identifiers = list(dict.fromkeys(t['identifier'] for t in type_targets))
+            try:
+                found = self._describe(resource_type, identifiers)
+            except AccessDeniedError as e:
+                # Sem permissão nenhum poll vai avançar: encerra os alvos do tipo
+                for target in type_targets:
+                    target['future'].set_exception(e)
+                finished.extend(type_targets)
+                continue
+            except DocumentDBError as e:
+                logger.warning("⚠️ Falha ao verificar %ss, nova tentativa no próximo poll: %s", resource_type, e)
+                continue
+            
+            now = self.clock()
+            for target in type_targets:
+                record = found.get(target['identifier'])
+                status = record['status'] if record else None
+                if status != target['status']:
+                    target['status'] = status
+                    changed = True
+                if self._resolve(target, record, now):
+                    finished.append(target)
+        
+        with self._lock:
+            self.targets = [t for t in self.targets if t not in finished]
+            remaining = list(self.targets)
+        
+        return self._next_interval(remaining, changed or bool(finished))
+
+    def _next_interval(self, remaining, changed):
+        """
+        Ajusta o intervalo: curto após mudanças ou perto da conclusão esperada,
+        crescendo por backoff enquanto nada muda
+        """
+        if changed:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+        
+        now = self.clock()
+        interval = self.interval
+        for target in remaining:
+            # Acorda a tempo da conclusão esperada e do timeout de cada alvo
+            for moment in (target['near_at'], target['deadline']):
+                if moment is not None:
+                    interval = min(interval, max(moment - now, self.min_interval))
+        return interval
+
+    def run(self, stop_event=None):
+        """
+        Faz polls até todos os recursos terminarem
+        
+        Args:
+            stop_event (threading.Event, optional): Sinal para encerrar antes
+        """
+        while self.pending() and not (stop_event and stop_event.is_set()):
+            interval = self.poll()
+            if not self.pending():
+                break
+            if stop_event:
+                stop_event.wait(interval)
+            else:
+                self.sleep(interval)
+
+    def start(self, stop_event=None):
+        """
+        Executa run() em uma thread em segundo plano
+        
+        Returns:
+            threading.Thread: Thread do waiter
+        """
+        thread = threading.Thread(target=self.run, args=(stop_event,), daemon=True)
+        thread.start()
+        return thread
+
+
+# ============================================================================
+# COLETA AGENDADA COM ORÇAMENTO DE REQUISIÇÕES
+# ============================================================================
+
+class CollectionScheduler:
+    """
+    Coleta métricas e eventos continuamente, priorizando clusters ativos
+    
+    Cada cluster tem o próprio intervalo: curto quando a CPU está alta ou
+    houve eventos recentes, o intervalo base no caso normal e crescente
+    enquanto o cluster fica ocioso. Os horários recebem jitter para não
+    concentrar requisições. O orçamento de cada serviço é o TokenBucket do
+    próprio RequestExecutor (opcionalmente limitado a uma fatia por minuto);
+    quando os clusters vencidos não cabem no orçamento, os de menor
+    prioridade são adiados primeiro. Uma listagem de eventos cobre a frota
+    inteira e antecipa a coleta de qualquer cluster que tenha eventos novos.
+    """
+    
+    def __init__(self, manager, cluster_identifiers, base_interval=300, hot_interval=60,
+                 max_interval=1800, cpu_hot_threshold=70.0, cpu_idle_threshold=10.0,
+                 event_hot_seconds=3600, budgets=None, jitter=0.1, coalesce_seconds=30,
+                 metric_names=None, weights=None, on_data=None, clock=time.monotonic,
+                 sleep=time.sleep):
+        """
+        Inicializa o agendador
+        
+        Args:
+            manager (DocumentDBManager): Manager usado para as chamadas
+            cluster_identifiers (list): Clusters acompanhados
+            base_interval (float): Intervalo normal entre coletas (segundos)
+            hot_interval (float): Intervalo de clusters com CPU alta ou eventos recentes
+            max_interval (float): Maior intervalo de clusters ociosos ou adiados
+            cpu_hot_threshold (float): CPU máxima (%) que torna o cluster prioritário
+            cpu_idle_threshold (float): CPU máxima (%) abaixo da qual o intervalo cresce
+            event_hot_seconds (float): Por quanto tempo um evento mantém o cluster prioritário
+            budgets (dict, optional): Fatia máxima de chamadas por minuto da coleta, por
+                                      serviço (padrão: só o limite do executor)
+            jitter (float): Variação relativa aplicada a cada intervalo
+            coalesce_seconds (float): Antecipa clusters que vencem dentro dessa janela,
+                                      para dividirem as mesmas chamadas GetMetricData
+            metric_names (list, optional): Métricas coletadas (padrão: DEFAULT_METRICS)
+            weights (dict, optional): Prioridade extra fixa por cluster
+            on_data (callable, optional): Chamado com (cluster, métricas, eventos novos)
+            clock (callable): Relógio monotônico (substituível em testes)
+            sleep (callable): Função de espera (substituível em testes)
+        """
+        self.manager = manager
+        self.base_interval = base_interval
+        self.hot_interval = hot_interval
+        self.max_interval = max_interval
+        self.cpu_hot_threshold = cpu_hot_threshold
+        self.cpu_idle_threshold = cpu_idle_threshold
+        self.event_hot_seconds = event_hot_seconds
+        self.jitter = jitter
+        self.coalesce_seconds = coalesce_seconds
+        self.metric_names = list(metric_names or DEFAULT_METRICS)
+        self.weights = weights or {}
+        self.on_data = on_data
+        self.clock = clock
+        self.sleep = sleep
+        # O executor é quem gasta os tokens nas chamadas; o agendador só consulta
+        # o mesmo bucket para decidir quantos clusters cabem, senão cada coleta
+        # seria limitada duas vezes por limitadores que não enxergam um ao outro
+        self.shared_buckets = {
+            service: manager.executor.bucket(service) for service in ('docdb', 'cloudwatch')
+        }
+        self.buckets = {
+            service: TokenBucket(per_minute / 60.0, capacity=per_minute, clock=clock, sleep=sleep)
+            for service, per_minute in (budgets or {}).items()
+        }
+        self.stats = {'ticks': 0, 'polled': 0, 'deferred': 0, 'metric_calls': 0, 'event_calls': 0}
+        self.latest = {}
+        
+        now = self.clock()
+        self.clusters = {}
+        self._queue = []
+        for identifier in dict.fromkeys(cluster_identifiers):
+            self.clusters[identifier] = {
+                'interval': base_interval,
+                'priority': self.weights.get(identifier, 0.0),
+                'cpu': None,
+                'last_event': None,
+                'pending_events': [],
+                'next_due': None
+            }
+            # Primeira coleta espalhada pelo primeiro intervalo curto
+            self._schedule(identifier, now + random.uniform(0, hot_interval))
+        self._events_since = datetime.now(timezone.utc) - timedelta(seconds=event_hot_seconds)
+        # Eventos no instante de retomada que já foram entregues (listagem interrompida)
+        self._events_seen = set()
+
+    def _schedule(self, identifier, due_at):
+        """
+        Agenda a próxima coleta de um cluster, invalidando a entrada anterior da fila
+        """
+        self.clusters[identifier]['next_due'] = due_at
+        heapq.heappush(self._queue, (due_at, identifier))
+
+    def _drop_stale(self):
+        # Reagendar não remove a entrada antiga do heap: ela é descartada ao chegar ao topo
+        while self._queue and self._queue[0][0] != self.clusters[self._queue[0][1]]['next_due']:
+            heapq.heappop(self._queue)
+
+    def _with_jitter(self, interval):
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _metric_calls(self, clusters):
+        """
+        Chamadas GetMetricData necessárias para uma lista de clusters
+        """
+        # Média e máximo para cada métrica, como em get_fleet_metrics
+        queries = len(clusters) * len(self.metric_names) * 2
+        return math.ceil(queries / MAX_METRIC_DATA_QUERIES)
+
+    def _calls_available(self, service):
+        """
+        Chamadas que cabem agora no bucket do executor e na fatia da coleta, se houver
+        """
+        available = self.shared_buckets[service].available()
+        quota = self.buckets.get(service)
+        if quota is not None:
+            available = min(available, quota.available())
+        return int(available)
+
+    def _affordable(self, due):
+        """
+        Quantos clusters vencidos (em ordem de prioridade) cabem no orçamento do CloudWatch
+        """
+        per_call = max(1, MAX_METRIC_DATA_QUERIES // (len(self.metric_names) * 2))
+        affordable = min(len(due), self._calls_available('cloudwatch') * per_call)
+        quota = self.buckets.get('cloudwatch')
+        # try_acquire devolve 0.0 quando consome e os segundos de espera quando falta token
+        if affordable and quota is not None and quota.try_acquire(self._metric_calls(due[:affordable])) > 0:
+            return 0
+        return affordable
+
+    def _charge_page(self):
+        """
+        Reserva uma página de DescribeEvents no orçamento do DocumentDB
+        
+        Returns:
+            bool: True se a página cabe no orçamento
+        """
+        if self._calls_available('docdb') < 1:
+            return False
+        quota = self.buckets.get('docdb')
+        return quota is None or quota.try_acquire() == 0
+
+    def _poll_events(self):
+        """
+        Uma listagem de eventos para todos os clusters, se houver orçamento
+        
+        Cada página da listagem é cobrada do orçamento antes de ser pedida;
+        se o orçamento acabar no meio, a próxima listagem retoma do último
+        evento recebido.
+        
+        Returns:
+            dict: Cluster -> eventos novos desde a última listagem
+        """
+        if not self._charge_page():
+            return {}
+        
+        started = datetime.now(timezone.utc)
+        page_size = DEFAULT_PAGE_SIZE
+        events = self.manager.iter_events('db-cluster', self._events_since, page_size=page_size)
+        new_events = {}
+        listed = 0
+        resume_from, seen = started, set()
+        try:
+            self.stats['event_calls'] += 1
+            for event in events:
+                listed += 1
+                key = (event['date'], event['source_id'], event['message'])
+                if key not in self._events_seen and event['source_id'] in self.clusters:
+                    new_events.setdefault(event['source_id'], []).append(event)
+                seen = seen | {key} if event['date'] == resume_from else {key}
+                resume_from = event['date']
+                # Página cheia: a próxima iteração pede outra página à API
+                if listed % page_size == 0:
+                    if not self._charge_page():
+                        break
+                    self.stats['event_calls'] += 1
+            else:
+                resume_from, seen = started, set()
+        except DocumentDBError as e:
+            logger.warning("⚠️ Falha ao listar eventos, nova tentativa na próxima coleta: %s", e)
+            return {}
+        finally:
+            events.close()
+        
+        if resume_from == self._events_since:
+            seen |= self._events_seen
+        self._events_since, self._events_seen = resume_from, seen
+        return new_events
+
+    def _reschedule(self, identifier, now):
+        """
+        Recalcula prioridade e intervalo de um cluster depois de uma coleta
+        """
+        state = self.clusters[identifier]
+        cpu = state['cpu']
+        recent_event = (
+            state['last_event'] is not None
+            and now - state['last_event'] < self.event_hot_seconds
+        )
+        
+        state['priority'] = self.weights.get(identifier, 0.0) + (cpu or 0) / 100 + (1 if recent_event else 0)
+        if recent_event or (cpu is not None and cpu >= self.cpu_hot_threshold):
+            state['interval'] = self.hot_interval
+        elif cpu is not None and cpu < self.cpu_idle_threshold:
+            state['interval'] = min(max(state['interval'], self.base_interval) * 1.5, self.max_interval)
+        else:
+            state['interval'] = self.base_interval
+        self._schedule(identifier, now + self._with_jitter(state['interval']))
+
+    def _defer(self, identifiers, now):
+        """
+        Adia clusters que não couberam no orçamento, alongando o intervalo
+        """
+        for identifier in identifiers:
+            state = self.clusters[identifier]
+            state['interval'] = min(state['interval'] * 2, self.max_interval)
+            self._schedule(identifier, now + self._with_jitter(state['interval']))
+        self.stats['deferred'] += len(identifiers)
+
+    def tick(self):
+        """
+        Coleta os clusters vencidos que cabem no orçamento
+        
+        Returns:
+            list: Clusters coletados nesta rodada
+        """
+        now = self.clock()
+        self._drop_stale()
+        if not self._queue or self._queue[0][0] > now:
+            return []
+        
+        # A listagem cobre a frota toda: um cluster com evento novo passa a ser
+        # prioritário e vence agora, mesmo que não estivesse na fila desta rodada
+        for identifier, events in self._poll_events().items():
+            state = self.clusters[identifier]
+            state['last_event'] = now
+            state['pending_events'].extend(events)
+            state['interval'] = self.hot_interval
+            state['priority'] = self.weights.get(identifier, 0.0) + (state['cpu'] or 0) / 100 + 1
+            self._schedule(identifier, now)
+        
+        # Uma chamada GetMetricData cobre dezenas de clusters: junta os vencidos
+        # com os que venceriam em breve, em vez de uma chamada para cada um
+        due, early = [], []
+        while self._queue and self._queue[0][0] <= now + self.coalesce_seconds:
+            due_at, identifier = heapq.heappop(self._queue)
+            if due_at != self.clusters[identifier]['next_due']:
+                continue
+            # A antecipação fica dentro da variação do jitter do próprio intervalo
+            allowance = min(self.coalesce_seconds, self.clusters[identifier]['interval'] * self.jitter * 2)
+            if due_at <= now + allowance:
+                due.append(identifier)
+            else:
+                early.append((due_at, identifier))
+        for entry in early:
+            heapq.heappush(self._queue, entry)
+        
+        self.stats['ticks'] += 1
+        due.sort(key=lambda identifier: self.clusters[identifier]['priority'], reverse=True)
+        affordable = self._affordable(due)
+        selected, deferred = due[:affordable], due[affordable:]
+        
+        metrics = {}
+        if selected:
+            try:
+                metrics = self.manager.get_fleet_metrics(selected, 1, self.metric_names)
+                self.stats['metric_calls'] += self._metric_calls(selected)
+                if 'cloudwatch' in self.buckets:
+                    self.buckets['cloudwatch'].on_success()
+            except ThrottlingError as e:
+                # A própria API indica pressão: reduz o orçamento e adia todos
+                logger.warning("⚠️ Throttling na coleta de métricas, adiando %s clusters: %s",
+                               len(selected), e)
+                if 'cloudwatch' in self.buckets:
+                    self.buckets['cloudwatch'].on_throttle()
+                selected, deferred = [], due
+        
+        for identifier in selected:
+            state = self.clusters[identifier]
+            cluster_metrics = metrics.get(identifier, {})
+            cpu = (cluster_metrics.get('CPUUtilization') or {}).get('latest_maximum')
+            if cpu is not None:
+                state['cpu'] = cpu
+            # Eventos de clusters adiados esperam pela próxima coleta deles
+            events, state['pending_events'] = state['pending_events'], []
+            
+            self.latest[identifier] = {'metrics': cluster_metrics, 'events': events, 'polled_at': now}
+            if self.on_data:
+                self.on_data(identifier, cluster_metrics, events)
+            self._reschedule(identifier, now)
+        
+        self._defer(deferred, now)
+        self.stats['polled'] += len(selected)
+        if deferred:
+            logger.info("⏳ %s clusters de menor prioridade adiados por orçamento", len(deferred))
+        return selected
+
+    def next_due(self):
+        """
+        Returns:
+            float: Instante (no relógio do agendador) da próxima coleta, ou None
+        """
+        self._drop_stale()
+        return self._queue[0][0] if self._queue else None
+
+    def run(self, stop_event=None, max_ticks=None):
+        """
+        Executa coletas até ser interrompido
+        
+        Args:
+            stop_event (threading.Event, optional): Sinal para encerrar
+            max_ticks (int, optional): Encerra após esse número de rodadas com coleta
+        """
+        while not (stop_event and stop_event.is_set()):
+            if max_ticks is not None and self.stats['ticks'] >= max_ticks:
+                break
+            self.tick()
+            next_due = self.next_due()
+            wait = max(next_due - self.clock(), 0.01) if next_due is not None else self.base_interval
+            if stop_event:
+                stop_event.wait(wait)
+            else:
+                self.sleep(wait)
+
+
+# ============================================================================
+# LATÊNCIA DOS ENDPOINTS
+# ============================================================================
+
+class EndpointProber:
+    """
+    Mede a latência de conexão até vários endpoints em paralelo
+    
+    Cada endpoint recebe algumas conexões TCP seguidas (e o handshake TLS,
+    se habilitado), com timeout; a mediana das amostras define o ranking.
+    Nenhum dado é enviado depois do handshake. Funciona com qualquer
+    host:porta, inclusive sockets locais em testes.
+    """
+    
+    def __init__(self, samples=3, timeout=2.0, max_workers=16, tls=True, ca_file=None,
+                 ssl_context=None, clock=time.perf_counter):
+        """
+        Inicializa o medidor
+        
+        Args:
+            samples (int): Conexões por endpoint
+            timeout (float): Timeout de cada conexão em segundos
+            max_workers (int): Endpoints medidos ao mesmo tempo
+            tls (bool): Mede também o handshake TLS
+            ca_file (str, optional): CA para validar o certificado (ex: global-bundle.pem);
+                                     sem ele o handshake é medido sem validação
+            ssl_context (ssl.SSLContext, optional): Contexto TLS pronto (substitui ca_file)
+            clock (callable): Relógio de alta resolução (substituível em testes)
+        """
+        self.samples = samples
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.tls = tls
+        self.ca_file = ca_file
+        self.ssl_context = ssl_context
+        self.clock = clock
+
+    def _context(self):
+        """
+        Contexto TLS criado no primeiro uso (ssl é importado só se necessário)
+        """
+        if self.ssl_context is None:
+            import ssl
+            if self.ca_file:
+                context = ssl.create_default_context(cafile=self.ca_file)
+            else:
+                # Só o tempo do handshake interessa aqui; nada trafega pela conexão
+                context = ssl.create_default_context()
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+            self.ssl_context = context
+        return self.ssl_context
+
+    def _connect_once(self, host, port):
+        """
+        Uma amostra: conexão TCP e, opcionalmente, handshake TLS
+        
+        Returns:
+            tuple: (ms da conexão TCP, ms do handshake TLS ou None)
+        """
+        start = self.clock()
+        sock = socket.create_connection((host, port), timeout=self.timeout)
+        try:
+            tcp_ms = (self.clock() - start) * 1000
+            tls_ms = None
+            if self.tls:
+                tls_start = self.clock()
+                sock = self._context().wrap_socket(sock, server_hostname=host)
+                tls_ms = (self.clock() - tls_start) * 1000
+            return tcp_ms, tls_ms
+        finally:
+            sock.close()
+
+    def probe_endpoint(self, endpoint):
+        """
+        Mede um endpoint
+        
+        Args:
+            endpoint (dict): Registro com 'endpoint' (host) e 'port', como os
+                             de list_instances; os demais campos são mantidos
+            
+        Returns:
+            dict: Registro original mais medianas (tcp_ms, tls_ms, connect_ms),
+                  menor tempo, amostras válidas e erros
+        """
+        host, port = endpoint['endpoint'], endpoint.get('port', 27017)
+        tcp_samples, tls_samples, totals, errors = [], [], [], []
+        for _ in range(self.samples):
+            try:
+                tcp_ms, tls_ms = self._connect_once(host, port)
+            except OSError as e:
+                # Inclui timeout, conexão recusada, DNS e falhas de TLS
+                errors.append(f"{type(e).__name__}: {e}")
+                continue
+            tcp_samples.append(tcp_ms)
+            totals.append(tcp_ms + (tls_ms or 0))
+            if tls_ms is not None:
+                tls_samples.append(tls_ms)
+        
+        def median(values):
+            if not values:
+                return None
+            ordered = sorted(values)
+            middle = len(ordered) // 2
+            if len(ordered) % 2:
+                return ordered[middle]
+            return (ordered[middle - 1] + ordered[middle]) / 2
+        
+        return dict(
+            endpoint,
+            tcp_ms=median(tcp_samples),
+            tls_ms=median(tls_samples),
+            connect_ms=median(totals),
+            min_ms=min(totals) if totals else None,
+            ok_samples=len(totals),
+            errors=errors
+        )
+
+    def probe(self, endpoints):
+        """
+        Mede vários endpoints em paralelo
+        
+        Args:
+            endpoints (list): Registros com 'endpoint' e 'port'
+            
+        Returns:
+            list: Resultados do mais rápido ao mais lento; inacessíveis no fim
+        """
+        endpoints = [e for e in endpoints if e.get('endpoint') not in (None, 'N/A')]
+        if not endpoints:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(endpoints))) as pool:
+            results = list(pool.map(self.probe_endpoint, endpoints))
+        
+        results.sort(key=lambda r: (r['connect_ms'] is None, r['connect_ms'] or 0))
+        return results
+
+    @staticmethod
+    def rank_by_az(results):
+        """
+        Agrupa os resultados por zona de disponibilidade
+        
+        Args:
+            results (list): Resultado de probe
+            
+        Returns:
+            OrderedDict: AZ -> resultados; AZs ordenadas pelo endpoint mais rápido
+        """
+        by_az = OrderedDict()
+        for result in results:
+            by_az.setdefault(result.get('availability_zone', 'N/A'), []).append(result)
+        return by_az
+
+
+# ============================================================================
+# ANÁLISE DE LOGS DO PROFILER E DE AUDITORIA
+# ============================================================================
+
+# Um encoder reaproveitado: json.dumps com opções cria um novo a cada chamada
+_SHAPE_ENCODER = json.JSONEncoder(separators=(',', ':'), default=str)
+
+
+def _strip_literals(value):
+    """
+    Troca valores literais por '?' mantendo campos e operadores
+    """
+    if isinstance(value, dict):
+        return {key: _strip_literals(item) for key, item in value.items()}
+    if isinstance(value, list):
+        # {'$in': [1, 2, 3]} e {'$in': [4]} têm o mesmo formato
+        stripped = []
+        for item in value:
+            item = _strip_literals(item)
+            if item not in stripped:
+                stripped.append(item)
+        return stripped
+    return '?'
+
+
+def query_shape(command):
+    """
+    Normaliza um comando em um formato de consulta, sem literais
+    
+    Args:
+        command (dict): Comando registrado pelo profiler (ex: {'find': 'pedidos',
+                        'filter': {'cliente': 42}})
+            
+    Returns:
+        str: Formato em JSON compacto (ex: '{"find":"pedidos","filter":{"cliente":"?"}}')
+    """
+    if not isinstance(command, dict):
+        return '?'
+    
+    shape = {}
+    for position, (key, value) in enumerate(command.items()):
+        if key in SHAPE_IGNORED_FIELDS:
+            continue
+        # O primeiro campo é o nome do comando e o valor, a coleção
+        if position == 0 and isinstance(value, str):
+            shape[key] = value
+        else:
+            shape[key] = _strip_literals(value)
+    return _SHAPE_ENCODER.encode(shape)
+
+
+class SlowQueryAnalyzer:
+    """
+    Agrega logs do profiler e de auditoria por formato de consulta e coleção
+    
+    As linhas são processadas em streaming (API, arquivos exportados ou
+    qualquer iterável) e só os agregados ficam em memória: contagem, tempo
+    total e máximo, docsExamined/nReturned e um histograma logarítmico de
+    tamanho limitado para o p95, com erro relativo de cerca de 10%.
+    """
+    
+    # Crescimento dos buckets do histograma de duração (10% por bucket)
+    HISTOGRAM_GROWTH = 1.1
+    
+    def __init__(self, max_shapes=10000, min_millis=0):
+        """
+        Inicializa o analisador
+        
+        Args:
+            max_shapes (int): Máximo de formatos distintos; os excedentes são
+                              somados numa única entrada '<outros formatos>'
+                              por tipo de log (coleção '*')
+            min_millis (float): Ignora operações do profiler mais rápidas que isso
+        """
+        self.max_shapes = max_shapes
+        self.min_millis = min_millis
+        self.lines = 0
+        self.skipped = 0
+        self._log_growth = math.log(self.HISTOGRAM_GROWTH)
+        self._max_bucket = int(math.log(MAX_PROFILER_MILLIS) / self._log_growth) + 1
+        self._shapes = {}
+
+    @staticmethod
+    def parse_message(message):
+        """
+        Converte uma linha de log em um registro normalizado
+        
+        Aceita a mensagem JSON pura (CloudWatch Logs) ou precedida de timestamp
+        (arquivos exportados para o S3).
+        
+        Args:
+            message (str): Linha do log do profiler ou de auditoria
+            
+        Returns:
+            dict: Registro com tipo, operação, coleção, formato e contadores,
+                  ou None se a linha não for um log reconhecido
+        """
+        start = message.find('{')
+        if start < 0:
+            return None
+        try:
+            entry = json.loads(message[start:])
+        except ValueError:
+            return None
+        if not isinstance(entry, dict):
+            return None
+        
+        if 'atype' in entry:
+            param = entry.get('param') or {}
+            operation = param.get('command') or entry['atype']
+            return {
+                'kind': 'audit',
+                'op': entry['atype'],
+                'collection': param.get('ns') or param.get('db') or '',
+                'shape': f"{entry['atype']} {operation} {query_shape(param.get('args') or {})}",
+                'command': param.get('args'),
+                'millis': None,
+                'docs_examined': 0,
+                'n_returned': 0
+            }
+        
+        if 'op' not in entry:
+            return None
+        exec_stats = entry.get('execStats') or {}
+        command = entry.get('command') or entry.get('query') or {}
+        return {
+            'kind': 'profiler',
+            'op': entry['op'],
+            'collection': entry.get('ns', ''),
+            'shape': f"{entry['op']} {query_shape(command)}",
+            'command': command,
+            'millis': float(entry.get('millis') or 0),
+            'docs_examined': int(entry.get('docsExamined', exec_stats.get('docsExamined')) or 0),
+            'n_returned': int(entry.get('nreturned', exec_stats.get('nReturned')) or 0)
+        }
+
+    def _bucket(self, millis):
+        if millis < 1:
+            return 0
+        return min(int(math.log(millis) / self._log_growth) + 1, self._max_bucket)
+
+    def add(self, record):
+        """
+        Soma um registro (resultado de parse_message) aos agregados
+        """
+        millis = record['millis']
+        if millis is not None and millis < self.min_millis:
+            return
+        
+        key = (record['collection'], record['shape'])
+        entry = self._shapes.get(key)
+        overflow = False
+        if entry is None:
+            if len(self._shapes) >= self.max_shapes:
+                # Uma entrada global por tipo de log: coleções novas não criam entradas
+                key = ('*', f"<outros formatos ({record['kind']})>")
+                entry = self._shapes.get(key)
+                overflow = True
+            if entry is None:
+                entry = self._shapes[key] = {
+                    'kind': record['kind'],
+                    'op': '*' if overflow else record['op'],
+                    'count': 0,
+                    'timed': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'docs_examined': 0,
+                    'n_returned': 0,
+                    'histogram': {},
+                    'slowest_command': None
+                }
+        
+        entry['count'] += 1
+        entry['docs_examined'] += record['docs_examined']
+        entry['n_returned'] += record['n_returned']
+        if millis is not None:
+            entry['timed'] += 1
+            entry['total_ms'] += millis
+            bucket = self._bucket(millis)
+            entry['histogram'][bucket] = entry['histogram'].get(bucket, 0) + 1
+            if millis >= entry['max_ms']:
+                entry['max_ms'] = millis
+                entry['slowest_command'] = record['command']
+
+    def ingest(self, messages):
+        """
+        Processa linhas de log em streaming
+        
+        Args:
+            messages (iterable): Linhas (str) ou eventos de iter_log_events
+            
+        Returns:
+            int: Linhas reconhecidas
+        """
+        parsed = 0
+        for message in messages:
+            if isinstance(message, dict):
+                message = message['message']
+            self.lines += 1
+            record = self.parse_message(message)
+            if record is None:
+                self.skipped += 1
+                continue
+            self.add(record)
+            parsed += 1
+        return parsed
+
+    def ingest_files(self, paths):
+        """
+        Processa arquivos exportados (texto ou .gz), linha a linha
+        
+        Args:
+            paths (list): Caminhos dos arquivos
+            
+        Returns:
+            int: Linhas reconhecidas
+        """
+        parsed = 0
+        for path in paths:
+            if path.endswith('.gz'):
+                import gzip
+                opener = gzip.open
+            else:
+                opener = open
+            with opener(path, 'rt', encoding='utf-8') as f:
+                parsed += self.ingest(f)
+        return parsed
+
+    def ingest_log_group(self, manager, cluster_identifier, start_time, end_time=None,
+                         kind='profiler', page_size=None):
+        """
+        Processa o log group de um cluster direto do CloudWatch Logs
+        
+        Com min_millis, o filtro é aplicado no servidor e só as operações
+        lentas trafegam.
+        
+        Args:
+            manager (DocumentDBManager): Manager usado para as chamadas
+            cluster_identifier (str): Identificador do cluster
+            start_time (datetime): Início da janela
+            end_time (datetime, optional): Fim da janela
+            kind (str): 'profiler' ou 'audit'
+            page_size (int, optional): Eventos por página
+            
+        Returns:
+            int: Linhas reconhecidas
+        """
+        filter_pattern = None
+        if kind == 'profiler' and self.min_millis:
+            filter_pattern = f"{{ $.millis >= {self.min_millis} }}"
+        events = manager.iter_log_events(
+            manager.log_group_name(cluster_identifier, kind),
+            start_time, end_time, filter_pattern, page_size
+        )
+        return self.ingest(events)
+
+    def _percentile(self, histogram, count, percentile):
+        """
+        Limite superior do bucket que contém o percentil
+        """
+        target = count * percentile / 100
+        cumulative = 0
+        for bucket in sorted(histogram):
+            cumulative += histogram[bucket]
+            if cumulative >= target:
+                return 1.0 if bucket == 0 else self.HISTOGRAM_GROWTH ** bucket
+        return None
+
+    def report(self, top=20, sort_by='total_ms', kind=None):
+        """
+        Formatos de consulta mais caros
+        
+        Args:
+            top (int): Quantidade de formatos retornados
+            sort_by (str): 'total_ms', 'count', 'p95_ms', 'max_ms' ou 'docs_examined'
+            kind (str, optional): Só 'profiler' ou só 'audit'
+            
+        Returns:
+            list: Formatos com contagem, tempos (total, médio, p95, máximo),
+                  docsExamined, nReturned e o comando mais lento
+        """
+        rows = []
+        for (collection, shape), entry in self._shapes.items():
+            if kind and entry['kind'] != kind:
+                continue
+            timed = entry['timed']
+            rows.append({
+                'collection': collection,
+                'shape': shape,
+                'kind': entry['kind'],
+                'op': entry['op'],
+                'count': entry['count'],
+                'total_ms': entry['total_ms'],
+                'mean_ms': entry['total_ms'] / timed if timed else None,
+                'p95_ms': self._percentile(entry['histogram'], timed, 95) if timed else None,
+                'max_ms': entry['max_ms'],
+                'docs_examined': entry['docs_examined'],
+                'n_returned': entry['n_returned'],
+                # Muito acima de 1: índice ausente ou pouco seletivo
+                'examined_per_returned': entry['docs_examined'] / max(entry['n_returned'], 1),
+                'slowest_command': entry['slowest_command']
+            })
+        
+        rows.sort(key=lambda row: row[sort_by] or 0, reverse=True)
+        return rows[:top]
+
+    def print_report(self, top=10):
+        """
+        Imprime os formatos de consulta mais caros
+        
+        Args:
+            top (int): Quantidade de formatos exibidos
+        """
+        print(f"\n🐢 CONSULTAS MAIS CARAS ({self.lines} linhas, {self.skipped} ignoradas):")
+        for row in self.report(top, kind='profiler'):
+            print(f"  • {row['collection']} {row['shape'][:80]}")
+            print(f"    {row['count']}x  total={row['total_ms']:.0f}ms  p95≈{row['p95_ms']:.0f}ms  "
+                  f"max={row['max_ms']:.0f}ms  examinados/retornados={row['examined_per_returned']:.1f}")
+
+
+# ============================================================================
+# PLANEJAMENTO DE CONSULTAS DE MÉTRICAS
+# ============================================================================
+
+class MetricQueryPlanner:
+    """
+    Planeja as chamadas GetMetricData de uma janela de tempo
+    
+    Escolhe o período pela retenção do CloudWatch (dados de 1 minuto só
+    existem por 15 dias, de 5 minutos por 63), divide janelas longas em
+    blocos alinhados a uma grade fixa para respeitar o limite de pontos por
+    chamada, busca os blocos em paralelo e devolve as séries em ordem.
+    Chamadas concorrentes que pedem o mesmo bloco da mesma série esperam
+    pela busca que já está em andamento, em vez de repeti-la.
+    """
+    
+    def __init__(self, max_workers=4, chunk_points=None, max_datapoints=None, max_points=None):
+        """
+        Inicializa o planejador
+        
+        Args:
+            max_workers (int): Blocos buscados ao mesmo tempo
+            chunk_points (int, optional): Pontos por série em cada bloco da grade
+                                          (padrão: METRIC_CHUNK_POINTS)
+            max_datapoints (int, optional): Limite de pontos por chamada GetMetricData
+                                            (padrão: MAX_METRIC_DATAPOINTS)
+            max_points (int, optional): Máximo de pontos por série; quando
+                                        informado, o período cresce até caber
+        """
+        self.max_workers = max_workers
+        self.chunk_points = chunk_points or METRIC_CHUNK_POINTS
+        self.max_datapoints = max_datapoints or MAX_METRIC_DATAPOINTS
+        self.max_points = max_points
+        self.stats = {'requests': 0, 'chunks': 0, 'calls': 0, 'shared': 0}
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def choose_period(self, start_time, end_time, now=None):
+        """
+        Escolhe o menor período disponível para a janela
+        
+        Args:
+            start_time (datetime): Início da janela
+            end_time (datetime): Fim da janela
+            now (datetime, optional): Instante atual (substituível em testes)
+            
+        Returns:
+            int: Período em segundos
+        """
+        now = now or datetime.now(timezone.utc)
+        age = _to_epoch(now) - _to_epoch(start_time)
+        period = METRIC_RETENTION_TIERS[-1][1]
+        for max_age, tier_period in METRIC_RETENTION_TIERS:
+            if max_age is None or age <= max_age:
+                period = tier_period
+                break
+        
+        if self.max_points:
+            needed = (_to_epoch(end_time) - _to_epoch(start_time)) / self.max_points
+            if needed > period:
+                larger = [p for p in STANDARD_METRIC_PERIODS if p >= needed]
+                period = larger[0] if larger else math.ceil(needed / 86400) * 86400
+        return period
+
+    def chunks(self, start_time, end_time, period):
+        """
+        Divide a janela em blocos da grade fixa do período
+        
+        A grade não depende da janela pedida, então janelas sobrepostas
+        geram os mesmos blocos internos (e podem compartilhar buscas).
+        
+        Returns:
+            list: Pares (início, fim) em segundos desde a época, alinhados ao período
+        """
+        start = math.floor(_to_epoch(start_time) / period) * period
+        end = math.ceil(_to_epoch(end_time) / period) * period
+        span = period * self.chunk_points
+        
+        chunks = []
+        chunk_start = start
+        while chunk_start < end:
+            chunk_end = min((chunk_start // span + 1) * span, end)
+            chunks.append((chunk_start, chunk_end))
+            chunk_start = chunk_end
+        return chunks
+
+    def fetch(self, fetch_chunk, keys, start_time, end_time, period):
+        """
+        Busca várias séries em uma janela, por blocos
+        
+        Args:
+            fetch_chunk (callable): fetch_chunk(chaves, início, fim, período) ->
+                                    {chave: [(timestamp, valor), ...] ou exceção
+                                    da consulta}; no máximo MAX_METRIC_DATA_QUERIES
+                                    chaves por chamada
+            keys (list): Séries desejadas (ex: (cluster, métrica, estatística))
+            start_time (datetime): Início da janela
+            end_time (datetime): Fim da janela
+            period (int): Período em segundos
+            
+        Returns:
+            dict: Chave -> pontos em ordem cronológica dentro de [início, fim),
+                  ou a exceção (DocumentDBError) do bloco que falhou
+        """
+        waits = []
+        units = []
+        with self._lock:
+            self.stats['requests'] += 1
+            for chunk in self.chunks(start_time, end_time, period):
+                to_fetch = []
+                for key in keys:
+                    flight_key = (key, period, chunk)
+                    future = self._inflight.get(flight_key)
+                    if future is None:
+                        future = self._inflight[flight_key] = Future()
+                        to_fetch.append(key)
+                    else:
+                        self.stats['shared'] += 1
+                    waits.append((key, future))
+                
+                if to_fetch:
+                    self.stats['chunks'] += 1
+                    points = max(1, (chunk[1] - chunk[0]) // period)
+                    per_call = max(1, min(MAX_METRIC_DATA_QUERIES, self.max_datapoints // points))
+                    for offset in range(0, len(to_fetch), per_call):
+                        units.append((to_fetch[offset:offset + per_call], chunk))
+        
+        if len(units) == 1:
+            self._run_unit(fetch_chunk, units[0], period)
+        elif units:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(units))) as pool:
+                list(pool.map(lambda unit: self._run_unit(fetch_chunk, unit, period), units))
+        
+        results = {key: [] for key in keys}
+        for key, future in waits:
+            if isinstance(results[key], Exception):
+                continue
+            error = future.exception()
+            if error is not None:
+                results[key] = error
+            else:
+                results[key].extend(future.result())
+        
+        # Os blocos seguem a grade do período e podem passar das bordas pedidas
+        window_start, window_end = _to_epoch(start_time), _to_epoch(end_time)
+        for key, points in results.items():
+            if not isinstance(points, Exception):
+                points = [point for point in points if window_start <= _to_epoch(point[0]) < window_end]
+                points.sort(key=lambda point: point[0])
+                results[key] = points
+        return results
+
+    def _run_unit(self, fetch_chunk, unit, period):
+        """
+        Busca um lote de séries em um bloco e resolve as buscas registradas
+        """
+        keys, (chunk_start, chunk_end) = unit
+        start = datetime.fromtimestamp(chunk_start, timezone.utc)
+        end = datetime.fromtimestamp(chunk_end, timezone.utc)
+        futures = [self._inflight[(key, period, (chunk_start, chunk_end))] for key in keys]
+        with self._lock:
+            self.stats['calls'] += 1
+        try:
+            points = fetch_chunk(keys, start, end, period)
+            for key, future in zip(keys, futures):
+                result = points.get(key, [])
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+        finally:
+            with self._lock:
+                for key in keys:
+                    self._inflight.pop((key, period, (chunk_start, chunk_end)), None)
+
+
+# ============================================================================
+# ARMAZENAMENTO LOCAL DE MÉTRICAS
+# ============================================================================
+
+def _to_epoch(value):
+    """
+    Converte datetime (ingênuo = UTC) em segundos desde a época
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class MetricStore:
+    """
+    Armazenamento local de séries temporais do CloudWatch
+    
+    Cada série (cluster/métrica/estatística/resolução) tem duas colunas em
+    arquivos binários de doubles: timestamps ('.ts') e valores ('.val').
+    Dados novos são apenas acrescentados ao final (lacunas antigas reescrevem
+    só o trecho a partir do primeiro ponto novo); leituras usam mmap e
+    busca binária, copiando só o trecho pedido. A cada gravação só os
+    buckets de 1h e 1d tocados pelos pontos novos são recalculados, sempre
+    a partir da resolução base. Um arquivo de cobertura por série registra
+    os intervalos já buscados, para que novas consultas peçam ao CloudWatch
+    apenas o que falta. Só a resolução base (5 minutos) vem do CloudWatch;
+    as demais são sempre derivadas dela.
+    """
+    
+    RESOLUTIONS = (('5m', 300), ('1h', 3600), ('1d', 86400))
+    ROLLUP_FUNCTIONS = {
+        'Average': lambda values: sum(values) / len(values),
+        'Maximum': max,
+        'Minimum': min,
+        'Sum': sum,
+        'SampleCount': sum
+    }
+    
+    def __init__(self, root, settle_seconds=600):
+        """
+        Inicializa o armazenamento
+        
+        Args:
+            root (str): Diretório base dos arquivos
+            settle_seconds (int): Dados mais recentes que isso não contam como
+                                  cobertos (o CloudWatch ainda pode completá-los)
+        """
+        self.root = root
+        self.settle_seconds = settle_seconds
+        self._lock = threading.RLock()
+
+    def _path(self, cluster, metric, stat, resolution):
+        return os.path.join(self.root, cluster, metric, resolution, stat)
+
+    @staticmethod
+    def _column_length(path):
+        """
+        Pontos completos de uma série: o menor comprimento entre as duas colunas
+        
+        Uma gravação interrompida entre '.ts' e '.val' deixa uma coluna
+        mais longa; os pontos a mais são ignorados (e descartados por _repair).
+        """
+        try:
+            return min(os.path.getsize(f"{path}.ts"), os.path.getsize(f"{path}.val")) // 8
+        except FileNotFoundError:
+            return 0
+
+    def _read_range(self, path, start=None, end=None):
+        """
+        Lê via mmap os pontos de uma série dentro de [start, end)
+        
+        Returns:
+            tuple: (array de timestamps, array de valores)
+        """
+        # Sob o lock: uma gravação pode truncar os arquivos mapeados
+        with self._lock:
+            length = self._column_length(path)
+            if length == 0:
+                return array('d'), array('d')
+            
+            with open(f"{path}.ts", 'rb') as ts_file, open(f"{path}.val", 'rb') as val_file:
+                with mmap.mmap(ts_file.fileno(), 0, access=mmap.ACCESS_READ) as ts_map, \
+                        mmap.mmap(val_file.fileno(), 0, access=mmap.ACCESS_READ) as val_map:
+                    timestamps = memoryview(ts_map).cast('d')[:length]
+                    values = memoryview(val_map).cast('d')[:length]
+                    try:
+                        lo = 0 if start is None else bisect_left(timestamps, start)
+                        hi = length if end is None else bisect_left(timestamps, end)
+                        return array('d', timestamps[lo:hi]), array('d', values[lo:hi])
+                    finally:
+                        timestamps.release()
+                        values.release()
+
+    def _repair(self, path):
+        """
+        Trunca as duas colunas ao mesmo número de pontos completos
+        """
+        length = self._column_length(path)
+        for suffix in ('.ts', '.val'):
+            if os.path.exists(path + suffix) and os.path.getsize(path + suffix) != length * 8:
+                logger.warning("⚠️ Série desalinhada reparada: %s", path)
+                os.truncate(path + suffix, length * 8)
+
+    def _upsert_points(self, path, points):
+        """
+        Grava pontos ordenados (epoch, valor) substituindo os de mesmo timestamp
+        
+        Só o trecho a partir do primeiro ponto novo é reescrito: pontos
+        posteriores ao último gravado são apenas acrescentados.
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._repair(path)
+        tail_ts, tail_values = self._read_range(path, start=points[0][0])
+        keep = self._column_length(path) - len(tail_ts)
+        if tail_ts:
+            merged = dict(zip(tail_ts, tail_values))
+            merged.update(points)
+            points = sorted(merged.items())
+            for suffix in ('.ts', '.val'):
+                os.truncate(path + suffix, keep * 8)
+        # '.ts' primeiro: se a gravação parar no meio, _column_length ignora a sobra
+        for suffix, column in (('.ts', array('d', (p[0] for p in points))),
+                               ('.val', array('d', (p[1] for p in points)))):
+            with open(path + suffix, 'ab') as f:
+                column.tofile(f)
+
+    def append(self, cluster, metric, stat, points):
+        """
+        Grava pontos (timestamp, valor) de uma série na resolução base
+        
+        Pontos posteriores ao último gravado são apenas acrescentados; pontos
+        que preenchem lacunas antigas disparam uma reescrita ordenada da série
+        
+        Args:
+            cluster (str): Identificador do cluster
+            metric (str): Nome da métrica
+            stat (str): Estatística ('Average', 'Maximum'...)
+            points (list): Pontos [(datetime, valor), ...]
+        """
+        if not points:
+            return
+        
+        new_points = sorted(dict((_to_epoch(ts), value) for ts, value in points).items())
+        path = self._path(cluster, metric, stat, self.RESOLUTIONS[0][0])
+        with self._lock:
+            self._upsert_points(path, new_points)
+            self._rollup(cluster, metric, stat, new_points[0][0], new_points[-1][0])
+
+    def _rollup(self, cluster, metric, stat, first, last):
+        """
+        Recalcula os buckets de 1h e 1d tocados por pontos entre first e last
+        
+        Todas as resoluções agregadas partem da resolução base, então a
+        média diária não é uma média de médias horárias incompletas.
+        """
+        aggregate = self.ROLLUP_FUNCTIONS.get(stat, self.ROLLUP_FUNCTIONS['Average'])
+        base_path = self._path(cluster, metric, stat, self.RESOLUTIONS[0][0])
+        for target, seconds in self.RESOLUTIONS[1:]:
+            start = first - first % seconds
+            end = last - last % seconds + seconds
+            timestamps, values = self._read_range(base_path, start, end)
+            buckets = {}
+            for ts, value in zip(timestamps, values):
+                buckets.setdefault(ts - ts % seconds, []).append(value)
+            
+            self._upsert_points(self._path(cluster, metric, stat, target),
+                                sorted((bucket, aggregate(group)) for bucket, group in buckets.items()))
+
+    def _coverage_path(self, cluster, metric, stat):
+        # Ao lado das colunas da resolução base: cobertura vale por estatística e período
+        return f"{self._path(cluster, metric, stat, self.RESOLUTIONS[0][0])}.coverage.json"
+
+    def coverage(self, cluster, metric, stat):
+        """
+        Intervalos [início, fim) já buscados no CloudWatch, em epoch
+        """
+        try:
+            with open(self._coverage_path(cluster, metric, stat), encoding='utf-8') as f:
+                return [tuple(interval) for interval in json.load(f)]
+        except FileNotFoundError:
+            return []
+
+    def _add_coverage(self, cluster, metric, stat, start, end):
+        with self._lock:
+            self._write_coverage(cluster, metric, stat, start, end)
+
+    def _write_coverage(self, cluster, metric, stat, start, end):
+        intervals = sorted(self.coverage(cluster, metric, stat) + [(start, end)])
+        merged = [list(intervals[0])]
+        for interval_start, interval_end in intervals[1:]:
+            if interval_start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], interval_end)
+            else:
+                merged.append([interval_start, interval_end])
+        
+        path = self._coverage_path(cluster, metric, stat)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump(merged, f)
+        os.replace(f"{path}.tmp", path)
+
+    def missing_ranges(self, cluster, metric, stat, start, end):
+        """
+        Trechos de [start, end) (epoch) que ainda não foram buscados
+        """
+        missing = []
+        cursor = start
+        for covered_start, covered_end in self.coverage(cluster, metric, stat):
+            if covered_end <= cursor:
+                continue
+            if covered_start >= end:
+                break
+            if covered_start > cursor:
+                missing.append((cursor, covered_start))
+            cursor = max(cursor, covered_end)
+        if cursor < end:
+            missing.append((cursor, end))
+        return missing
+
+    def fetch(self, fetch_series, cluster_identifiers, metric_names, start_time, end_time,
+              period=300, statistics=('Average',)):
+        """
+        Obtém séries usando o armazenamento local e buscando só o que falta
+        
+        Clusters/métricas com a mesma lacuna são buscados juntos em uma
+        única rodada de GetMetricData. Só a resolução base é armazenada:
+        outros períodos devem ir direto ao CloudWatch.
+        
+        Args:
+            fetch_series (callable): Busca no CloudWatch, com a assinatura de
+                                     DocumentDBManager._fetch_metric_series
+            cluster_identifiers (list): Identificadores dos clusters
+            metric_names (list): Nomes das métricas
+            start_time (datetime): Início da janela
+            end_time (datetime): Fim da janela
+            period (int): Período em segundos da resolução base
+            statistics (tuple): Estatísticas desejadas
+            
+        Returns:
+            dict: Mesmo formato de DocumentDBManager._fetch_metric_series
+            
+        Raises:
+            ValueError: Se period não for o da resolução base
+        """
+        base_period = self.RESOLUTIONS[0][1]
+        if period != base_period:
+            # Pontos de outro período misturados nos arquivos base corromperiam os rollups
+            raise ValueError(f"MetricStore guarda só o período de {base_period}s (recebido: {period})")
+        
+        start = _to_epoch(start_time)
+        end = _to_epoch(end_time)
+        settled = min(end, time.time() - self.settle_seconds)
+        failed = set()
+        
+        # Lacunas calculadas sob o lock; a busca na rede roda sem ele, para
+        # não bloquear query/append de outras threads durante as retentativas
+        with self._lock:
+            gaps = {}
+            for cluster in cluster_identifiers:
+                for metric in metric_names:
+                    for stat in statistics:
+                        for gap in self.missing_ranges(cluster, metric, stat, start, end):
+                            gaps.setdefault(gap, {}).setdefault(cluster, {}).setdefault(metric, []).append(stat)
+        
+        for (gap_start, gap_end), targets in gaps.items():
+            # Agrupa clusters que precisam exatamente das mesmas métricas/estatísticas
+            groups = {}
+            for cluster, metrics in targets.items():
+                wanted = tuple((metric, tuple(stats)) for metric, stats in metrics.items())
+                groups.setdefault(wanted, []).append(cluster)
+            
+            for wanted, clusters in groups.items():
+                wanted_stats = tuple(dict.fromkeys(stat for _, stats in wanted for stat in stats))
+                series = fetch_series(
+                    clusters, [metric for metric, _ in wanted],
+                    datetime.fromtimestamp(gap_start, timezone.utc),
+                    datetime.fromtimestamp(gap_end, timezone.utc),
+                    period, wanted_stats
+                )
+                # O trecho recente ainda pode mudar; não marca como coberto
+                covered_end = min(gap_end, settled - settled % period)
+                with self._lock:
+                    for cluster in clusters:
+                        for metric, _ in wanted:
+                            stats = series[cluster][metric]
+                            if stats is None:
+                                failed.add((cluster, metric))
+                                continue
+                            for stat, points in stats.items():
+                                self.append(cluster, metric, stat, points)
+                                if covered_end > gap_start:
+                                    self._add_coverage(cluster, metric, stat, gap_start, covered_end)
+        
+        return {
+            cluster: {
+                metric: None if (cluster, metric) in failed else {
+                    stat: self.query(cluster, metric, stat, start_time, end_time)
+                    for stat in statistics
+                }
+                for metric in metric_names
+            }
+            for cluster in cluster_identifiers
+        }
+
+    def query(self, cluster, metric, stat, start_time, end_time, resolution='5m'):
+        """
+        Lê pontos armazenados localmente, sem chamar a API
+        
+        Args:
+            cluster (str): Identificador do cluster
+            metric (str): Nome da métrica
+            stat (str): Estatística
+            start_time (datetime): Início da janela
+            end_time (datetime): Fim da janela
+            resolution (str): '5m', '1h' ou '1d'
+            
+        Returns:
+            list: Pontos [(datetime, valor), ...] em ordem cronológica
+        """
+        timestamps, values = self._read_range(
+            self._path(cluster, metric, stat, resolution),
+            _to_epoch(start_time), _to_epoch(end_time)
+        )
+        return [
+            (datetime.fromtimestamp(ts, timezone.utc), value)
+            for ts, value in zip(timestamps, values)
+        ]
+
+    def percentile(self, cluster, metric, stat, percent, start_time, end_time, resolution='5m'):
+        """
+        Percentil dos valores armazenados em uma janela
+        
+        Args:
+            percent (float): Percentil entre 0 e 100
+            
+        Returns:
+            float: Valor do percentil (None se não houver dados)
+        """
+        _, values = self._read_range(self._path(cluster, metric, stat, resolution),
+                                     _to_epoch(start_time), _to_epoch(end_time))
+        if not values:
+            return None
+        ordered = sorted(values)
+        rank = (len(ordered) - 1) * percent / 100
+        lower = int(rank)
+        upper = min(lower + 1, len(ordered) - 1)
+        return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+    def trend(self, cluster, metric, stat, start_time, end_time, resolution='5m'):
+        """
+        Tendência linear (mínimos quadrados) dos valores em uma janela
+        
+        Returns:
+            float: Variação por hora (None se houver menos de 2 pontos)
+        """
+        timestamps, values = self._read_range(self._path(cluster, metric, stat, resolution),
+                                              _to_epoch(start_time), _to_epoch(end_time))
+        count = len(values)
+        if count < 2:
+            return None
+        mean_ts = sum(timestamps) / count
+        mean_value = sum(values) / count
+        covariance = sum((ts - mean_ts) * (value - mean_value) for ts, value in zip(timestamps, values))
+        variance = sum((ts - mean_ts) ** 2 for ts in timestamps)
+        return covariance / variance * 3600 if variance else 0.0
+
+
+# ============================================================================
+# CATÁLOGO LOCAL DE SNAPSHOTS
+# ============================================================================
+
+class SnapshotCatalog:
+    """
+    Catálogo local de snapshots em SQLite, indexado para consultas de retenção
+    
+    A primeira atualização lê describe_db_cluster_snapshots inteiro; as
+    seguintes consultam só os eventos de 'db-cluster-snapshot' desde a
+    última sincronização e descrevem apenas os snapshots citados. Uma
+    reconciliação completa (que também remove snapshots apagados sem
+    evento, como os automáticos expirados) roda quando o catálogo fica
+    mais velho que full_refresh_seconds ou quando os eventos já não
+    cobrem o intervalo. As consultas não chamam a API.
+    """
+    
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS snapshots (
+               identifier TEXT PRIMARY KEY,
+               cluster_identifier TEXT NOT NULL,
+               status TEXT,
+               snapshot_type TEXT,
+               created_epoch REAL,
+               allocated_storage INTEGER NOT NULL DEFAULT 0,
+               engine TEXT,
+               engine_version TEXT,
+               generation INTEGER NOT NULL DEFAULT 0
+           )""",
+        "CREATE INDEX IF NOT EXISTS snapshots_by_cluster ON snapshots (cluster_identifier, snapshot_type, created_epoch)",
+        "CREATE INDEX IF NOT EXISTS snapshots_by_time ON snapshots (created_epoch, allocated_storage)",
+        "CREATE TABLE IF NOT EXISTS catalog_meta (key TEXT PRIMARY KEY, value REAL NOT NULL)"
+    )
+    COLUMNS = ('identifier', 'cluster_identifier', 'status', 'snapshot_type', 'created_epoch',
+               'allocated_storage', 'engine', 'engine_version')
+    
+    def __init__(self, manager, path=':memory:', full_refresh_seconds=None, max_incremental=50,
+                 clock=time.time):
+        """
+        Inicializa o catálogo
+        
+        Args:
+            manager (DocumentDBManager): Manager usado nas atualizações
+            path (str): Arquivo SQLite (':memory:' mantém só em memória)
+            full_refresh_seconds (int, optional): Idade máxima da última reconciliação
+                                                  completa (padrão: SNAPSHOT_FULL_REFRESH_SECONDS)
+            max_incremental (int): Snapshots citados em eventos acima dos quais
+                                   a atualização vira uma listagem completa
+            clock (callable): Relógio em segundos (substituível em testes)
+        """
+        import sqlite3
+        
+        self.manager = manager
+        self.full_refresh_seconds = full_refresh_seconds or SNAPSHOT_FULL_REFRESH_SECONDS
+        self.max_incremental = max_incremental
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            for statement in self.SCHEMA:
+                self._db.execute(statement)
+    
+    def close(self):
+        """
+        Fecha o banco do catálogo
+        """
+        self._db.close()
+    
+    def _meta(self, key):
+        row = self._db.execute("SELECT value FROM catalog_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    
+    def _set_meta(self, key, value):
+        self._db.execute("INSERT OR REPLACE INTO catalog_meta (key, value) VALUES (?, ?)", (key, value))
+    
+    @staticmethod
+    def _row(record, generation):
+        created = record.created_time
+        return (
+            record.identifier, record.cluster_identifier, record.status, record.snapshot_type,
+            _to_epoch(created) if created is not None else None,
+            record.allocated_storage or 0, record.engine, record.engine_version, generation
+        )
+    
+    def _upsert(self, records, generation):
+        return self._db.executemany(
+            "INSERT OR REPLACE INTO snapshots (identifier, cluster_identifier, status, snapshot_type, "
+            "created_epoch, allocated_storage, engine, engine_version, generation) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (self._row(record, generation) for record in records)
+        ).rowcount
+    
+    def _needs_full_refresh(self, now):
+        last_full = self._meta('last_full_refresh')
+        last_sync = self._meta('last_event_sync')
+        if last_full is None or last_sync is None:
+            return True
+        return (now - last_full > self.full_refresh_seconds
+                or now - last_sync > EVENT_RETENTION_SECONDS)
+    
+    def refresh(self, full=False, cluster_identifier=None, page_size=None):
+        """
+        Atualiza o catálogo a partir da API
+        
+        Args:
+            full (bool): Força a reconciliação completa
+            cluster_identifier (str, optional): Reconcilia só os snapshots deste cluster
+            page_size (int, optional): Itens por página da API
+            
+        Returns:
+            dict: Modo ('full', 'cluster' ou 'incremental'), snapshots gravados e removidos
+        """
+        with self._lock:
+            now = self.clock()
+            if cluster_identifier:
+                return self._reconcile(cluster_identifier, page_size)
+            if full or self._needs_full_refresh(now):
+                return self._reconcile(None, page_size, now)
+            return self._refresh_from_events(now, page_size)
+    
+    def _reconcile(self, cluster_identifier, page_size, now=None):
+        """
+        Relê a listagem (da frota ou de um cluster) e remove o que sumiu
+        """
+        generation = int(self._meta('generation') or 0) + 1
+        records = self.manager.iter_snapshots(cluster_identifier, page_size=page_size, compact=True)
+        with self._db:
+            upserted = self._upsert(records, generation)
+            if cluster_identifier:
+                deleted = self._db.execute(
+                    "DELETE FROM snapshots WHERE cluster_identifier = ? AND generation != ?",
+                    (cluster_identifier, generation)
+                ).rowcount
+            else:
+                deleted = self._db.execute("DELETE FROM snapshots WHERE generation != ?", (generation,)).rowcount
+                self._set_meta('last_full_refresh', now)
+                self._set_meta('last_event_sync', now)
+            self._set_meta('generation', generation)
+        
+        mode = 'cluster' if cluster_identifier else 'full'
+        logger.info("📚 Catálogo de snapshots (%s): %s gravados, %s removidos", mode, upserted, deleted)
+        return {'mode': mode, 'upserted': upserted, 'deleted': deleted}
+    
+    def _refresh_from_events(self, now, page_size):
+        """
+        Descreve só os snapshots citados em eventos desde a última sincronização
+        """
+        # Pequena sobreposição para eventos publicados com atraso
+        since = datetime.fromtimestamp(self._meta('last_event_sync') - 60, timezone.utc)
+        identifiers = {
+            event['source_id']
+            for event in self.manager.iter_events('db-cluster-snapshot', since, page_size=page_size)
+            if event['source_id'] != 'N/A'
+        }
+        if len(identifiers) > self.max_incremental:
+            return self._reconcile(None, page_size, now)
+        
+        generation = int(self._meta('generation') or 0)
+        upserted = deleted = 0
+        with self._db:
+            for identifier in sorted(identifiers):
+                try:
+                    response = self.manager._call('docdb', 'describe_db_cluster_snapshots',
+                                                  DBClusterSnapshotIdentifier=identifier)
+                    found = response['DBClusterSnapshots']
+                except ResourceNotFoundError:
+                    found = []
+                if found:
+                    upserted += self._upsert([SnapshotRecord.from_api(found[0])], generation)
+                else:
+                    deleted += self._db.execute("DELETE FROM snapshots WHERE identifier = ?",
+                                                (identifier,)).rowcount
+            self._set_meta('last_event_sync', now)
+        
+        logger.info("📚 Catálogo de snapshots (incremental): %s gravados, %s removidos", upserted, deleted)
+        return {'mode': 'incremental', 'upserted': upserted, 'deleted': deleted}
+    
+    # ------------------------------------------------------------------------
+    # Consultas (sem chamadas à API)
+    # ------------------------------------------------------------------------
+    
+    def _records(self, where='', params=(), suffix=''):
+        sql = f"SELECT {', '.join(self.COLUMNS)} FROM snapshots {where} {suffix}"
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [self._to_record(row) for row in rows]
+    
+    @staticmethod
+    def _to_record(row):
+        identifier, cluster, status, snapshot_type, created, storage, engine, version = row
+        return SnapshotRecord(
+            identifier, _intern(cluster), _intern(status), _intern(snapshot_type),
+            datetime.fromtimestamp(created, timezone.utc) if created is not None else None,
+            storage, _intern(engine), _intern(version)
+        )
+    
+    @staticmethod
+    def _filters(cluster_identifier=None, snapshot_type=None):
+        clauses, params = [], []
+        if cluster_identifier:
+            clauses.append("cluster_identifier = ?")
+            params.append(cluster_identifier)
+        if snapshot_type and snapshot_type != 'all':
+            clauses.append("snapshot_type = ?")
+            params.append(snapshot_type)
+        return clauses, params
+    
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+    
+    def snapshots(self, cluster_identifier=None, snapshot_type='all'):
+        """
+        Snapshots do catálogo, do mais novo para o mais antigo
+        
+        Args:
+            cluster_identifier (str, optional): Filtrar por cluster
+            snapshot_type (str): 'manual', 'automated', ou 'all'
+            
+        Returns:
+            list: SnapshotRecord encontrados
+        """
+        clauses, params = self._filters(cluster_identifier, snapshot_type)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        return self._records(where, params, "ORDER BY created_epoch DESC")
+    
+    def older_than(self, days, min_storage_gb=None, snapshot_type='all', cluster_identifier=None):
+        """
+        Snapshots criados há mais de N dias (candidatos à retenção)
+        
+        Args:
+            days (float): Idade mínima em dias
+            min_storage_gb (int, optional): Considera só snapshots com pelo menos este tamanho
+            snapshot_type (str): 'manual', 'automated', ou 'all'
+            cluster_identifier (str, optional): Filtrar por cluster
+            
+        Returns:
+            list: SnapshotRecord, do mais antigo para o mais novo
+        """
+        clauses, params = self._filters(cluster_identifier, snapshot_type)
+        clauses.append("created_epoch < ?")
+        params.append(self.clock() - days * 86400)
+        if min_storage_gb is not None:
+            clauses.append("allocated_storage >= ?")
+            params.append(min_storage_gb)
+        return self._records(f"WHERE {' AND '.join(clauses)}", params, "ORDER BY created_epoch")
+    
+    def latest_per_cluster(self, snapshot_type='all'):
+        """
+        Snapshot mais recente de cada cluster
+        
+        Args:
+            snapshot_type (str): 'manual', 'automated', ou 'all'
+            
+        Returns:
+            dict: cluster_identifier -> SnapshotRecord
+        """
+        clauses, params = self._filters(snapshot_type=snapshot_type)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        # Com MAX(), o SQLite devolve as demais colunas da linha que tem o máximo
+        sql = (f"SELECT {', '.join(self.COLUMNS[:4])}, MAX(created_epoch), {', '.join(self.COLUMNS[5:])} "
+               f"FROM snapshots {where} GROUP BY cluster_identifier")
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return {row[1]: self._to_record(row) for row in rows}
+    
+    def storage_totals(self, group_by='cluster_identifier', snapshot_type='all'):
+        """
+        Quantidade e armazenamento alocado somados por grupo
+        
+        Args:
+            group_by (str): 'cluster_identifier', 'snapshot_type' ou 'engine_version'
+            snapshot_type (str): 'manual', 'automated', ou 'all'
+            
+        Returns:
+            dict: grupo -> {'snapshots': int, 'allocated_storage_gb': int}
+        """
+        if group_by not in ('cluster_identifier', 'snapshot_type', 'engine_version'):
+            raise ValueError(f"Agrupamento não suportado: {group_by}")
+        clauses, params = self._filters(snapshot_type=snapshot_type)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        sql = (f"SELECT {group_by}, COUNT(*), SUM(allocated_storage) FROM snapshots {where} "
+               f"GROUP BY {group_by} ORDER BY {group_by}")
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return {
+            key: {'snapshots': count, 'allocated_storage_gb': total or 0}
+            for key, count, total in rows
+        }
+
+
+# ============================================================================
+# AUDITORIA DE PARAMETER GROUPS
+# ============================================================================
+
+class ParameterGroupAuditor:
+    """
+    Impressões digitais dos parameter groups da frota e matriz de divergências
+    
+    Cada refresh lê os clusters numa listagem em lote, descobre os parameter
+    groups distintos e busca cada um uma única vez, em paralelo e com todas
+    as páginas. Os parâmetros ficam guardados pela impressão digital do
+    conteúdo: groups idênticos compartilham a mesma entrada, e clusters com
+    a mesma impressão digital da baseline nem precisam ser comparados.
+    """
+    
+    def __init__(self, manager, parameter_names=None, max_workers=8, ttl=300, clock=time.time):
+        """
+        Inicializa o auditor
+        
+        Args:
+            manager (DocumentDBManager): Manager usado nas buscas
+            parameter_names (list, optional): Parâmetros comparados (padrão: IMPORTANT_PARAMETERS)
+            max_workers (int): Parameter groups buscados em paralelo
+            ttl (int): Segundos em que um group buscado é reaproveitado entre refreshes
+            clock (callable): Relógio em segundos (substituível em testes)
+        """
+        self.manager = manager
+        self.parameter_names = list(parameter_names or IMPORTANT_PARAMETERS)
+        self.max_workers = max_workers
+        self.ttl = ttl
+        self.clock = clock
+        self.cluster_groups = {}     # cluster -> nome do parameter group
+        self.group_fingerprints = {}  # nome do group -> impressão digital
+        self.parameters = {}         # impressão digital -> {parâmetro: valor}
+        self._fetched_at = {}        # nome do group -> instante da busca
+    
+    @staticmethod
+    def fingerprint(values):
+        """
+        Impressão digital estável de um conjunto de parâmetros
+        
+        Args:
+            values (dict): Parâmetro -> valor
+            
+        Returns:
+            str: Hash SHA-256 (16 primeiros hexadecimais) do conteúdo ordenado
+        """
+        content = json.dumps(sorted(values.items()), separators=(',', ':'))
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+    
+    def _fetch_group(self, group_name):
+        """
+        Busca todas as páginas de um parameter group
+        """
+        return {
+            param.name: param.value
+            for param in self.manager.iter_parameter_group_parameters(group_name, compact=True)
+        }
+    
+    def refresh(self, cluster_identifiers=None, force=False):
+        """
+        Mapeia clusters a parameter groups e busca cada group distinto uma vez
+        
+        Args:
+            cluster_identifiers (list, optional): Clusters auditados (todos se None)
+            force (bool): Busca de novo mesmo os groups ainda dentro do ttl
+            
+        Returns:
+            dict: Clusters mapeados, groups distintos, buscados e com falha
+        """
+        details = self.manager.get_clusters_details(cluster_identifiers)
+        self.cluster_groups = {
+            cluster: info['configuration']['parameter_group']
+            for cluster, info in details.items()
+            if info and info['configuration']['parameter_group'] != 'N/A'
+        }
+        
+        now = self.clock()
+        groups = sorted(set(self.cluster_groups.values()))
+        stale = [
+            group for group in groups
+            if force or group not in self.group_fingerprints or now - self._fetched_at[group] > self.ttl
+        ]
+        
+        failed = []
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(stale)))) as pool:
+            futures = {pool.submit(self._fetch_group, group): group for group in stale}
+            for future in as_completed(futures):
+                group = futures[future]
+                try:
+                    values = future.result()
+                except (ThrottlingError, AccessDeniedError):
+                    raise
+                except DocumentDBError as e:
+                    logger.error("❌ Erro ao buscar parameter group %s: %s", group, e)
+                    self.group_fingerprints.pop(group, None)
+                    failed.append(group)
+                    continue
+                fingerprint = self.fingerprint(values)
+                self.parameters.setdefault(fingerprint, values)
+                self.group_fingerprints[group] = fingerprint
+                self._fetched_at[group] = now
+        
+        # Descarta conteúdos que nenhum group usa mais
+        in_use = set(self.group_fingerprints.values())
+        self.parameters = {fp: values for fp, values in self.parameters.items() if fp in in_use}
+        
+        logger.info("🧬 %s clusters em %s parameter groups (%s buscados, %s conteúdos distintos)",
+                    len(self.cluster_groups), len(groups), len(stale), len(in_use))
+        return {
+            'clusters': len(self.cluster_groups),
+            'groups': len(groups),
+            'fetched': len(stale) - len(failed),
+            'failed': sorted(failed)
+        }
+    
+    def cluster_parameters(self, cluster_identifier):
+        """
+        Parâmetros efetivos do parameter group de um cluster
+        
+        Args:
+            cluster_identifier (str): Identificador do cluster
+            
+        Returns:
+            dict: Parâmetro -> valor (None se o group não foi obtido)
+        """
+        fingerprint = self.group_fingerprints.get(self.cluster_groups.get(cluster_identifier))
+        return self.parameters.get(fingerprint)
+    
+    def _baseline(self, baseline):
+        """
+        Resolve a baseline: dict de valores, nome de group, cluster ou a maioria
+        
+        Returns:
+            tuple: (valores esperados, impressão digital ou None)
+        """
+        if isinstance(baseline, dict):
+            return baseline, None
+        if baseline in self.group_fingerprints:
+            fingerprint = self.group_fingerprints[baseline]
+            return self.parameters[fingerprint], fingerprint
+        if baseline in self.cluster_groups:
+            fingerprint = self.group_fingerprints.get(self.cluster_groups[baseline])
+            if fingerprint is None:
+                raise ValueError(f"Parameter group do cluster '{baseline}' não foi obtido")
+            return self.parameters[fingerprint], fingerprint
+        if baseline is not None:
+            raise ValueError(f"Baseline desconhecida: {baseline}")
+        
+        # Sem baseline explícita, vale o conteúdo usado pela maioria dos clusters
+        counts = {}
+        for group in self.cluster_groups.values():
+            fingerprint = self.group_fingerprints.get(group)
+            if fingerprint:
+                counts[fingerprint] = counts.get(fingerprint, 0) + 1
+        if not counts:
+            return {}, None
+        fingerprint = max(sorted(counts), key=counts.get)
+        return self.parameters[fingerprint], fingerprint
+    
+    def drift_matrix(self, baseline=None, parameter_names=None):
+        """
+        Matriz de divergências dos clusters em relação a uma baseline
+        
+        Args:
+            baseline (str|dict, optional): Nome de parameter group, identificador de
+                                           cluster ou dict parâmetro -> valor esperado
+                                           (padrão: conteúdo da maioria dos clusters)
+            parameter_names (list, optional): Parâmetros comparados (padrão: os do auditor)
+            
+        Returns:
+            dict: 'baseline' (valores esperados), 'drift' (cluster -> parâmetro ->
+                  {'expected', 'actual'}), 'in_sync' (clusters iguais) e
+                  'unknown' (clusters cujo group não foi obtido)
+        """
+        names = list(parameter_names or self.parameter_names)
+        expected_values, baseline_fingerprint = self._baseline(baseline)
+        expected = {name: expected_values.get(name) for name in names}
+        
+        drift, in_sync, unknown = {}, [], []
+        # Uma comparação por conteúdo distinto, não por cluster
+        by_fingerprint = {}
+        for cluster in sorted(self.cluster_groups):
+            fingerprint = self.group_fingerprints.get(self.cluster_groups[cluster])
+            if fingerprint is None:
+                unknown.append(cluster)
+                continue
+            if fingerprint not in by_fingerprint:
+                if fingerprint == baseline_fingerprint:
+                    by_fingerprint[fingerprint] = {}
+                else:
+                    actual = self.parameters[fingerprint]
+                    by_fingerprint[fingerprint] = {
+                        name: {'expected': expected[name], 'actual': actual.get(name)}
+                        for name in names
+                        if actual.get(name) != expected[name]
+                    }
+            differences = by_fingerprint[fingerprint]
+            if differences:
+                drift[cluster] = differences
+            else:
+                in_sync.append(cluster)
+        
+        return {'baseline': expected, 'drift': drift, 'in_sync': in_sync, 'unknown': unknown}
+    
+    def print_drift_report(self, baseline=None, parameter_names=None):
+        """
+        Imprime os clusters que divergem da baseline, parâmetro a parâmetro
+        
+        Args:
+            baseline (str|dict, optional): Ver drift_matrix
+            parameter_names (list, optional): Parâmetros comparados
+        """
+        matrix = self.drift_matrix(baseline, parameter_names)
+        print(f"\n🧬 DIVERGÊNCIA DE PARAMETER GROUPS ({len(matrix['in_sync'])} clusters iguais à baseline):")
+        for name, value in matrix['baseline'].items():
+            print(f"  • {name} = {value}")
+        for cluster, differences in matrix['drift'].items():
+            print(f"\n  ⚠️ {cluster} ({self.cluster_groups[cluster]}):")
+            for name, values in differences.items():
+                print(f"    {name}: {values['actual']} (esperado: {values['expected']})")
+        if matrix['unknown']:
+            print(f"\n  ❓ Sem parâmetros obtidos: {', '.join(matrix['unknown'])}")
+
+
+# ============================================================================
+# RELATÓRIO DA FROTA EM FLUXO
+# ============================================================================
+
+class FleetReportExporter:
+    """
+    Resumos por cluster emitidos à medida que ficam prontos
+    
+    Os clusters são processados em lotes: cada lote busca detalhes,
+    instâncias e métricas com as chamadas agrupadas de print_fleet_summary,
+    e vários lotes rodam em paralelo. Só uma janela fixa de lotes fica em
+    andamento, então a memória não cresce com o tamanho da frota. Sem
+    identificadores, a própria listagem paginada alimenta os lotes e os
+    primeiros resumos saem antes de a frota inteira ser listada.
+    """
+    
+    # Colunas do formato tabular (write_columnar); métricas viram <métrica>_avg/_max
+    COLUMNS = (
+        'cluster', 'status', 'engine', 'created', 'endpoint', 'reader_endpoint', 'port',
+        'multi_az', 'backup_retention_period', 'storage_encrypted', 'parameter_group',
+        'instance_count', 'writer', 'instance_classes', 'connection_string', 'error'
+    )
+    
+    def __init__(self, manager, batch_size=25, max_workers=4, ordered=False, hours=1, metric_names=None):
+        """
+        Inicializa o exportador
+        
+        Args:
+            manager (DocumentDBManager): Manager usado nas buscas
+            batch_size (int): Clusters por lote (lotes menores = primeiros resumos mais cedo)
+            max_workers (int): Lotes processados em paralelo
+            ordered (bool): Mantém a ordem da listagem (senão, ordem de conclusão)
+            hours (int): Janela das métricas
+            metric_names (list, optional): Métricas desejadas (padrão: DEFAULT_METRICS)
+        """
+        self.manager = manager
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.ordered = ordered
+        self.hours = hours
+        self.metric_names = list(metric_names or DEFAULT_METRICS)
+    
+    def _batches(self, cluster_identifiers, page_size):
+        """
+        Lotes de (identificador, detalhes ou None) na ordem da listagem
+        """
+        if cluster_identifiers is not None:
+            identifiers = list(dict.fromkeys(cluster_identifiers))
+            for chunk in self.manager._chunked(identifiers, self.batch_size):
+                yield [(identifier, None) for identifier in chunk]
+            return
+        
+        # A listagem já traz os detalhes: nada é descrito duas vezes
+        batch = []
+        for cluster in self.manager._paginate('describe_db_clusters', 'DBClusters', page_size):
+            batch.append((cluster['DBClusterIdentifier'], self.manager._normalize_cluster_details(cluster)))
+            if len(batch) == self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    def _collect_batch(self, batch, page_size):
+        """
+        Busca instâncias e métricas de um lote e monta os resumos
+        
+        Returns:
+            list: Resumos do lote, na ordem do lote
+        """
+        identifiers = [identifier for identifier, _ in batch]
+        details = dict(batch)
+        try:
+            missing = [identifier for identifier in identifiers if details[identifier] is None]
+            if missing:
+                details.update(self.manager.get_clusters_details(missing, page_size))
+            found = [identifier for identifier in identifiers if details[identifier]]
+            instances = self.manager.list_instances_by_cluster(found, page_size) if found else {}
+            metrics = self.manager.get_fleet_metrics(found, self.hours, self.metric_names) if found else {}
+        except (ThrottlingError, AccessDeniedError):
+            raise
+        except DocumentDBError as e:
+            logger.error("❌ Erro ao coletar lote de %s clusters: %s", len(identifiers), e)
+            return [self._summary(identifier, None, [], {}, error=str(e)) for identifier in identifiers]
+        
+        return [
+            self._summary(identifier, details[identifier], instances.get(identifier, []),
+                          metrics.get(identifier, {}))
+            for identifier in identifiers
+        ]
+    
+    def _summary(self, identifier, details, instances, metrics, error=None):
+        """
+        Resumo de um cluster: detalhes, instâncias, métricas e conexão
+        """
+        if details is None and error is None:
+            error = 'not_found'
+        return {
+            'cluster': identifier,
+            'details': details,
+            'instances': instances,
+            'metrics': metrics,
+            'connection_string': self.manager._build_connection_string(details) if details else None,
+            'error': error
+        }
+    
+    def iter_summaries(self, cluster_identifiers=None, page_size=None):
+        """
+        Gera os resumos dos clusters à medida que cada lote termina
+        
+        Args:
+            cluster_identifiers (list, optional): Clusters desejados (todos se None)
+            page_size (int, optional): Itens por página da API
+            
+        Yields:
+            dict: Resumo de um cluster ('cluster', 'details', 'instances',
+                  'metrics', 'connection_string', 'error')
+        """
+        batches = self._batches(cluster_identifiers, page_size)
+        window = self.max_workers * 2
+        pending = deque()
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            try:
+                exhausted = False
+                while True:
+                    while not exhausted and len(pending) < window:
+                        batch = next(batches, None)
+                        if batch is None:
+                            exhausted = True
+                        else:
+                            pending.append(pool.submit(self._collect_batch, batch, page_size))
+                    if not pending:
+                        break
+                    
+                    if self.ordered:
+                        done = pending.popleft()
+                    else:
+                        done = next(iter(wait(pending, return_when=FIRST_COMPLETED).done))
+                        pending.remove(done)
+                    yield from done.result()
+            finally:
+                # Consumidor parou no meio: não inicia os lotes que faltam
+                for future in pending:
+                    future.cancel()
+    
+    def write_ndjson(self, output, cluster_identifiers=None, page_size=None):
+        """
+        Grava um resumo por linha em JSON (NDJSON), à medida que ficam prontos
+        
+        Args:
+            output (str|file): Caminho ou arquivo aberto para texto (ex: sys.stdout)
+            cluster_identifiers (list, optional): Clusters desejados (todos se None)
+            page_size (int, optional): Itens por página da API
+            
+        Returns:
+            int: Quantidade de resumos gravados
+        """
+        if isinstance(output, str):
+            with open(output, 'w', encoding='utf-8') as f:
+                return self.write_ndjson(f, cluster_identifiers, page_size)
+        
+        count = 0
+        for summary in self.iter_summaries(cluster_identifiers, page_size):
+            output.write(json.dumps(summary, default=_json_default, ensure_ascii=False) + '\n')
+            # Cada linha sai já, para quem lê por pipe
+            output.flush()
+            count += 1
+        return count
+    
+    def flatten(self, summary):
+        """
+        Converte um resumo numa linha tabular com as colunas de COLUMNS e métricas
+        
+        Args:
+            summary (dict): Resumo de iter_summaries
+            
+        Returns:
+            dict: Coluna -> valor escalar
+        """
+        details = summary['details'] or {}
+        basic = details.get('basic_info', {})
+        connectivity = details.get('connectivity', {})
+        configuration = details.get('configuration', {})
+        writers = [m['identifier'] for m in details.get('members', []) if m['is_writer']]
+        created = basic.get('created')
+        
+        row = {
+            'cluster': summary['cluster'],
+            'status': basic.get('status'),
+            'engine': basic.get('engine'),
+            'created': created.isoformat() if isinstance(created, datetime) else created,
+            'endpoint': connectivity.get('endpoint'),
+            'reader_endpoint': connectivity.get('reader_endpoint'),
+            'port': connectivity.get('port'),
+            'multi_az': configuration.get('multi_az'),
+            'backup_retention_period': configuration.get('backup_retention_period'),
+            'storage_encrypted': configuration.get('storage_encrypted'),
+            'parameter_group': configuration.get('parameter_group'),
+            'instance_count': len(summary['instances']),
+            'writer': writers[0] if writers else None,
+            'instance_classes': ','.join(sorted({i['instance_class'] for i in summary['instances']})),
+            'connection_string': summary['connection_string'],
+            'error': summary['error']
+        }
+        for metric_name in self.metric_names:
+            metric = summary['metrics'].get(metric_name)
+            row[f'{metric_name}_avg'] = metric['latest_average'] if metric else None
+            row[f'{metric_name}_max'] = metric['latest_maximum'] if metric else None
+        return row
+    
+    def write_columnar(self, path, cluster_identifiers=None, page_size=None, row_group_size=1000,
+                       format='parquet'):
+        """
+        Grava os resumos em formato tabular (Parquet ou CSV)
+        
+        Cada row group é gravado assim que enche, então só row_group_size
+        linhas ficam em memória.
+        
+        Args:
+            path (str): Arquivo de saída; com format='csv', uma extensão
+                        .parquet vira .csv
+            cluster_identifiers (list, optional): Clusters desejados (todos se None)
+            page_size (int, optional): Itens por página da API
+            row_group_size (int): Linhas por row group (Parquet)
+            format (str): 'parquet' (requer pyarrow) ou 'csv'
+            
+        Returns:
+            int: Quantidade de resumos gravados
+            
+        Raises:
+            ImportError: format='parquet' sem pyarrow instalado
+        """
+        if format not in ('parquet', 'csv'):
+            raise ValueError(f"Formato inválido: {format}")
+        if format == 'parquet':
+            try:
+                import pyarrow
+                import pyarrow.parquet
+            except ImportError:
+                raise ImportError("Parquet requer pyarrow: pip install pyarrow "
+                                  "(ou use format='csv')") from None
+        
+        columns = list(self.COLUMNS) + [
+            f'{metric_name}_{stat}' for metric_name in self.metric_names for stat in ('avg', 'max')
+        ]
+        rows = (self.flatten(summary) for summary in self.iter_summaries(cluster_identifiers, page_size))
+        
+        if format == 'csv':
+            import csv
+            root, extension = os.path.splitext(path)
+            if extension.lower() == '.parquet':
+                path = f"{root}.csv"
+            count = 0
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=columns)
+                writer.writeheader()
+                for row in rows:
+                    writer.writerow(row)
+                    count += 1
+            return count
+        
+        string_columns = {'cluster', 'status', 'engine', 'created', 'endpoint', 'reader_endpoint',
+                          'parameter_group', 'writer', 'instance_classes', 'connection_string', 'error'}
+        types = {'port': pyarrow.int64(), 'instance_count': pyarrow.int64(),
+                 'backup_retention_period': pyarrow.int64(), 'multi_az': pyarrow.bool_(),
+                 'storage_encrypted': pyarrow.bool_()}
+        schema = pyarrow.schema([
+            (column, pyarrow.string() if column in string_columns else types.get(column, pyarrow.float64()))
+            for column in columns
+        ])
+        
+        count = 0
+        with pyarrow.parquet.ParquetWriter(path, schema) as writer:
+            group = []
+            for row in rows:
+                group.append(row)
+                count += 1
+                if len(group) == row_group_size:
+                    writer.write_table(pyarrow.Table.from_pylist(group, schema=schema))
+                    group = []
+            if group:
+                writer.write_table(pyarrow.Table.from_pylist(group, schema=schema))
+        return count
+
+
+# ============================================================================
+# ANÁLISE VETORIZADA DE MÉTRICAS (NumPy)
+# ============================================================================
+
+class MetricAnalytics:
+    """
+    Análise vetorizada de muitas séries de métricas ao mesmo tempo
+    
+    As séries ficam em duas matrizes (séries x pontos), alinhadas à
+    esquerda e completadas com NaN. Percentis, taxa de variação, médias
+    móveis e z-scores são calculados sobre a matriz inteira, sem laços
+    Python por ponto.
+    """
+    
+    def __init__(self, keys, timestamps, values):
+        """
+        Inicializa a análise
+        
+        Args:
+            keys (list): Identificação de cada série, ex: [(cluster, métrica), ...]
+            timestamps: Matriz (séries x pontos) de epochs, NaN onde não há ponto
+            values: Matriz (séries x pontos) de valores, NaN onde não há ponto
+        """
+        _load_numpy()
+        self.keys = list(keys)
+        self.timestamps = np.asarray(timestamps, dtype=np.float64)
+        self.values = np.asarray(values, dtype=np.float64)
+        self.valid = ~np.isnan(self.values)
+        self.counts = self.valid.sum(axis=1)
+
+    @classmethod
+    def from_columns(cls, keys, columns):
+        """
+        Monta a análise a partir de colunas (timestamps, valores) por série
+        
+        Args:
+            keys (list): Identificação de cada série
+            columns (list): Pares (timestamps, valores) em sequências de floats
+                            ou arrays, um por série
+        """
+        _load_numpy()
+        width = max((len(ts) for ts, _ in columns), default=0)
+        timestamps = np.full((len(columns), width), np.nan)
+        values = np.full((len(columns), width), np.nan)
+        for row, (ts, vals) in enumerate(columns):
+            timestamps[row, :len(ts)] = ts
+            values[row, :len(vals)] = vals
+        return cls(keys, timestamps, values)
+
+    @classmethod
+    def from_series(cls, series, stat='Average'):
+        """
+        Monta a análise a partir do formato de _fetch_metric_series
+        
+        Args:
+            series (dict): {cluster: {métrica: {estatística: [(datetime, valor), ...]}}}
+            stat (str): Estatística analisada
+        """
+        keys, columns = [], []
+        for cluster, metrics in series.items():
+            for metric, stats in metrics.items():
+                if not stats or not stats.get(stat):
+                    continue
+                points = stats[stat]
+                keys.append((cluster, metric))
+                columns.append(([_to_epoch(ts) for ts, _ in points], [value for _, value in points]))
+        return cls.from_columns(keys, columns)
+
+    @classmethod
+    def from_store(cls, store, cluster_identifiers, metric_names, stat, start_time, end_time,
+                   resolution='5m'):
+        """
+        Monta a análise direto das colunas de um MetricStore, sem conversões por ponto
+        """
+        _load_numpy()
+        keys, columns = [], []
+        start, end = _to_epoch(start_time), _to_epoch(end_time)
+        for cluster in cluster_identifiers:
+            for metric in metric_names:
+                ts, vals = store._read_range(store._path(cluster, metric, stat, resolution), start, end)
+                if ts:
+                    keys.append((cluster, metric))
+                    columns.append((np.frombuffer(ts), np.frombuffer(vals)))
+        return cls.from_columns(keys, columns)
+
+    def percentiles(self, percents=(50, 95, 99)):
+        """
+        Percentis de cada série (interpolação linear)
+        
+        Returns:
+            ndarray: Matriz (séries x percentis), NaN para séries vazias
+        """
+        # Uma ordenação por linha serve a todos os percentis; NaN fica no fim
+        ordered = np.sort(self.values, axis=1)
+        last = np.maximum(self.counts - 1, 0)
+        result = np.empty((len(self.keys), len(percents)))
+        for column, percent in enumerate(percents):
+            rank = last * (percent / 100)
+            lower = np.floor(rank).astype(np.intp)
+            upper = np.minimum(lower + 1, last)
+            low_values = np.take_along_axis(ordered, lower[:, None], axis=1)[:, 0]
+            high_values = np.take_along_axis(ordered, upper[:, None], axis=1)[:, 0]
+            result[:, column] = low_values + (high_values - low_values) * (rank - lower)
+        result[self.counts == 0] = np.nan
+        return result
+
+    def rate_of_change(self):
+        """
+        Variação por segundo entre pontos consecutivos
+        
+        Returns:
+            ndarray: Matriz (séries x pontos-1)
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.diff(self.values, axis=1) / np.diff(self.timestamps, axis=1)
+
+    def latest_rate(self):
+        """
+        Última variação por segundo de cada série
+        
+        Returns:
+            ndarray: Vetor por série, NaN com menos de 2 pontos
+        """
+        rows = np.arange(len(self.keys))
+        last = np.maximum(self.counts - 1, 0)
+        previous = np.maximum(self.counts - 2, 0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rate = ((self.values[rows, last] - self.values[rows, previous])
+                    / (self.timestamps[rows, last] - self.timestamps[rows, previous]))
+        rate[self.counts < 2] = np.nan
+        return rate
+
+    def rolling_mean(self, window=6):
+        """
+        Média móvel de cada série (somas acumuladas, sem laço por ponto)
+        
+        Returns:
+            ndarray: Matriz (séries x pontos), NaN antes de completar a janela
+        """
+        filled = np.where(self.valid, self.values, 0.0)
+        sums = np.cumsum(filled, axis=1)
+        sums[:, window:] -= sums[:, :-window].copy()
+        counts = np.cumsum(self.valid, axis=1)
+        counts[:, window:] -= counts[:, :-window].copy()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = sums / counts
+        means[counts < window] = np.nan
+        return means
+
+    def latest_rolling_mean(self, window=6):
+        """
+        Média dos últimos `window` pontos de cada série
+        
+        Returns:
+            ndarray: Vetor por série, NaN com menos de `window` pontos
+        """
+        offsets = np.arange(-window + 1, 1)
+        columns = np.clip((self.counts - 1)[:, None] + offsets, 0, None)
+        means = np.take_along_axis(self.values, columns, axis=1).mean(axis=1)
+        means[self.counts < window] = np.nan
+        return means
+
+    def _deviations(self):
+        """
+        Desvios em relação à média de cada série e desvio padrão por série
+        
+        Returns:
+            tuple: (matriz de desvios com NaN onde não há ponto, vetor de desvios padrão)
+        """
+        counts = np.maximum(self.counts, 1)
+        if self.counts.min() == self.values.shape[1]:
+            # Caso comum (todas as séries completas): dispensa as máscaras
+            means = self.values.mean(axis=1)
+            deviations = self.values - means[:, None]
+            squares = np.einsum('ij,ij->i', deviations, deviations)
+        else:
+            # Duas passagens (média, depois desvios centrados) com as lacunas
+            # zeradas: E[x²] - E[x]² perde precisão em métricas grandes (bytes, IOPS)
+            filled = np.where(self.valid, self.values, 0.0)
+            means = filled.sum(axis=1) / counts
+            deviations = self.values - means[:, None]
+            centred = np.where(self.valid, deviations, 0.0)
+            squares = np.einsum('ij,ij->i', centred, centred)
+        return deviations, np.sqrt(np.maximum(squares, 0.0) / counts)
+
+    def zscores(self):
+        """
+        Z-score de cada ponto em relação à média e desvio da própria série
+        
+        Returns:
+            ndarray: Matriz (séries x pontos), NaN onde não há ponto
+        """
+        deviations, stds = self._deviations()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            deviations /= stds[:, None]
+        deviations[stds == 0] = 0.0
+        deviations[~self.valid] = np.nan
+        return deviations
+
+    def anomalies(self, threshold=3.0):
+        """
+        Pontos cujo |z-score| passa do limite
+        
+        Returns:
+            ndarray: Matriz booleana (séries x pontos)
+        """
+        # |desvio| > limite * desvio padrão evita dividir a matriz inteira;
+        # comparações com NaN dão False, então pontos ausentes ficam de fora
+        deviations, stds = self._deviations()
+        np.abs(deviations, out=deviations)
+        return deviations > (threshold * stds)[:, None]
+
+    def summary(self, window=6, threshold=3.0):
+        """
+        Resumo por série: percentis, última variação, última média móvel e anomalias
+        
+        Returns:
+            dict: Vetores NumPy alinhados com self.keys
+        """
+        percentiles = self.percentiles((50, 95, 99))
+        rows = np.arange(len(self.keys))
+        last = np.maximum(self.counts - 1, 0)
+        anomalies = self.anomalies(threshold)
+        return {
+            'p50': percentiles[:, 0],
+            'p95': percentiles[:, 1],
+            'p99': percentiles[:, 2],
+            'latest_rate': self.latest_rate(),
+            'rolling_mean': self.latest_rolling_mean(window),
+            'anomaly_count': anomalies.sum(axis=1),
+            'latest_anomaly': anomalies[rows, last]
+        }
+
+    def rank(self, metric, by='p95', top=10, summary=None):
+        """
+        Clusters mais "quentes" em uma métrica
+        
+        Args:
+            metric (str): Métrica, ex: 'ReadLatency' ou 'CPUUtilization'
+            by (str): Coluna do resumo usada na ordenação
+            top (int): Quantidade de clusters retornados
+            summary (dict, optional): Resumo já calculado por summary()
+            
+        Returns:
+            list: [{'cluster', 'metric', by, 'anomaly_count'}, ...] em ordem decrescente
+        """
+        summary = summary or self.summary()
+        rows = np.array([row for row, key in enumerate(self.keys) if key[1] == metric], dtype=np.intp)
+        if not len(rows):
+            return []
+        
+        scores = np.nan_to_num(summary[by][rows], nan=-np.inf)
+        order = rows[np.argsort(-scores, kind='stable')[:top]]
+        return [
+            {
+                'cluster': self.keys[row][0],
+                'metric': metric,
+                by: float(summary[by][row]),
+                'anomaly_count': int(summary['anomaly_count'][row])
+            }
+            for row in order
+        ]
+
+
+# ============================================================================
+# VERSÃO ASSÍNCRONA (asyncio)
+# ============================================================================
+
+class AsyncDocumentDBManager:
+    """
+    Versão asyncio do DocumentDBManager
+    As chamadas boto3 (bloqueantes) rodam em um pool de threads próprio,
+    com concorrência limitada, sem travar o event loop
+    """
+    
+    def __init__(self, region_name='us-east-1', session=None, max_concurrency=10, manager=None):
+        """
+        Inicializa o manager assíncrono
+        
+        Args:
+            region_name (str): Região AWS para conectar
+            session (boto3.Session, optional): Sessão usada para criar os clientes
+            max_concurrency (int): Máximo de chamadas simultâneas à AWS
+            manager (DocumentDBManager, optional): Manager síncrono já existente
+        """
+        import asyncio
+        
+        self.manager = manager or DocumentDBManager(region_name, session=session)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Encerra o pool de threads
+        """
+        self._executor.shutdown(wait=False)
+
+    async def _run(self, func, *args, **kwargs):
+        """
+        Executa uma função bloqueante no pool, respeitando o limite de concorrência
+        """
+        import asyncio
+        
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def list_clusters(self, page_size=None, compact=False):
+        """
+        Lista todos os clusters DocumentDB na região
+        """
+        return await self._run(self.manager.list_clusters, page_size, compact)
+
+    async def get_cluster_details(self, cluster_identifier):
+        """
+        Obtém detalhes específicos de um cluster
+        """
+        return await self._run(self.manager.get_cluster_details, cluster_identifier)
 
-    def list_instances(self, cluster_identifier=None):
+    async def list_instances(self, cluster_identifier=None, page_size=None, compact=False):
         """
         Lista instâncias DocumentDB
-        
-        Args:
-            cluster_identifier (str, optional): Filtrar por cluster específico
-            
-        Returns:
-            list: Lista de instâncias
         """
-        try:
-            if cluster_identifier:
-                response = self.docdb_client.describe_db_instances(
-                    Filters=[
-                        {
-                            'Name': 'db-cluster-id',
-                            'Values': [cluster_identifier]
-                        }
-                    ]
-                )
-            else:
-                response = self.docdb_client.describe_db_instances()
-            
-            instances = []
-            for instance in response['DBInstances']:
-                instance_info = {
-                    'identifier': instance['DBInstanceIdentifier'],
-                    'status': instance['DBInstanceStatus'],
-                    'instance_class': instance['DBInstanceClass'],
-                    'availability_zone': instance.get('AvailabilityZone', 'N/A'),
-                    'cluster_identifier': instance.get('DBClusterIdentifier', 'N/A'),
-                    'endpoint': instance.get('Endpoint', {}).get('Address', 'N/A'),
-                    'port': instance.get('Endpoint', {}).get('Port', 27017),
-                    'promotion_tier': instance.get('PromotionTier', 0),
-                    'created_time': instance.get('InstanceCreateTime', 'N/A')
-                }
-                instances.append(instance_info)
-            
-            print(f"📋 Encontradas {len(instances)} instâncias")
-            return instances
-            
-        except ClientError as e:
-            print(f"❌ Erro ao listar instâncias: {e}")
-            return []
+        return await self._run(self.manager.list_instances, cluster_identifier, page_size, compact)
 
-    def list_snapshots(self, cluster_identifier=None, snapshot_type='all'):
+    async def list_snapshots(self, cluster_identifier=None, snapshot_type='all', page_size=None, compact=False):
         """
         Lista snapshots disponíveis
-        
-        Args:
-            cluster_identifier (str, optional): Filtrar por cluster
-            snapshot_type (str): 'manual', 'automated', ou 'all'
-            
-        Returns:
-            list: Lista de snapshots
         """
-        try:
-            params = {}
-            if cluster_identifier:
-                params['DBClusterIdentifier'] = cluster_identifier
-            if snapshot_type != 'all':
-                params['SnapshotType'] = snapshot_type
-            
-            response = self.docdb_client.describe_db_cluster_snapshots(**params)
-            
-            snapshots = []
-            for snapshot in response['DBClusterSnapshots']:
-                snapshot_info = {
-                    'identifier': snapshot['DBClusterSnapshotIdentifier'],
-                    'cluster_identifier': snapshot['DBClusterIdentifier'],
-                    'status': snapshot['Status'],
-                    'snapshot_type': snapshot['SnapshotType'],
-                    'created_time': snapshot.get('SnapshotCreateTime', 'N/A'),
-                    'allocated_storage': snapshot.get('AllocatedStorage', 0),
-                    'engine': snapshot.get('Engine', 'N/A'),
-                    'engine_version': snapshot.get('EngineVersion', 'N/A')
-                }
-                snapshots.append(snapshot_info)
-            
-            print(f"📋 Encontrados {len(snapshots)} snapshots")
-            return snapshots
-            
-        except ClientError as e:
-            print(f"❌ Erro ao listar snapshots: {e}")
-            return []
+        return await self._run(self.manager.list_snapshots, cluster_identifier, snapshot_type, page_size, compact)
 
-    def get_cluster_metrics(self, cluster_identifier, hours=1):
+    async def get_cluster_metrics(self, cluster_identifier, hours=1):
         """
         Obtém métricas do CloudWatch para um cluster
-        
-        Args:
-            cluster_identifier (str): Identificador do cluster
-            hours (int): Número de horas para buscar métricas
-            
-        Returns:
-            dict: Métricas do cluster
         """
-        try:
-            end_time = datetime.utcnow()
-            start_time = end_time - timedelta(hours=hours)
-            
-            metrics = {}
-            
-            # Lista de métricas importantes
-            metric_names = [
-                'CPUUtilization',
-                'DatabaseConnections',
-                'ReadLatency',
-                'WriteLatency',
-                'ReadThroughput',
-                'WriteThroughput'
-            ]
-            
-            for metric_name in metric_names:
-                try:
-                    response = self.cloudwatch_client.get_metric_statistics(
-                        Namespace='AWS/DocDB',
-                        MetricName=metric_name,
-                        Dimensions=[
-                            {
-                                'Name': 'DBClusterIdentifier',
-                                'Value': cluster_identifier
-                            }
-                        ],
-                        StartTime=start_time,
-                        EndTime=end_time,
-                        Period=300,  # 5 minutos
-                        Statistics=['Average', 'Maximum']
-                    )
-                    
-                    datapoints = response['Datapoints']
-                    if datapoints:
-                        # Ordenar por timestamp
-                        datapoints.sort(key=lambda x: x['Timestamp'])
-                        
-                        metrics[metric_name] = {
-                            'latest_average': datapoints[-1].get('Average', 0),
-                            'latest_maximum': datapoints[-1].get('Maximum', 0),
-                            'datapoints_count': len(datapoints),
-                            'period_hours': hours
-                        }
-                    else:
-                        metrics[metric_name] = {
-                            'latest_average': 0,
-                            'latest_maximum': 0,
-                            'datapoints_count': 0,
-                            'period_hours': hours
-                        }
-                        
-                except ClientError as e:
-                    print(f"⚠️ Erro ao obter métrica {metric_name}: {e}")
-                    metrics[metric_name] = None
-            
-            print(f"📊 Métricas obtidas para cluster: {cluster_identifier}")
-            return metrics
-            
-        except Exception as e:
-            print(f"❌ Erro ao obter métricas: {e}")
-            return {}
+        return await self._run(self.manager.get_cluster_metrics, cluster_identifier, hours)
 
-    def list_parameter_groups(self):
+    async def check_cluster_events(self, cluster_identifier, hours=24, page_size=None, compact=False):
         """
-        Lista parameter groups disponíveis
-        
-        Returns:
-            list: Lista de parameter groups
+        Verifica eventos recentes de um cluster
         """
-        try:
-            response = self.docdb_client.describe_db_cluster_parameter_groups()
-            
-            parameter_groups = []
-            for pg in response['DBClusterParameterGroups']:
-                pg_info = {
-                    'name': pg['DBClusterParameterGroupName'],
-                    'family': pg['DBParameterGroupFamily'],
-                    'description': pg.get('Description', 'N/A')
-                }
-                parameter_groups.append(pg_info)
-            
-            print(f"📋 Encontrados {len(parameter_groups)} parameter groups")
-            return parameter_groups
-            
-        except ClientError as e:
-            print(f"❌ Erro ao listar parameter groups: {e}")
-            return []
+        return await self._run(self.manager.check_cluster_events, cluster_identifier, hours, page_size, compact)
 
-    def get_parameter_group_parameters(self, parameter_group_name):
+    async def generate_connection_string(self, cluster_identifier, username='docdbadmin'):
         """
-        Obtém parâmetros de um parameter group específico
+        Gera string de conexão MongoDB para o cluster
+        """
+        return await self._run(self.manager.generate_connection_string, cluster_identifier, username)
+
+    async def print_cluster_summary(self, cluster_identifier):
+        """
+        Imprime um resumo completo do cluster
+        Detalhes, instâncias e métricas são buscados em paralelo
         
         Args:
-            parameter_group_name (str): Nome do parameter group
-            
-        Returns:
-            list: Lista de parâmetros
+            cluster_identifier (str): Identificador do cluster
         """
-        try:
-            response = self.docdb_client.describe_db_cluster_parameters(
-                DBClusterParameterGroupName=parameter_group_name
-            )
-            
-            parameters = []
-            for param in response['Parameters']:
-                param_info = {
-                    'name': param['ParameterName'],
-                    'value': param.get('ParameterValue', 'N/A'),
-                    'description': param.get('Description', 'N/A'),
-                    'is_modifiable': param.get('IsModifiable', False),
-                    'data_type': param.get('DataType', 'N/A'),
-                    'allowed_values': param.get('AllowedValues', 'N/A')
-                }
-                parameters.append(param_info)
-            
-            print(f"📋 Encontrados {len(parameters)} parâmetros")
-            return parameters
-            
-        except ClientError as e:
-            print(f"❌ Erro ao obter parâmetros: {e}")
-            return []
+        import asyncio
+        
+        details, instances, metrics = await asyncio.gather(
+            self.get_cluster_details(cluster_identifier),
+            self.list_instances(cluster_identifier),
+            self.get_cluster_metrics(cluster_identifier, 1)
+        )
+        # Os detalhes já estão no cache, então não há nova chamada à API
+        conn_str = await self.generate_connection_string(cluster_identifier)
+        
+        DocumentDBManager._print_summary_report(cluster_identifier, details, instances, metrics, conn_str)
 
-    def check_cluster_events(self, cluster_identifier, hours=24):
+
+# ============================================================================
+# INVENTÁRIO MULTI-REGIÃO
+# ============================================================================
+
+class DocumentDBFleetManager:
+    """
+    Inventário de DocumentDB em várias regiões e contas
+    Distribui as consultas em um pool de threads limitado, reaproveitando
+    um DocumentDBManager (e seus clientes) por conta/região. Uma consulta só
+    vai para o pool quando a conta/região dela tem vaga, então uma região
+    lenta não prende threads que outras regiões poderiam usar.
+    """
+    
+    RESOURCES = ('clusters', 'instances', 'snapshots')
+    
+    def __init__(self, regions, profiles=None, max_workers=8,
+                 max_per_region=2, region_limits=None, page_size=None):
         """
-        Verifica eventos recentes de um cluster
+        Inicializa o gerenciador de frota
         
         Args:
-            cluster_identifier (str): Identificador do cluster
-            hours (int): Horas para buscar eventos
-            
-        Returns:
-            list: Lista de eventos
+            regions (list): Regiões AWS a consultar
+            profiles (list, optional): Profiles de credenciais (uma conta cada);
+                                       None usa as credenciais padrão
+            max_workers (int): Tamanho máximo do pool de threads
+            max_per_region (int): Chamadas simultâneas por conta/região
+            region_limits (dict, optional): Limite específico por região
+            page_size (int, optional): Itens por página da API
         """
-        try:
-            start_time = datetime.utcnow() - timedelta(hours=hours)
-            
-            response = self.docdb_client.describe_events(
-                SourceIdentifier=cluster_identifier,
-                SourceType='db-cluster',
-                StartTime=start_time,
-                Duration=hours * 60  # em minutos
-            )
-            
-            events = []
-            for event in response['Events']:
-                event_info = {
-                    'date': event.get('Date', 'N/A'),
-                    'message': event.get('Message', 'N/A'),
-                    'event_categories': event.get('EventCategories', []),
-                    'source_id': event.get('SourceId', 'N/A')
-                }
-                events.append(event_info)
-            
-            print(f"📋 Encontrados {len(events)} eventos nas últimas {hours} horas")
-            return events
-            
-        except ClientError as e:
-            print(f"❌ Erro ao verificar eventos: {e}")
-            return []
+        self.regions = list(regions)
+        self.profiles = list(profiles or [None])
+        self.max_workers = max_workers
+        self.page_size = page_size
+        
+        region_limits = region_limits or {}
+        self._region_limits = {
+            (profile, region): max(1, region_limits.get(region, max_per_region))
+            for profile in self.profiles
+            for region in self.regions
+        }
+        self._managers = {}
+        self._lock = threading.Lock()
 
-    def generate_connection_string(self, cluster_identifier, username='docdbadmin'):
+    def get_manager(self, region, profile=None):
         """
-        Gera string de conexão MongoDB para o cluster
+        Obtém (ou cria) o DocumentDBManager de uma conta/região
         
         Args:
-            cluster_identifier (str): Identificador do cluster
-            username (str): Nome de usuário
+            region (str): Região AWS
+            profile (str, optional): Profile de credenciais
             
         Returns:
-            str: String de conexão MongoDB
+            DocumentDBManager: Manager reutilizado entre chamadas
         """
-        try:
-            cluster_details = self.get_cluster_details(cluster_identifier)
-            if not cluster_details:
-                return None
-            
-            endpoint = cluster_details['connectivity']['endpoint']
-            port = cluster_details['connectivity']['port']
-            
-            # String de conexão básica (sem senha por segurança)
-            connection_string = (
-                f"mongodb://{username}:PASSWORD@{endpoint}:{port}/"
-                f"?tls=true&tlsCAFile=global-bundle.pem&replicaSet=rs0"
-                f"&readPreference=secondaryPreferred&retryWrites=false"
-            )
-            
-            print(f"🔗 String de conexão gerada para: {cluster_identifier}")
-            print("⚠️ Substitua 'PASSWORD' pela senha real")
-            
-            return connection_string
-            
-        except Exception as e:
-            print(f"❌ Erro ao gerar string de conexão: {e}")
-            return None
+        # Os clientes vêm do client_registry, um por serviço/região/profile
+        with self._lock:
+            key = (profile, region)
+            if key not in self._managers:
+                self._managers[key] = DocumentDBManager(region, profile_name=profile)
+            return self._managers[key]
 
-    def print_cluster_summary(self, cluster_identifier):
+    def _collect(self, profile, region, resource):
         """
-        Imprime um resumo completo do cluster
+        Coleta um tipo de recurso em uma conta/região
         
-        Args:
-            cluster_identifier (str): Identificador do cluster
+        Returns:
+            tuple: (itens marcados com região/conta, latência em segundos)
         """
-        print(f"\n{'='*60}")
-        print(f"RESUMO DO CLUSTER: {cluster_identifier}")
-        print(f"{'='*60}")
+        start = time.perf_counter()
+        manager = self.get_manager(region, profile)
+        account = profile or 'default'
+        items = []
+        for item in getattr(manager, f'iter_{resource}')(page_size=self.page_size):
+            item['region'] = region
+            item['account'] = account
+            items.append(item)
+        return items, time.perf_counter() - start
+
+    def collect_inventory(self, resources=RESOURCES):
+        """
+        Coleta o inventário de todas as contas/regiões em paralelo
         
-        # Detalhes básicos
-        details = self.get_cluster_details(cluster_identifier)
-        if details:
-            print(f"\n📋 INFORMAÇÕES BÁSICAS:")
-            for key, value in details['basic_info'].items():
-                print(f"  {key.replace('_', ' ').title()}: {value}")
-            
-            print(f"\n🔗 CONECTIVIDADE:")
-            for key, value in details['connectivity'].items():
-                print(f"  {key.replace('_', ' ').title()}: {value}")
+        Args:
+            resources (tuple): Recursos a coletar ('clusters', 'instances', 'snapshots')
             
-            print(f"\n⚙️ CONFIGURAÇÃO:")
-            for key, value in details['configuration'].items():
-                print(f"  {key.replace('_', ' ').title()}: {value}")
-        
-        # Instâncias
-        print(f"\n🖥️ INSTÂNCIAS:")
-        instances = self.list_instances(cluster_identifier)
-        for instance in instances:
-            print(f"  • {instance['identifier']} ({instance['instance_class']}) - {instance['status']}")
-        
-        # Métricas recentes
-        print(f"\n📊 MÉTRICAS (última hora):")
-        metrics = self.get_cluster_metrics(cluster_identifier, 1)
-        for metric_name, metric_data in metrics.items():
-            if metric_data:
-                avg = metric_data['latest_average']
-                max_val = metric_data['latest_maximum']
-                print(f"  • {metric_name}: Avg={avg:.2f}, Max={max_val:.2f}")
+        Returns:
+            dict: Itens combinados por recurso e estatísticas por conta/região
+                  em 'stats' (latência, quantidade de itens e erros)
+        """
+        inventory = {resource: [] for resource in resources}
+        inventory['stats'] = {
+            profile or 'default': {
+                region: {'latency_seconds': {}, 'items': {}, 'errors': {}}
+                for region in self.regions
+            }
+            for profile in self.profiles
+        }
         
-        # String de conexão
-        print(f"\n🔗 STRING DE CONEXÃO:")
-        conn_str = self.generate_connection_string(cluster_identifier)
-        if conn_str:
-            print(f"  {conn_str}")
+        pending = {key: list(resources) for key in self._region_limits if resources}
+        in_flight = dict.fromkeys(self._region_limits, 0)
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                # O limite por região é verificado antes de enviar, em rodízio
+                # entre as regiões: nenhuma thread do pool fica esperando vaga
+                submitted = True
+                while submitted and len(running) < self.max_workers:
+                    submitted = False
+                    for key in list(pending):
+                        if len(running) >= self.max_workers:
+                            break
+                        if in_flight[key] >= self._region_limits[key]:
+                            continue
+                        resource = pending[key].pop(0)
+                        if not pending[key]:
+                            del pending[key]
+                        running[executor.submit(self._collect, *key, resource)] = key + (resource,)
+                        in_flight[key] += 1
+                        submitted = True
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    profile, region, resource = running.pop(future)
+                    in_flight[(profile, region)] -= 1
+                    stats = inventory['stats'][profile or 'default'][region]
+                    try:
+                        items, latency = future.result()
+                    except Exception as e:
+                        logger.warning("⚠️ Erro ao coletar %s em %s: %s", resource, region, e)
+                        stats['errors'][resource] = str(e)
+                        continue
+                    
+                    inventory[resource].extend(items)
+                    stats['latency_seconds'][resource] = round(latency, 3)
+                    stats['items'][resource] = len(items)
         
-        print(f"\n{'='*60}")
+        total = sum(len(inventory[resource]) for resource in resources)
+        logger.info("🌎 Inventário coletado: %s recursos em %s regiões", total, len(self.regions))
+        return inventory
 
 
-def main():
+def main(argv=None):
     """
     Função principal com exemplos de uso
+    
+    Clusters, o resumo do primeiro cluster, parameter groups e snapshots vêm
+    do InventoryCache: execuções seguidas respondem com o último estado
+    conhecido (só as métricas são buscadas na hora) e atualizam o cache em
+    segundo plano.
+    
+    Args:
+        argv (list, optional): Argumentos da linha de comando (padrão: sys.argv)
     """
+    parser = argparse.ArgumentParser(description='Exemplos Boto3 para DocumentDB - Módulo 1')
+    parser.add_argument('--region', default=DEFAULT_REGION, help='Região AWS')
+    parser.add_argument('--refresh', action='store_true', help='Ignora o cache do inventário e busca tudo na API')
+    parser.add_argument('--no-cache', action='store_true', help='Não usa o cache do inventário')
+    parser.add_argument('--cache-path', help='Arquivo do cache do inventário')
+    args = parser.parse_args(argv)
+    
+    configure_logging()
+    
     print("🚀 Exemplos Boto3 para DocumentDB - Módulo 1")
     print("=" * 50)
     
+    inventory = None
     try:
         # Inicializar manager
-        docdb_manager = DocumentDBManager(region_name='us-east-1')
+        docdb_manager = DocumentDBManager(region_name=args.region)
+        if not args.no_cache:
+            inventory = InventoryCache(docdb_manager, args.cache_path)
+        
+        def list_resource(resource):
+            if inventory is None:
+                return getattr(docdb_manager, f'list_{resource}')()
+            items = inventory.get(resource, force=args.refresh)
+            age = inventory.age(resource)
+            if age and age > 1:
+                print(f"  (cache de {age:.0f}s atrás; atualizando em segundo plano se vencido)")
+            return items
         
         # Exemplo 1: Listar todos os clusters
         print("\n1️⃣ Listando clusters disponíveis:")
-        clusters = docdb_manager.list_clusters()
+        clusters = list_resource('clusters')
         for cluster in clusters:
             print(f"  • {cluster['identifier']} - {cluster['status']}")
         
@@ -491,17 +6046,18 @@ def main():
         if clusters:
             first_cluster = clusters[0]['identifier']
             print(f"\n2️⃣ Detalhes do cluster: {first_cluster}")
-            docdb_manager.print_cluster_summary(first_cluster)
+            # Com --refresh, os detalhes também são buscados na hora
+            docdb_manager.print_cluster_summary(first_cluster, None if args.refresh else inventory)
         
         # Exemplo 3: Listar parameter groups
         print("\n3️⃣ Parameter groups disponíveis:")
-        parameter_groups = docdb_manager.list_parameter_groups()
+        parameter_groups = list_resource('parameter_groups')
         for pg in parameter_groups:
             print(f"  • {pg['name']} ({pg['family']})")
         
         # Exemplo 4: Listar snapshots
         print("\n4️⃣ Snapshots disponíveis:")
-        snapshots = docdb_manager.list_snapshots()
+        snapshots = list_resource('snapshots')
         for snapshot in snapshots[:5]:  # Mostrar apenas os 5 primeiros
             print(f"  • {snapshot['identifier']} - {snapshot['status']}")
         
@@ -509,10 +6065,10 @@ def main():
         
     except Exception as e:
         print(f"❌ Erro durante execução: {e}")
-
-
-if __name__ == "__main__":
-    main()
+    finally:
+        # A resposta já foi exibida; só falta gravar as atualizações pendentes
+        if inventory is not None:
+            inventory.wait()
 
 
 # ============================================================================
@@ -522,25 +6078,31 @@ if __name__ == "__main__":
 def example_error_handling():
     """
     Exemplo de tratamento de erros com Boto3
+    
+    O RequestExecutor repete throttling e falhas temporárias com backoff e
+    converte o erro final em uma exceção tipada
     """
     try:
-        client = boto3.client('docdb', region_name='us-east-1')
+        client = client_registry.client('docdb', 'us-east-1')
+        executor = RequestExecutor(metrics_hook=lambda stats: print(f"Métricas da chamada: {stats}"))
         
         # Tentar acessar cluster inexistente
-        response = client.describe_db_clusters(
+        response = executor.call(
+            'docdb', client, 'describe_db_clusters',
             DBClusterIdentifier='cluster-inexistente'
         )
         
-    except ClientError as e:
-        error_code = e.response['Error']['Code']
-        error_message = e.response['Error']['Message']
-        
-        if error_code == 'DBClusterNotFoundFault':
-            print("Cluster não encontrado")
-        elif error_code == 'AccessDenied':
-            print("Acesso negado - verifique permissões IAM")
-        else:
-            print(f"Erro: {error_code} - {error_message}")
+    except ResourceNotFoundError:
+        print("Cluster não encontrado")
+    
+    except AccessDeniedError:
+        print("Acesso negado - verifique permissões IAM")
+    
+    except ThrottlingError as e:
+        print(f"API limitando requisições mesmo após {e.attempts} tentativas")
+    
+    except DocumentDBError as e:
+        print(f"Erro: {e.code} - {e}")
     
     except NoCredentialsError:
         print("Credenciais AWS não configuradas")
@@ -549,11 +6111,76 @@ def example_error_handling():
         print(f"Erro inesperado: {e}")
 
 
+def example_instrumentation():
+    """
+    Exemplo de instrumentação das chamadas: histogramas, Prometheus e log JSON
+    """
+    recorder = MetricsRecorder()
+    exporter = PrometheusExporter(recorder)
+    executor = RequestExecutor(metrics_hook=[recorder, JsonLogSink()])
+    manager = DocumentDBManager('us-east-1', executor=executor)
+    
+    # Exemplo conceitual - medir uma listagem e expor as métricas
+    # port = exporter.serve(9108)  # curl http://127.0.0.1:9108/metrics
+    # manager.list_clusters()
+    # p95 = recorder.latency_percentile('docdb', 'describe_db_clusters', 95)
+    # print(f"p95 describe_db_clusters <= {p95}s")
+    
+    print("Instrumentation example - mediria latência, retentativas e tamanho das respostas")
+
+
+def example_slow_queries():
+    """
+    Exemplo de análise dos logs do profiler (consultas lentas por formato)
+    """
+    manager = DocumentDBManager('us-east-1')
+    analyzer = SlowQueryAnalyzer(min_millis=100)
+    
+    # Exemplo conceitual - requer profiler=enabled no parameter group e a
+    # exportação do log 'profiler' para o CloudWatch Logs
+    # analyzer.ingest_log_group(manager, 'my-cluster', datetime.utcnow() - timedelta(hours=1))
+    # analyzer.ingest_files(['export/profiler-000000.gz'])  # exportação para o S3
+    # analyzer.print_report(top=10)
+    
+    print("Slow query example - agruparia consultas lentas por formato e coleção")
+
+
+def example_parameter_drift():
+    """
+    Exemplo de auditoria de parameter groups da frota
+    """
+    manager = DocumentDBManager('us-east-1')
+    auditor = ParameterGroupAuditor(manager)
+    
+    # Exemplo conceitual - uma busca por parameter group distinto, não por cluster
+    # auditor.refresh()
+    # auditor.print_drift_report(baseline={'tls': 'enabled', 'audit_logs': 'enabled'})
+    
+    print("Parameter drift example - compararia tls, audit_logs e profiler em todos os clusters")
+
+
+def example_fleet_report():
+    """
+    Exemplo de relatório da frota em fluxo (NDJSON e colunar)
+    """
+    manager = DocumentDBManager('us-east-1')
+    exporter = FleetReportExporter(manager, max_workers=4, ordered=True)
+    
+    # Exemplo conceitual - cada linha sai assim que o lote do cluster termina
+    # exporter.write_ndjson(sys.stdout)                      # uma linha por cluster, pronta para jq
+    # exporter.write_columnar('frota.parquet')               # Parquet (requer pyarrow)
+    # exporter.write_columnar('frota.csv', format='csv')     # CSV, sem dependências
+    # for summary in exporter.iter_summaries(['my-cluster']):
+    #     print(summary['cluster'], summary['connection_string'])
+    
+    print("Fleet report example - exportaria um resumo por cluster em NDJSON ou Parquet")
+
+
 def example_pagination():
     """
     Exemplo de paginação com Boto3
     """
-    client = boto3.client('docdb', region_name='us-east-1')
+    client = client_registry.client('docdb', 'us-east-1')
     
     # Usar paginator para listar muitos snapshots
     paginator = client.get_paginator('describe_db_cluster_snapshots')
@@ -575,21 +6202,21 @@ def example_pagination():
 
 def example_waiter():
     """
-    Exemplo de uso de waiters (para operações assíncronas)
+    Exemplo de espera por vários recursos (para operações assíncronas)
     """
-    client = boto3.client('docdb', region_name='us-east-1')
+    manager = DocumentDBManager('us-east-1')
+    waiter = ResourceWaiter(manager, min_interval=10, max_interval=60)
     
-    # Exemplo conceitual - aguardar cluster ficar disponível
-    # waiter = client.get_waiter('db_cluster_available')
-    # waiter.wait(
-    #     DBClusterIdentifier='my-cluster',
-    #     WaiterConfig={
-    #         'Delay': 30,  # segundos entre checks
-    #         'MaxAttempts': 40  # máximo de tentativas
-    #     }
-    # )
+    # Exemplo conceitual - aguardar clusters e instâncias de uma manutenção
+    # futures = [
+    #     waiter.add('cluster', 'my-cluster', expected_seconds=600, timeout=3600,
+    #                callback=lambda f: print(f"✅ {f.result()['identifier']} disponível")),
+    #     waiter.add('instance', 'my-cluster-instance-1', timeout=3600),
+    #     waiter.add('instance', 'old-instance', desired_states=('deleted',))
+    # ]
+    # waiter.run()  # uma listagem por tipo a cada poll, até todos terminarem
     
-    print("Waiter example - aguardaria cluster ficar disponível")
+    print("Waiter example - aguardaria clusters e instâncias ficarem disponíveis")
 
 
 # ============================================================================
@@ -601,6 +6228,160 @@ DEFAULT_REGION = 'us-east-1'
 DEFAULT_ENGINE_VERSION = '5.0.0'
 DEFAULT_INSTANCE_CLASS = 'db.t3.medium'
 
+# Métricas coletadas por padrão em get_cluster_metrics
+DEFAULT_METRICS = [
+    'CPUUtilization',
+    'DatabaseConnections',
+    'ReadLatency',
+    'WriteLatency',
+    'ReadThroughput',
+    'WriteThroughput'
+]
+
+# Limite de requisições por segundo por serviço (RequestExecutor)
+RATE_LIMITS = {
+    'docdb': 10,
+    'cloudwatch': 20,
+    'logs': 10
+}
+DEFAULT_RATE_LIMIT = 10
+
+# Códigos de erro da AWS agrupados por tratamento
+THROTTLING_ERROR_CODES = {
+    'Throttling',
+    'ThrottlingException',
+    'ThrottledException',
+    'RequestLimitExceeded',
+    'RequestThrottled',
+    'RequestThrottledException',
+    'TooManyRequestsException'
+}
+# Cotas (número de recursos, tamanho de requisição): não são limite de taxa,
+# então não consomem retentativas nem reduzem o token bucket
+QUOTA_ERROR_CODES = {
+    'LimitExceededException',
+    'ServiceQuotaExceededException'
+}
+NOT_FOUND_ERROR_CODES = {
+    'DBClusterNotFoundFault',
+    'DBInstanceNotFound',
+    'DBClusterSnapshotNotFoundFault',
+    'DBParameterGroupNotFound',
+    'ResourceNotFoundException'
+}
+ACCESS_DENIED_ERROR_CODES = {
+    'AccessDenied',
+    'AccessDeniedException',
+    'UnauthorizedOperation',
+    'ExpiredToken',
+    'ExpiredTokenException'
+}
+TRANSIENT_ERROR_CODES = {
+    'InternalFailure',
+    'InternalError',
+    'InternalServiceError',
+    'ServiceUnavailable',
+    'RequestTimeout',
+    'RequestTimeoutException'
+}
+
+# Validade (segundos) das respostas em cache por operação
+CACHE_TTLS = {
+    'describe_db_clusters': 30
+}
+
+# Itens por página nas operações describe_* (a API aceita de 20 a 100)
+DEFAULT_PAGE_SIZE = 100
+
+# Limite de consultas por chamada GetMetricData
+MAX_METRIC_DATA_QUERIES = 500
+
+# StatusCode de MetricDataResults que indica consulta recusada (as demais seguem)
+METRIC_DATA_FAILED_STATUSES = {'Forbidden', 'InternalError'}
+
+# Limite de pontos devolvidos por chamada GetMetricData
+MAX_METRIC_DATAPOINTS = 100800
+
+# Retenção do CloudWatch: (idade máxima em segundos, menor período disponível)
+METRIC_RETENTION_TIERS = (
+    (15 * 86400, 60),
+    (63 * 86400, 300),
+    (None, 3600)
+)
+
+# Períodos usados quando max_points exige resolução menor que a da retenção
+STANDARD_METRIC_PERIODS = (60, 300, 900, 3600, 21600, 86400)
+
+# Pontos por série em cada bloco da grade do MetricQueryPlanner
+METRIC_CHUNK_POINTS = 1440
+
+# Limites superiores (segundos) dos buckets do histograma de latência
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Campos de comando que não fazem parte do formato de uma consulta (SlowQueryAnalyzer)
+SHAPE_IGNORED_FIELDS = {
+    '$db',
+    '$clusterTime',
+    '$readPreference',
+    'lsid',
+    'txnNumber',
+    'autocommit',
+    'startTransaction',
+    'readConcern',
+    'writeConcern',
+    'maxTimeMS',
+    'comment',
+    'cursor',
+    'batchSize',
+    'singleBatch'
+}
+
+# Maior duração (ms) distinguida pelo histograma do SlowQueryAnalyzer
+MAX_PROFILER_MILLIS = 24 * 60 * 60 * 1000
+
+# Valores por filtro nas operações describe_* (ex: db-cluster-id)
+MAX_FILTER_VALUES = 100
+
+# Versão do formato do arquivo do InventoryCache
+INVENTORY_CACHE_VERSION = 1
+
+# Diretório padrão do InventoryCache (um arquivo por região)
+INVENTORY_CACHE_DIR = '~/.cache/docdb-exemplos'
+
+# Idade máxima (segundos) de cada recurso no InventoryCache antes de revalidar
+INVENTORY_MAX_AGES = {
+    'clusters': 300,
+    'cluster_details': 300,
+    'instances': 300,
+    'snapshots': 900,
+    'parameter_groups': 3600
+}
+
+# Idade máxima (segundos) da última reconciliação completa do SnapshotCatalog
+SNAPSHOT_FULL_REFRESH_SECONDS = 6 * 3600
+
+# Por quanto tempo describe_events guarda eventos (14 dias)
+EVENT_RETENTION_SECONDS = 14 * 86400
+
+# A partir de quantos clusters as instâncias são lidas sem filtro e agrupadas localmente
+BULK_SCAN_THRESHOLD = 300
+
+# Fração da frota a partir da qual os snapshots são lidos sem filtro e agrupados
+# localmente: por cluster custa ao menos uma chamada cada; o scan custa
+# snapshots_da_conta / 100 páginas. Com até 35 snapshots por cluster (retenção
+# máxima de backups), o scan empata quando os clusters pedidos são ~35% da frota
+SNAPSHOT_SCAN_FRACTION = 0.35
+
+# Estados que encerram a espera com erro (ResourceWaiter)
+WAITER_FAILURE_STATES = {
+    'failed',
+    'inaccessible-encryption-credentials',
+    'incompatible-network',
+    'incompatible-parameters',
+    'incompatible-restore',
+    'storage-full'
+}
+
 # Métricas importantes do DocumentDB
 IMPORTANT_METRICS = [
     'CPUUtilization',
@@ -624,6 +6405,8 @@ IMPORTANT_PARAMETERS = [
     'profiler_threshold_ms'
 ]
 
-print("📚 Arquivo de exemplos Boto3 carregado com sucesso!")
-print("💡 Execute main() para ver exemplos em ação")
-print("📖 Explore as funções individuais para aprender mais")
\ No newline at end of file
+if __name__ == "__main__":
+    print("📚 Arquivo de exemplos Boto3 carregado com sucesso!")
+    print("💡 Execute main() para ver exemplos em ação")
+    print("📖 Explore as funções individuais para aprender mais")
+    main()
@@ -0,0 +1,1469 @@
+#!/usr/bin/env python3
+"""
+Testes de comportamento - DocumentDBManager contra o backend simulado
+Módulo 1 - Conceitos e Consultas (SEM criar recursos)
+
+Usa o FakeBackend do benchmark-exemplos.py para verificar cada componente
+do módulo (paginação, retentativas, caches, métricas, agendamento, eventos
+e inventário), sem acesso à AWS.
+
+Uso:
+    python3 -m unittest test_exemplos.py
+    python3 -m pytest test_exemplos.py
+"""
+
+import asyncio
+import contextlib
+import csv
+import importlib.util
+import io
+import json
+import logging
+import os
+import socket
+import statistics
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from botocore.exceptions import ClientError, EndpointConnectionError
+
+
+def _load_benchmark():
+    """
+    Carrega benchmark-exemplos.py como módulo (o nome tem hífen)
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark-exemplos.py')
+    spec = importlib.util.spec_from_file_location('benchmark_exemplos', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+benchmark = _load_benchmark()
+exemplos = benchmark.load_exemplos()
+FakeBackend = benchmark.FakeBackend
+exemplos.logger.setLevel(logging.CRITICAL)
+
+
+def new_manager(backend, **executor_options):
+    """
+    Manager sobre o backend simulado, sem limite de taxa nem esperas reais
+    """
+    options = {
+        'rate_limits': {'docdb': 1e9, 'cloudwatch': 1e9, 'logs': 1e9},
+        'sleep': lambda seconds: None
+    }
+    options.update(executor_options)
+    return exemplos.DocumentDBManager(session=backend.session(),
+                                      executor=exemplos.RequestExecutor(**options))
+
+
+def client_error(code, operation='DescribeDBClusters'):
+    return ClientError({'Error': {'Code': code, 'Message': code}}, operation)
+
+
+# ============================================================================
+# PAGINAÇÃO
+# ============================================================================
+
+class PaginationTest(unittest.TestCase):
+
+    def test_lists_every_page(self):
+        backend = FakeBackend(clusters=45)
+        clusters = new_manager(backend).list_clusters(page_size=20)
+        self.assertEqual(len({c['identifier'] for c in clusters}), 45)
+        self.assertEqual(backend.calls, {'DescribeDBClusters': 3})
+
+    def test_follows_marker_when_server_returns_smaller_pages(self):
+        backend = FakeBackend(clusters=45, max_page_size=10)
+        clusters = new_manager(backend).list_clusters(page_size=100)
+        self.assertEqual(len(clusters), 45)
+        self.assertEqual(backend.calls, {'DescribeDBClusters': 5})
+
+    def test_iter_fetches_pages_on_demand(self):
+        backend = FakeBackend(clusters=45)
+        iterator = new_manager(backend).iter_clusters(page_size=20)
+        first = next(iterator)
+        self.assertEqual(first['identifier'], 'cluster-00000')
+        self.assertEqual(backend.total_calls, 1)
+
+    def test_instances_by_cluster_use_one_filtered_call(self):
+        backend = FakeBackend(clusters=50)
+        ids = ['cluster-00001', 'cluster-00002', 'cluster-00003']
+        grouped = new_manager(backend).list_instances_by_cluster(ids)
+        self.assertEqual(sorted(grouped), ids)
+        self.assertTrue(all(len(instances) == 2 for instances in grouped.values()))
+        self.assertEqual(backend.calls, {'DescribeDBInstances': 1})
+
+
+# ============================================================================
+# REGISTROS COMPACTOS (CompactRecord)
+# ============================================================================
+
+class CompactRecordTest(unittest.TestCase):
+
+    def test_compact_listings_match_dict_listings(self):
+        backend = FakeBackend(clusters=5)
+        manager = new_manager(backend)
+        for method, args in (('list_clusters', ()), ('list_instances', ()),
+                             ('list_snapshots', ('cluster-00001',)),
+                             ('get_parameter_group_parameters', ('pg-0',))):
+            with self.subTest(method=method):
+                plain = getattr(manager, method)(*args)
+                compact = getattr(manager, method)(*args, compact=True)
+                self.assertTrue(plain)
+                self.assertTrue(all(isinstance(record, exemplos.CompactRecord) for record in compact))
+                self.assertEqual([dict(record) for record in compact], plain)
+
+    def test_mapping_view_of_a_record(self):
+        record = exemplos.ClusterRecord.from_api({
+            'DBClusterIdentifier': 'c1', 'Status': 'available',
+            'Engine': 'docdb', 'EngineVersion': '5.0.0'
+        })
+        self.assertEqual(record['status'], 'available')
+        self.assertEqual(record.get('port'), 27017)
+        self.assertIsNone(record.get('inexistente'))
+        self.assertEqual(dict(record.items())['identifier'], 'c1')
+        self.assertEqual(len(record), len(exemplos.ClusterRecord.__slots__))
+        with self.assertRaises(KeyError):
+            record['inexistente']
+
+        # Campos ausentes: None no atributo, 'N/A' na visão de dicionário
+        self.assertIsNone(record.endpoint)
+        self.assertEqual(record['endpoint'], 'N/A')
+        self.assertEqual(dict(record)['created_time'], 'N/A')
+        self.assertIsNone(record.to_dict(legacy=False)['created_time'])
+        self.assertEqual(json.loads(json.dumps(record, default=exemplos._json_default))['endpoint'], 'N/A')
+
+        record['status'] = 'modifying'
+        self.assertEqual(record.status, 'modifying')
+
+
+# ============================================================================
+# CONSULTAS EM LOTE
+# ============================================================================
+
+class BatchedDetailsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = FakeBackend(clusters=150)
+        self.manager = new_manager(self.backend, max_attempts=1)
+        self.ids = [c['DBClusterIdentifier'] for c in self.backend.clusters]
+
+    def test_details_use_one_call_per_filter_chunk(self):
+        details = self.manager.get_clusters_details(self.ids + ['inexistente'])
+        self.assertEqual(self.backend.calls, {'DescribeDBClusters': 2})
+        self.assertIsNone(details['inexistente'])
+        self.assertEqual(details['cluster-00149']['basic_info']['identifier'], 'cluster-00149')
+
+    def test_failed_chunk_leaves_only_its_clusters_empty(self):
+        failures = [None, client_error('InvalidParameterCombination')]
+        with mock.patch.object(self.backend, 'record', side_effect=failures):
+            details = self.manager.get_clusters_details(self.ids)
+        self.assertTrue(all(details[identifier] for identifier in self.ids[:100]))
+        self.assertTrue(all(details[identifier] is None for identifier in self.ids[100:]))
+
+    def test_throttled_chunk_is_raised(self):
+        with mock.patch.object(self.backend, 'record', side_effect=[None, client_error('Throttling')]):
+            with self.assertRaises(exemplos.ThrottlingError):
+                self.manager.get_clusters_details(self.ids)
+
+
+# ============================================================================
+# RETENTATIVAS E TRADUÇÃO DE ERROS
+# ============================================================================
+
+class RetryTest(unittest.TestCase):
+
+    def test_throttling_is_retried_then_raised(self):
+        backend = FakeBackend(clusters=5, throttle_rate=1.0)
+        manager = new_manager(backend, max_attempts=3)
+        with self.assertRaises(exemplos.ThrottlingError) as raised:
+            manager.list_clusters()
+        self.assertEqual(raised.exception.attempts, 3)
+        self.assertEqual(backend.calls, {'DescribeDBClusters': 3})
+
+    def test_throttled_pages_are_repeated_not_restarted(self):
+        backend = FakeBackend(clusters=50, max_page_size=10, throttle_rate=0.3)
+        clusters = new_manager(backend).list_clusters()
+        self.assertGreater(backend.throttles, 0)
+        self.assertEqual(len({c['identifier'] for c in clusters}), 50)
+        self.assertEqual(backend.total_calls, 5 + backend.throttles)
+
+    def test_not_found_is_not_retried(self):
+        backend = FakeBackend(clusters=5)
+        manager = new_manager(backend)
+        with self.assertRaises(exemplos.ResourceNotFoundError):
+            manager._call('docdb', 'describe_db_clusters', DBClusterIdentifier='inexistente')
+        self.assertEqual(backend.calls, {'DescribeDBClusters': 1})
+
+    def test_connection_errors_are_transient_and_retried(self):
+        attempts = []
+
+        def request():
+            attempts.append(1)
+            raise EndpointConnectionError(endpoint_url='https://rds.us-east-1.amazonaws.com')
+
+        executor = exemplos.RequestExecutor(max_attempts=4, sleep=lambda seconds: None)
+        with self.assertRaises(exemplos.TransientError) as raised:
+            executor.run('docdb', 'DescribeDBClusters', request)
+        self.assertEqual(len(attempts), 4)
+        self.assertIsInstance(raised.exception.__cause__, EndpointConnectionError)
+
+    def test_quota_errors_are_not_retried(self):
+        attempts = []
+
+        def request():
+            attempts.append(1)
+            raise client_error('LimitExceededException', 'FilterLogEvents')
+
+        executor = exemplos.RequestExecutor(sleep=lambda seconds: None)
+        rate = executor.bucket('logs').rate
+        with self.assertRaises(exemplos.QuotaExceededError):
+            executor.run('logs', 'FilterLogEvents', request)
+        self.assertEqual(len(attempts), 1)
+        self.assertEqual(executor.bucket('logs').rate, rate)
+
+    def test_outage_is_not_reported_as_empty_listing(self):
+        backend = FakeBackend(clusters=5)
+        manager = new_manager(backend, max_attempts=2)
+        with mock.patch.object(backend, 'record', side_effect=client_error('ServiceUnavailable')):
+            with self.assertRaises(exemplos.TransientError):
+                manager.list_clusters()
+            with self.assertRaises(exemplos.TransientError):
+                manager.list_instances_by_cluster(['cluster-00001'])
+
+    def test_translate_client_error(self):
+        cases = {
+            'ThrottlingException': exemplos.ThrottlingError,
+            'LimitExceededException': exemplos.QuotaExceededError,
+            'DBClusterNotFoundFault': exemplos.ResourceNotFoundError,
+            'AccessDenied': exemplos.AccessDeniedError,
+            'InvalidParameterValue': exemplos.DocumentDBError
+        }
+        for code, error_class in cases.items():
+            error = exemplos.translate_client_error(client_error(code), 'DescribeDBClusters')
+            self.assertIs(type(error), error_class, code)
+            self.assertEqual(error.code, code)
+
+
+# ============================================================================
+# CACHE DE RESPOSTAS (ResponseCache)
+# ============================================================================
+
+class ResponseCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('time.monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_entries_expire_after_their_ttl(self):
+        cache = exemplos.ResponseCache(ttls={'describe_db_clusters': 30, 'describe_events': 0})
+        cache.put('describe_db_clusters', {'DBClusterIdentifier': 'c1'}, 'resposta')
+        cache.put('describe_events', {}, 'nunca guardada')
+        self.now += 29
+        self.assertEqual(cache.get('describe_db_clusters', {'DBClusterIdentifier': 'c1'}), (True, 'resposta'))
+        self.assertEqual(cache.get('describe_events', {}), (False, None))
+        self.now += 2
+        self.assertEqual(cache.get('describe_db_clusters', {'DBClusterIdentifier': 'c1'}), (False, None))
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 2, 'evictions': 0, 'size': 0})
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = exemplos.ResponseCache(max_entries=2, ttls={})
+        for name in ('a', 'b'):
+            cache.put('op', {'id': name}, name)
+        cache.get('op', {'id': 'a'})
+        cache.put('op', {'id': 'c'}, 'c')
+        self.assertEqual(cache.get('op', {'id': 'b'}), (False, None))
+        self.assertEqual(cache.get('op', {'id': 'a'}), (True, 'a'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_invalidation_by_call_operation_or_everything(self):
+        cache = exemplos.ResponseCache(ttls={})
+        cache.put('op', {'id': 1}, 1)
+        cache.put('op', {'id': 2}, 2)
+        cache.put('other', {}, 3)
+        self.assertEqual(cache.invalidate('op', id=1), 1)
+        self.assertEqual(cache.get('op', {'id': 2}), (True, 2))
+        self.assertEqual(cache.invalidate('op'), 1)
+        self.assertEqual(cache.invalidate(), 1)
+        self.assertEqual(cache.stats()['size'], 0)
+
+    def test_manager_reuses_cluster_details_until_invalidated(self):
+        backend = FakeBackend(clusters=2)
+        manager = new_manager(backend)
+        manager.get_cluster_details('cluster-00000')
+        manager.generate_connection_string('cluster-00000')
+        self.assertEqual(backend.calls, {'DescribeDBClusters': 1})
+
+        manager.invalidate_cache('describe_db_clusters', DBClusterIdentifier='cluster-00000')
+        manager.get_cluster_details('cluster-00000')
+        self.assertEqual(backend.calls, {'DescribeDBClusters': 2})
+
+
+# ============================================================================
+# REGISTRO DE CLIENTES (ClientRegistry)
+# ============================================================================
+
+class ClientRegistryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = FakeBackend(clusters=2)
+        self.registry = exemplos.ClientRegistry(max_pool_connections=20)
+        self.configs = []
+        session = mock.Mock()
+        session.client.side_effect = self.new_client
+        self.registry._sessions[None] = session
+
+    def new_client(self, service, region_name=None, config=None):
+        self.configs.append(config)
+        return benchmark.FakeClient(self.backend, service)
+
+    def manager(self, region='us-east-1'):
+        return exemplos.DocumentDBManager(region, registry=self.registry,
+                                          executor=exemplos.RequestExecutor(sleep=lambda seconds: None))
+
+    def test_managers_share_clients_per_service_and_region(self):
+        first, second = self.manager(), self.manager()
+        self.assertIs(first.docdb_client, second.docdb_client)
+        first.list_clusters()
+        second.list_clusters()
+        other = self.manager('sa-east-1')
+        self.assertIsNot(other.docdb_client, first.docdb_client)
+
+        stats = self.registry.stats()
+        self.assertEqual(stats['clients_created'], 2)
+        self.assertEqual(stats['clients_reused'], 1)
+        self.assertEqual(stats['clients'], {'docdb/us-east-1/default': 2, 'docdb/sa-east-1/default': 1})
+        self.assertEqual(self.backend.calls, {'DescribeDBClusters': 2})
+
+    def test_clients_are_created_lazily_with_tuned_config(self):
+        manager = self.manager()
+        self.assertEqual(self.registry.stats()['clients_created'], 0)
+        manager.cloudwatch_client
+        self.assertEqual(self.configs[0].max_pool_connections, 20)
+        self.assertEqual(self.configs[0].retries, {'mode': 'standard', 'total_max_attempts': 1})
+
+        self.registry.configure(read_timeout=5, retry_mode='adaptive')
+        self.manager('eu-west-1').docdb_client
+        self.assertEqual(self.configs[1].read_timeout, 5)
+        self.assertEqual(self.configs[1].retries['mode'], 'adaptive')
+
+    def test_clear_drops_cached_clients(self):
+        client = self.registry.client('docdb', 'us-east-1')
+        session = self.registry._sessions[None]
+        self.registry.clear()
+        self.registry._sessions[None] = session
+        self.assertIsNot(self.registry.client('docdb', 'us-east-1'), client)
+
+
+# ============================================================================
+# CURSORES DO EVENTFOLLOWER
+# ============================================================================
+
+class EventFollowerTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.state_path = os.path.join(directory.name, 'cursors.json')
+        self.backend = FakeBackend(clusters=3, events_per_cluster=2)
+        self.manager = new_manager(self.backend)
+
+    def follower(self, sources=None):
+        return exemplos.EventFollower(self.manager, self.state_path,
+                                      sources or {'db-cluster': None}, initial_hours=24)
+
+    def test_overlapping_polls_deliver_each_event_once(self):
+        follower = self.follower()
+        self.assertEqual(len(list(follower.poll())), 6)
+        self.assertEqual(list(follower.poll()), [])
+
+        self.backend.events.append({
+            'SourceIdentifier': 'cluster-00001',
+            'SourceType': 'db-cluster',
+            'Message': 'Evento novo',
+            'EventCategories': ['notification'],
+            'Date': datetime.now(timezone.utc)
+        })
+        new_events = list(follower.poll())
+        self.assertEqual([e['message'] for e in new_events], ['Evento novo'])
+
+    def test_cursor_survives_restart(self):
+        list(self.follower().poll())
+        self.assertEqual(list(self.follower().poll()), [])
+
+    def test_quiet_source_does_not_widen_the_window(self):
+        follower = self.follower()
+        list(follower.poll())
+        polled_until = follower.polled_until['db-cluster']
+        # Uma fonte sem eventos há dias mantém um cursor antigo
+        follower.cursors['db-cluster/cluster-00009'] = {
+            'last_date': polled_until - timedelta(days=5), 'seen': {}
+        }
+
+        with mock.patch.object(self.manager, 'iter_events', return_value=iter([])) as iter_events:
+            list(self.follower().poll())
+            list(follower.poll())
+        for call in iter_events.call_args_list:
+            self.assertEqual(call.args[1], polled_until - follower.overlap)
+
+    def test_cursors_expire_with_event_retention(self):
+        follower = self.follower()
+        follower.cursors['db-cluster/cluster-00009'] = {
+            'last_date': datetime.now(timezone.utc) - timedelta(days=15), 'seen': {}
+        }
+        list(follower.poll())
+        self.assertNotIn('db-cluster/cluster-00009', follower.cursors)
+        self.assertIn('db-cluster/cluster-00001', self.follower().cursors)
+
+    def test_only_followed_sources_are_delivered(self):
+        follower = self.follower({'db-cluster': ['cluster-00002']})
+        events = list(follower.poll())
+        self.assertEqual({e['source_id'] for e in events}, {'cluster-00002'})
+        self.assertEqual(len(events), 2)
+
+
+# ============================================================================
+# ESPERA POR VÁRIOS RECURSOS (ResourceWaiter)
+# ============================================================================
+
+class ResourceWaiterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = FakeBackend(clusters=4)
+        self.now = 0.0
+        self.waiter = exemplos.ResourceWaiter(new_manager(self.backend), min_interval=5, max_interval=60,
+                                              clock=lambda: self.now, sleep=self.advance)
+
+    def advance(self, seconds):
+        self.now += seconds
+
+    def test_one_listing_per_resource_type(self):
+        futures = [self.waiter.add('cluster', f'cluster-0000{c}') for c in range(3)]
+        futures.append(self.waiter.add('instance', 'cluster-00003-1'))
+        self.waiter.poll()
+
+        self.assertEqual(self.waiter.pending(), 0)
+        self.assertEqual([f.result()['identifier'] for f in futures],
+                         ['cluster-00000', 'cluster-00001', 'cluster-00002', 'cluster-00003-1'])
+        self.assertEqual(self.backend.calls, {'DescribeDBClusters': 1, 'DescribeDBInstances': 1})
+
+    def test_interval_backs_off_until_status_changes(self):
+        cluster = self.backend.clusters[0]
+        cluster['Status'] = 'creating'
+        future = self.waiter.add('cluster', 'cluster-00000')
+        # Primeira leitura do status conta como mudança
+        self.assertEqual(self.waiter.poll(), 5)
+        self.assertEqual([self.waiter.poll() for _ in range(4)], [10, 20, 40, 60])
+
+        cluster['Status'] = 'available'
+        self.waiter.poll()
+        self.assertEqual(future.result()['status'], 'available')
+        self.assertEqual(self.waiter.interval, 5)
+
+    def test_expected_duration_tightens_the_interval(self):
+        self.backend.clusters[0]['Status'] = 'modifying'
+        self.waiter.add('cluster', 'cluster-00000', expected_seconds=100)
+        self.waiter.poll()
+        intervals = [self.waiter.poll() for _ in range(3)]
+        self.assertEqual(intervals, [10, 20, 40])
+        self.now = 75
+        self.assertEqual(self.waiter.poll(), 5)
+
+    def test_failure_timeout_and_deletion(self):
+        self.backend.clusters[0]['Status'] = 'failed'
+        self.backend.clusters[1]['Status'] = 'creating'
+        del self.backend.clusters[2]
+        failed = self.waiter.add('cluster', 'cluster-00000')
+        timed_out = self.waiter.add('cluster', 'cluster-00001', timeout=30)
+        deleted = self.waiter.add('cluster', 'cluster-00002', desired_states=('deleted',))
+        self.waiter.run()
+
+        with self.assertRaisesRegex(exemplos.WaiterError, 'failed'):
+            failed.result()
+        with self.assertRaises(exemplos.WaiterError) as error:
+            timed_out.result()
+        self.assertEqual(error.exception.code, 'WaiterTimeout')
+        self.assertIsNone(deleted.result())
+        self.assertGreaterEqual(self.now, 30)
+
+    def test_access_denied_fails_the_targets(self):
+        self.waiter.add('cluster', 'cluster-00000')
+        future = self.waiter.add('instance', 'cluster-00000-0')
+        denied = exemplos.AccessDeniedError('sem permissão', 'AccessDenied')
+        with mock.patch.object(self.waiter, '_describe', side_effect=denied):
+            self.waiter.poll()
+        self.assertIs(future.exception(), denied)
+        self.assertEqual(self.waiter.pending(), 0)
+
+
+# ============================================================================
+# AGENDADOR DE COLETA (CollectionScheduler)
+# ============================================================================
+
+class CollectionSchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.now = [0.0]
+        self.delivered = []
+
+    def scheduler(self, backend, **options):
+        manager = new_manager(backend)
+        ids = [cluster['DBClusterIdentifier'] for cluster in backend.clusters]
+        # Sem limiares de CPU: o intervalo só depende de eventos e do orçamento
+        scheduler = exemplos.CollectionScheduler(
+            manager, ids, jitter=0, coalesce_seconds=0, cpu_hot_threshold=float('inf'),
+            cpu_idle_threshold=0, clock=lambda: self.now[0],
+            on_data=lambda cluster, metrics, events: self.delivered.append((cluster, events)),
+            **options)
+        # A primeira coleta é espalhada pelo intervalo curto: aqui todas já venceram
+        self.now[0] = 1000.0
+        return scheduler
+
+    def test_events_promote_clusters_that_are_not_due(self):
+        backend = FakeBackend(clusters=3, events_per_cluster=0)
+        # Sem janela de prioridade, o cluster volta ao intervalo normal após a coleta
+        scheduler = self.scheduler(backend, event_hot_seconds=0)
+        self.assertEqual(len(scheduler.tick()), 3)
+        self.assertEqual(scheduler.next_due(), 1300.0)
+
+        backend.events.append({
+            'SourceIdentifier': 'cluster-00002',
+            'SourceType': 'db-cluster',
+            'Message': 'Failover iniciado',
+            'EventCategories': ['failover'],
+            'Date': datetime.now(timezone.utc)
+        })
+        # Só cluster-00000 vence; o evento de cluster-00002 não pode se perder
+        scheduler._schedule('cluster-00000', 1100.0)
+        self.now[0] = 1100.0
+        self.delivered.clear()
+        self.assertEqual(sorted(scheduler.tick()), ['cluster-00000', 'cluster-00002'])
+        events = dict(self.delivered)
+        self.assertEqual([e['message'] for e in events['cluster-00002']], ['Failover iniciado'])
+
+        # A entrada antiga de cluster-00002 na fila não gera uma coleta extra
+        self.assertEqual(scheduler.next_due(), 1300.0)
+        self.now[0] = 1300.0
+        self.delivered.clear()
+        self.assertEqual(scheduler.tick(), ['cluster-00001'])
+
+    def test_event_listing_is_charged_per_page(self):
+        # 250 eventos em ordem cronológica: três páginas de DescribeEvents
+        backend = FakeBackend(clusters=250, events_per_cluster=1)
+        start = datetime.now(timezone.utc) - timedelta(minutes=30)
+        for n, event in enumerate(backend.events):
+            event['Date'] = start + timedelta(seconds=n)
+        scheduler = self.scheduler(backend, budgets={'docdb': 2})
+        scheduler.tick()
+        self.assertEqual(backend.calls['DescribeEvents'], 2)
+        self.assertEqual(scheduler.stats['event_calls'], 2)
+        first = sum(len(events) for _, events in self.delivered)
+        self.assertEqual(first, 200)
+
+        # Com o orçamento recomposto, a listagem retoma sem repetir eventos
+        self.now[0] = 1300.0
+        scheduler.tick()
+        delivered = [(cluster, e['message']) for cluster, events in self.delivered for e in events]
+        self.assertEqual(len(delivered), 250)
+        self.assertEqual(len(set(delivered)), 250)
+        self.assertEqual(backend.calls['DescribeEvents'], 3)
+
+    def test_throttled_metrics_defer_every_due_cluster(self):
+        backend = FakeBackend(clusters=3, events_per_cluster=0)
+        scheduler = self.scheduler(backend)
+        with mock.patch.object(scheduler.manager, 'get_fleet_metrics',
+                               side_effect=exemplos.ThrottlingError('Throttling', 'Throttling')):
+            self.assertEqual(scheduler.tick(), [])
+        self.assertEqual(scheduler.stats['deferred'], 3)
+        self.assertEqual(scheduler.next_due(), 1600.0)
+
+
+# ============================================================================
+# MÉTRICAS EM LOTE (GetMetricData)
+# ============================================================================
+
+class FleetMetricsBatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = FakeBackend(clusters=100)
+        self.clusters = [cluster['DBClusterIdentifier'] for cluster in self.backend.clusters]
+        self.original = benchmark.FakeClient.get_metric_data
+        self.requests = []
+
+    def patch_metric_data(self, change):
+        test = self
+
+        def get_metric_data(client, **params):
+            test.requests.append(params)
+            return change(params, test.original(client, **params))
+
+        return mock.patch.object(benchmark.FakeClient, 'get_metric_data', get_metric_data)
+
+    def test_queries_are_batched_up_to_five_hundred(self):
+        manager = new_manager(self.backend)
+        with self.patch_metric_data(lambda params, response: response):
+            metrics = manager.get_fleet_metrics(self.clusters)
+
+        first_pages = [len(p['MetricDataQueries']) for p in self.requests if not p.get('NextToken')]
+        # 100 clusters x 6 métricas x 2 estatísticas = 1200 consultas por bloco
+        self.assertLessEqual(max(first_pages), exemplos.MAX_METRIC_DATA_QUERIES)
+        self.assertEqual(sum(first_pages) % 1200, 0)
+        self.assertEqual(len(first_pages), 3 * sum(first_pages) // 1200)
+        self.assertTrue(all(metrics[c][m] for c in self.clusters for m in exemplos.DEFAULT_METRICS))
+
+    def test_failed_query_only_clears_its_metric(self):
+        manager = new_manager(self.backend)
+
+        def forbid_read_latency(params, response):
+            names = {q['Id']: q['MetricStat']['Metric']['MetricName'] for q in params['MetricDataQueries']}
+            for result in response['MetricDataResults']:
+                if names[result['Id']] == 'ReadLatency':
+                    result.update(StatusCode='Forbidden', Timestamps=[], Values=[],
+                                  Messages=[{'Code': 'Forbidden', 'Value': 'sem permissão'}])
+            return response
+
+        with self.patch_metric_data(forbid_read_latency):
+            metrics = manager.get_fleet_metrics(self.clusters[:3])
+
+        for cluster in self.clusters[:3]:
+            self.assertIsNone(metrics[cluster]['ReadLatency'])
+            self.assertEqual(metrics[cluster]['CPUUtilization']['datapoints_count'], 12)
+
+    def test_throttled_batch_only_clears_its_clusters(self):
+        manager = new_manager(self.backend, max_attempts=1)
+        throttled = self.clusters[0]
+
+        def throttle_first_cluster(params, response):
+            values = {q['MetricStat']['Metric']['Dimensions'][0]['Value'] for q in params['MetricDataQueries']}
+            if throttled in values:
+                raise client_error('Throttling', 'GetMetricData')
+            return response
+
+        with self.patch_metric_data(throttle_first_cluster):
+            metrics = manager.get_fleet_metrics(self.clusters)
+
+        self.assertIsNone(metrics[throttled]['CPUUtilization'])
+        self.assertIsNotNone(metrics[self.clusters[-1]]['CPUUtilization'])
+
+    def test_all_batches_throttled_raises(self):
+        manager = new_manager(self.backend, max_attempts=1)
+
+        def throttle(params, response):
+            raise client_error('Throttling', 'GetMetricData')
+
+        with self.patch_metric_data(throttle):
+            with self.assertRaises(exemplos.ThrottlingError):
+                manager.get_fleet_metrics(self.clusters[:2])
+
+
+# ============================================================================
+# LATÊNCIA DOS ENDPOINTS (EndpointProber)
+# ============================================================================
+
+class EndpointProberTest(unittest.TestCase):
+
+    def closed_port(self):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            return sock.getsockname()[1]
+
+    def test_probe_ranks_reachable_endpoints_first(self):
+        prober = exemplos.EndpointProber(samples=3, timeout=1, tls=False)
+        with benchmark.local_listener() as (host, port):
+            results = prober.probe([
+                {'identifier': 'fechado', 'endpoint': host, 'port': self.closed_port()},
+                {'identifier': 'sem-endpoint', 'endpoint': 'N/A', 'port': 27017},
+                {'identifier': 'local', 'endpoint': host, 'port': port, 'availability_zone': 'us-east-1a'}
+            ])
+
+        self.assertEqual([r['identifier'] for r in results], ['local', 'fechado'])
+        local, closed = results
+        self.assertEqual((local['ok_samples'], local['errors'], local['tls_ms']), (3, [], None))
+        self.assertGreaterEqual(local['connect_ms'], local['min_ms'])
+        self.assertEqual(closed['ok_samples'], 0)
+        self.assertEqual(len(closed['errors']), 3)
+        self.assertIsNone(closed['connect_ms'])
+        self.assertEqual(list(exemplos.EndpointProber.rank_by_az(results)), ['us-east-1a', 'N/A'])
+
+    def test_connection_string_follows_measured_latency(self):
+        details = {
+            'connectivity': {'endpoint': 'cluster.docdb', 'port': 27017},
+            'members': [{'identifier': 'writer', 'is_writer': True},
+                        {'identifier': 'reader', 'is_writer': False}]
+        }
+        ranking = [
+            {'identifier': 'writer', 'endpoint': 'writer.docdb', 'port': 27017,
+             'availability_zone': 'us-east-1a', 'connect_ms': 1.0},
+            {'identifier': 'reader', 'endpoint': 'reader.docdb', 'port': 27017,
+             'availability_zone': 'us-east-1b', 'connect_ms': 3.0},
+            {'identifier': 'down', 'endpoint': 'down.docdb', 'port': 27017, 'connect_ms': None}
+        ]
+        connection = exemplos.DocumentDBManager._build_latency_aware_connection(details, ranking)
+        self.assertEqual(connection['hosts'], ['writer.docdb:27017', 'reader.docdb:27017'])
+        self.assertIn('@writer.docdb:27017,reader.docdb:27017/', connection['connection_string'])
+        self.assertIn('readPreference=nearest', connection['connection_string'])
+        self.assertIn('@reader.docdb:27017/', connection['nearest_reader'])
+        self.assertEqual(connection['local_az'], 'us-east-1a')
+
+        fallback = exemplos.DocumentDBManager._build_latency_aware_connection(details, ranking[2:])
+        self.assertIn('@cluster.docdb:27017/', fallback['connection_string'])
+        self.assertIsNone(fallback['nearest_reader'])
+
+    def test_manager_probes_the_cluster_instances(self):
+        manager = new_manager(FakeBackend(clusters=1))
+        prober = exemplos.EndpointProber(samples=1, tls=False)
+        with benchmark.local_listener() as (host, port):
+            instances = [dict(i, endpoint=host, port=port) for i in manager.list_instances('cluster-00000')]
+            with mock.patch.object(manager, 'list_instances', return_value=instances):
+                connection = manager.generate_latency_aware_connection_string('cluster-00000', prober=prober)
+
+        self.assertEqual(len(connection['hosts']), 2)
+        self.assertIn('@127.0.0.1:', connection['nearest_reader'])
+        self.assertTrue(all(r['ok_samples'] == 1 for r in connection['ranking']))
+
+
+# ============================================================================
+# CONSULTAS LENTAS (SlowQueryAnalyzer)
+# ============================================================================
+
+def profiler_line(n, millis, collection='loja.pedidos'):
+    return json.dumps({'op': 'query', 'ns': collection, 'millis': millis,
+                       'command': {'find': 'pedidos', 'filter': {'cliente': f'c{n}', 'valor': {'$gt': n}}},
+                       'docsExamined': 100, 'nreturned': 2})
+
+
+class SlowQueryAnalyzerTest(unittest.TestCase):
+
+    def test_literals_collapse_into_one_shape(self):
+        analyzer = exemplos.SlowQueryAnalyzer()
+        self.assertEqual(analyzer.ingest([profiler_line(n, 10 + n) for n in range(50)]), 50)
+        [row] = analyzer.report()
+        self.assertEqual(row['count'], 50)
+        self.assertEqual(row['total_ms'], sum(10 + n for n in range(50)))
+        self.assertEqual(row['max_ms'], 59)
+        self.assertEqual(row['slowest_command']['filter']['cliente'], 'c49')
+        self.assertEqual(row['examined_per_returned'], 50)
+
+    def test_p95_stays_within_histogram_error(self):
+        analyzer = exemplos.SlowQueryAnalyzer()
+        analyzer.ingest([profiler_line(n, n) for n in range(1, 1001)])
+        exact = statistics.quantiles(range(1, 1001), n=20)[-1]
+        p95 = analyzer.report()[0]['p95_ms']
+        self.assertLessEqual(abs(p95 - exact) / exact, 0.1)
+
+    def test_new_shapes_over_the_limit_go_to_the_overflow_bucket(self):
+        analyzer = exemplos.SlowQueryAnalyzer(max_shapes=2)
+        for n in range(5):
+            analyzer.ingest([profiler_line(n, 10, collection=f'loja.c{n}')])
+        analyzer.ingest([profiler_line(0, 10, collection='loja.c0')])
+
+        rows = {(row['collection'], row['shape']): row for row in analyzer.report()}
+        self.assertEqual(len(rows), 3)
+        overflow = rows[('*', '<outros formatos (profiler)>')]
+        self.assertEqual((overflow['count'], overflow['op']), (3, '*'))
+        self.assertEqual(sum(row['count'] for row in rows.values()), 6)
+
+    def test_audit_lines_and_garbage(self):
+        analyzer = exemplos.SlowQueryAnalyzer(min_millis=5)
+        parsed = analyzer.ingest([
+            '2026-01-01T00:00:00Z {"atype": "authenticate", "param": {"user": "app", "db": "admin"}}',
+            'linha sem json',
+            '{"sem": "tipo"}',
+            profiler_line(1, 1)
+        ])
+        self.assertEqual(parsed, 2)
+        self.assertEqual((analyzer.lines, analyzer.skipped), (4, 2))
+        self.assertEqual([row['kind'] for row in analyzer.report()], ['audit'])
+
+    def test_log_group_filter_runs_on_the_server(self):
+        backend = FakeBackend(clusters=1, profiler_lines_per_cluster=500)
+        analyzer = exemplos.SlowQueryAnalyzer(min_millis=400)
+        analyzer.ingest_log_group(new_manager(backend), 'cluster-00000',
+                                  datetime.now(timezone.utc) - timedelta(hours=1))
+        # Só as linhas lentas trafegam: o filtro vai no filterPattern
+        slow = sum(1 for n in range(500) if 5 + (n * 37) % 500 >= 400)
+        self.assertEqual(analyzer.lines, slow)
+        self.assertEqual(sum(row['count'] for row in analyzer.report(top=None)), slow)
+
+
+# ============================================================================
+# PLANEJAMENTO DE CONSULTAS DE MÉTRICAS (MetricQueryPlanner)
+# ============================================================================
+
+class MetricQueryPlannerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.planner = exemplos.MetricQueryPlanner(chunk_points=10)
+        self.calls = []
+
+    def fetch_chunk(self, keys, start_time, end_time, period):
+        self.calls.append((tuple(keys), start_time, end_time))
+        first = int(start_time.timestamp())
+        return {
+            key: [(datetime.fromtimestamp(ts, timezone.utc), float(ts))
+                  for ts in range(first, int(end_time.timestamp()), period)]
+            for key in keys
+        }
+
+    def test_period_follows_retention(self):
+        now = datetime(2026, 6, 1, tzinfo=timezone.utc)
+        for days, period in ((2, 60), (30, 300), (90, 3600)):
+            self.assertEqual(self.planner.choose_period(now - timedelta(days=days), now, now=now), period)
+
+    def test_chunks_use_a_fixed_grid(self):
+        start = datetime(2026, 1, 1, 0, 7, tzinfo=timezone.utc)
+        chunks = self.planner.chunks(start, start + timedelta(hours=2), 300)
+        self.assertEqual(chunks[0][0] % 300, 0)
+        self.assertTrue(all(end % 3000 == 0 for _, end in chunks[:-1]))
+        self.assertEqual([b for _, b in chunks[:-1]], [a for a, _ in chunks[1:]])
+        later = self.planner.chunks(start + timedelta(minutes=50), start + timedelta(hours=2), 300)
+        self.assertEqual(later[1:], chunks[-len(later) + 1:])
+
+    def test_stitched_series_are_sorted_unique_and_inside_the_window(self):
+        start = datetime(2026, 1, 1, 0, 7, tzinfo=timezone.utc)
+        end = start + timedelta(hours=5, minutes=3)
+        keys = [('c1', 'CPUUtilization', 'Average'), ('c2', 'CPUUtilization', 'Average')]
+        results = self.planner.fetch(self.fetch_chunk, keys, start, end, 300)
+        self.assertGreater(len(self.calls), 1)
+        for key in keys:
+            timestamps = [ts for ts, _ in results[key]]
+            self.assertEqual(timestamps, sorted(set(timestamps)))
+            self.assertTrue(all(start <= ts < end for ts in timestamps))
+            self.assertEqual(len(timestamps), 60)
+        self.assertEqual(self.planner.stats['requests'], 1)
+
+    def test_failed_chunk_is_returned_per_key(self):
+        def fetch_chunk(keys, start_time, end_time, period):
+            raise exemplos.TransientError('GetMetricData: ServiceUnavailable', 'ServiceUnavailable')
+
+        start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        results = self.planner.fetch(fetch_chunk, [('c1', 'm', 'Average')], start,
+                                     start + timedelta(hours=1), 300)
+        self.assertIsInstance(results[('c1', 'm', 'Average')], exemplos.TransientError)
+
+    def test_concurrent_requests_share_inflight_chunks(self):
+        release = threading.Event()
+        started = threading.Event()
+
+        def slow_fetch(keys, start_time, end_time, period):
+            started.set()
+            release.wait(5)
+            return self.fetch_chunk(keys, start_time, end_time, period)
+
+        planner = exemplos.MetricQueryPlanner()
+        start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        keys = [('c1', 'm', 'Average')]
+        results = []
+        first = threading.Thread(target=lambda: results.append(
+            planner.fetch(slow_fetch, keys, start, start + timedelta(hours=1), 300)))
+        first.start()
+        started.wait(5)
+        second = threading.Thread(target=lambda: results.append(
+            planner.fetch(slow_fetch, keys, start, start + timedelta(hours=1), 300)))
+        second.start()
+        while planner.stats['shared'] == 0 and second.is_alive():
+            time.sleep(0.001)
+        release.set()
+        first.join()
+        second.join()
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(planner.stats['shared'], 1)
+        self.assertEqual(results[0], results[1])
+
+
+class ClusterMetricsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = FakeBackend(clusters=3)
+        self.manager = new_manager(self.backend)
+
+    def test_default_output_keeps_five_minute_period_and_keys(self):
+        metrics = self.manager.get_cluster_metrics('cluster-00001')
+        self.assertEqual(sorted(metrics), sorted(exemplos.DEFAULT_METRICS))
+        cpu = metrics['CPUUtilization']
+        self.assertEqual(set(cpu), {'latest_average', 'latest_maximum', 'datapoints_count', 'period_hours'})
+        self.assertEqual(cpu['datapoints_count'], 12)
+        self.assertEqual(cpu['period_hours'], 1)
+
+    def test_automatic_period_is_opt_in(self):
+        metrics = self.manager.get_fleet_metrics(['cluster-00001'], 1, ['CPUUtilization'], period='auto')
+        self.assertEqual(metrics['cluster-00001']['CPUUtilization']['period_seconds'], 60)
+        self.assertEqual(metrics['cluster-00001']['CPUUtilization']['datapoints_count'], 60)
+
+
+# ============================================================================
+# ROLLUPS E COBERTURA DO METRICSTORE
+# ============================================================================
+
+class MetricStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        self.store = exemplos.MetricStore(os.path.join(self.root, 'store'))
+        self.start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    def points(self, count, offset=0):
+        return [(self.start + timedelta(minutes=5 * (offset + n)), float(offset + n))
+                for n in range(count)]
+
+    def test_incremental_rollups_match_full_rollup(self):
+        points = self.points(3 * 288)
+        self.store.append('c1', 'CPUUtilization', 'Average', points[:100])
+        self.store.append('c1', 'CPUUtilization', 'Average', points[100:])
+        full = exemplos.MetricStore(os.path.join(self.root, 'full'))
+        full.append('c1', 'CPUUtilization', 'Average', points)
+
+        end = self.start + timedelta(days=3)
+        for resolution in ('5m', '1h', '1d'):
+            self.assertEqual(
+                self.store.query('c1', 'CPUUtilization', 'Average', self.start, end, resolution),
+                full.query('c1', 'CPUUtilization', 'Average', self.start, end, resolution),
+                resolution
+            )
+        daily = self.store.query('c1', 'CPUUtilization', 'Average', self.start, end, '1d')
+        self.assertEqual(daily[0][1], sum(range(288)) / 288)
+        hourly = self.store.query('c1', 'CPUUtilization', 'Average', self.start, end, '1h')
+        self.assertEqual(len(hourly), 72)
+
+    def test_backfilled_gap_rewrites_rollup(self):
+        points = self.points(24)
+        self.store.append('c1', 'CPUUtilization', 'Maximum', points[:6] + points[12:])
+        self.store.append('c1', 'CPUUtilization', 'Maximum', [(points[8][0], 1000.0)])
+
+        end = self.start + timedelta(hours=2)
+        base = self.store.query('c1', 'CPUUtilization', 'Maximum', self.start, end)
+        self.assertEqual([ts for ts, _ in base], sorted(ts for ts, _ in base))
+        self.assertEqual(len(base), 19)
+        hourly = self.store.query('c1', 'CPUUtilization', 'Maximum', self.start, end, '1h')
+        self.assertEqual(hourly[0][1], 1000.0)
+
+    def test_fetch_only_requests_missing_ranges(self):
+        requested = []
+
+        def fetch_series(clusters, metrics, start_time, end_time, period, statistics):
+            requested.append((tuple(clusters), start_time, end_time))
+            steps = int((end_time - start_time).total_seconds() // period)
+            points = [(start_time + timedelta(seconds=period * n), 1.0) for n in range(steps)]
+            return {c: {m: {s: points for s in statistics} for m in metrics} for c in clusters}
+
+        end = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) - timedelta(days=1)
+        start = end - timedelta(hours=6)
+        result = self.store.fetch(fetch_series, ['c1', 'c2'], ['CPUUtilization'], start, end)
+        self.assertEqual(requested, [(('c1', 'c2'), start, end)])
+        self.assertEqual(len(result['c1']['CPUUtilization']['Average']), 72)
+
+        self.store.fetch(fetch_series, ['c1', 'c2'], ['CPUUtilization'], start, end)
+        self.assertEqual(len(requested), 1)
+
+        self.store.fetch(fetch_series, ['c1'], ['CPUUtilization'], start - timedelta(hours=2), end)
+        self.assertEqual(requested[1], (('c1',), start - timedelta(hours=2), start))
+        self.assertEqual(self.store.missing_ranges('c1', 'CPUUtilization', 'Average',
+                                                   start.timestamp() - 7200, end.timestamp()), [])
+        self.assertEqual(self.store.missing_ranges('c2', 'CPUUtilization', 'Average',
+                                                   start.timestamp() - 7200, end.timestamp()),
+                         [(start.timestamp() - 7200, start.timestamp())])
+
+    def test_recent_data_is_not_marked_as_covered(self):
+        def fetch_series(clusters, metrics, start_time, end_time, period, statistics):
+            return {c: {m: {s: [] for s in statistics} for m in metrics} for c in clusters}
+
+        end = datetime.now(timezone.utc)
+        start = end - timedelta(hours=1)
+        self.store.fetch(fetch_series, ['c1'], ['CPUUtilization'], start, end)
+        missing = self.store.missing_ranges('c1', 'CPUUtilization', 'Average',
+                                            start.timestamp(), end.timestamp())
+        self.assertTrue(missing)
+        self.assertGreaterEqual(missing[-1][1] - missing[0][0], self.store.settle_seconds)
+
+    def test_coverage_is_kept_per_statistic(self):
+        requested = []
+
+        def fetch_series(clusters, metrics, start_time, end_time, period, statistics):
+            requested.append(statistics)
+            points = [(start_time, 1.0)]
+            return {c: {m: {s: points for s in statistics} for m in metrics} for c in clusters}
+
+        end = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) - timedelta(days=1)
+        start = end - timedelta(hours=1)
+        self.store.fetch(fetch_series, ['c1'], ['CPUUtilization'], start, end)
+        result = self.store.fetch(fetch_series, ['c1'], ['CPUUtilization'], start, end,
+                                  statistics=('Average', 'Maximum'))
+        self.assertEqual(requested, [('Average',), ('Maximum',)])
+        self.assertEqual(result['c1']['CPUUtilization']['Maximum'], [(start, 1.0)])
+
+    def test_only_base_period_is_stored(self):
+        end = datetime.now(timezone.utc) - timedelta(days=1)
+        with self.assertRaises(ValueError):
+            self.store.fetch(mock.Mock(), ['c1'], ['CPUUtilization'], end - timedelta(hours=1), end, period=60)
+
+        manager = new_manager(FakeBackend(clusters=1))
+        manager.metric_store = self.store
+        metrics = manager.get_fleet_metrics(['cluster-00000'], 1, ['CPUUtilization'], period=60)
+        self.assertEqual(metrics['cluster-00000']['CPUUtilization']['datapoints_count'], 60)
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'store', 'cluster-00000')))
+
+
+# ============================================================================
+# CATÁLOGO DE SNAPSHOTS (SnapshotCatalog)
+# ============================================================================
+
+class SnapshotCatalogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = FakeBackend(clusters=3, snapshots_per_cluster=3)
+        self.now = time.time()
+        self.catalog = exemplos.SnapshotCatalog(new_manager(self.backend), clock=lambda: self.now)
+        self.addCleanup(self.catalog.close)
+        self.assertEqual(self.catalog.refresh()['mode'], 'full')
+        self.backend.reset_counters()
+
+    def snapshot_event(self, identifier):
+        self.backend.events.append({
+            'SourceIdentifier': identifier,
+            'SourceType': 'db-cluster-snapshot',
+            'Message': 'Snapshot alterado',
+            'EventCategories': ['backup'],
+            'Date': datetime.now(timezone.utc)
+        })
+
+    def test_queries_use_the_local_index(self):
+        self.assertEqual(len(self.catalog), 9)
+        self.assertEqual([s.identifier for s in self.catalog.older_than(1.5, min_storage_gb=12)],
+                         ['cluster-00000-snap-2', 'cluster-00001-snap-2', 'cluster-00002-snap-2'])
+        latest = self.catalog.latest_per_cluster()
+        self.assertEqual(latest['cluster-00001'].identifier, 'cluster-00001-snap-0')
+        self.assertEqual(self.catalog.storage_totals('snapshot_type'),
+                         {'automated': {'snapshots': 6, 'allocated_storage_gb': 69},
+                          'manual': {'snapshots': 3, 'allocated_storage_gb': 30}})
+        self.assertEqual(self.backend.calls, {})
+
+    def test_incremental_refresh_describes_only_snapshots_in_events(self):
+        new = dict(self.backend.snapshots[0], DBClusterSnapshotIdentifier='cluster-00000-snap-novo')
+        self.backend.snapshots.append(new)
+        removed = self.backend.snapshots.pop(1)['DBClusterSnapshotIdentifier']
+        self.snapshot_event('cluster-00000-snap-novo')
+        self.snapshot_event(removed)
+
+        self.assertEqual(self.catalog.refresh(), {'mode': 'incremental', 'upserted': 1, 'deleted': 1})
+        self.assertEqual(self.backend.calls, {'DescribeEvents': 1, 'DescribeDBClusterSnapshots': 2})
+        self.assertEqual(len(self.catalog.snapshots('cluster-00000')), 3)
+
+    def test_cluster_reconcile_keeps_other_clusters(self):
+        del self.backend.snapshots[3]
+        result = self.catalog.refresh(cluster_identifier='cluster-00001')
+        self.assertEqual(result, {'mode': 'cluster', 'upserted': 2, 'deleted': 1})
+        self.assertEqual(len(self.catalog), 8)
+
+        # A reconciliação completa seguinte usa uma geração nova e não apaga nada a mais
+        result = self.catalog.refresh(full=True)
+        self.assertEqual((result['upserted'], result['deleted']), (8, 0))
+        self.assertEqual(len(self.catalog), 8)
+
+    def test_full_reconcile_removes_snapshots_without_events(self):
+        del self.backend.snapshots[0]
+        self.assertEqual(self.catalog.refresh()['deleted'], 0)
+        self.now += exemplos.SNAPSHOT_FULL_REFRESH_SECONDS + 1
+        self.assertEqual(self.catalog.refresh(), {'mode': 'full', 'upserted': 8, 'deleted': 1})
+
+    def test_many_events_fall_back_to_full_listing(self):
+        catalog = exemplos.SnapshotCatalog(new_manager(self.backend), max_incremental=2)
+        self.addCleanup(catalog.close)
+        catalog.refresh()
+        for snapshot in self.backend.snapshots[:3]:
+            self.snapshot_event(snapshot['DBClusterSnapshotIdentifier'])
+        self.assertEqual(catalog.refresh()['mode'], 'full')
+
+
+# ============================================================================
+# AUDITORIA DE PARAMETER GROUPS (ParameterGroupAuditor)
+# ============================================================================
+
+class ParameterGroupAuditorTest(unittest.TestCase):
+
+    def setUp(self):
+        # pg-0 e pg-3 têm o mesmo conteúdo, assim como pg-1 e pg-4
+        self.backend = FakeBackend(clusters=6, parameter_groups=5)
+        self.now = 1000.0
+        self.auditor = exemplos.ParameterGroupAuditor(
+            new_manager(self.backend), parameter_names=['param_0', 'param_1'],
+            ttl=300, clock=lambda: self.now)
+
+    def test_each_group_is_fetched_once_and_identical_groups_share_content(self):
+        self.assertEqual(self.auditor.refresh(), {'clusters': 6, 'groups': 5, 'fetched': 5, 'failed': []})
+        self.assertEqual(self.backend.calls['DescribeDBClusterParameters'], 5)
+        self.assertEqual(len(self.auditor.parameters), 3)
+        self.assertIs(self.auditor.cluster_parameters('cluster-00000'),
+                      self.auditor.cluster_parameters('cluster-00003'))
+
+        self.backend.reset_counters()
+        self.now += 299
+        self.assertEqual(self.auditor.refresh()['fetched'], 0)
+        self.assertNotIn('DescribeDBClusterParameters', self.backend.calls)
+        self.now += 2
+        self.assertEqual(self.auditor.refresh()['fetched'], 5)
+
+    def test_drift_against_majority_and_explicit_baselines(self):
+        self.auditor.refresh()
+        matrix = self.auditor.drift_matrix()
+        self.assertEqual(matrix['baseline'], {'param_0': 'disabled', 'param_1': 'enabled'})
+        self.assertEqual(matrix['in_sync'], ['cluster-00000', 'cluster-00003', 'cluster-00005'])
+        self.assertEqual(matrix['drift']['cluster-00002'],
+                         {'param_0': {'expected': 'disabled', 'actual': 'enabled'},
+                          'param_1': {'expected': 'enabled', 'actual': 'disabled'}})
+
+        matrix = self.auditor.drift_matrix(baseline='cluster-00001')
+        self.assertEqual(matrix['in_sync'], ['cluster-00001', 'cluster-00004'])
+        matrix = self.auditor.drift_matrix(baseline={'param_0': 'enabled', 'param_1': 'enabled'})
+        self.assertEqual(sorted(matrix['drift']['cluster-00000']), ['param_0'])
+        with self.assertRaises(ValueError):
+            self.auditor.drift_matrix(baseline='pg-inexistente')
+
+    def test_failed_group_leaves_its_clusters_unknown(self):
+        fetch = self.auditor._fetch_group
+
+        def fetch_group(group):
+            if group == 'pg-2':
+                raise exemplos.DocumentDBError('falhou', 'InternalFailure')
+            return fetch(group)
+
+        with mock.patch.object(self.auditor, '_fetch_group', side_effect=fetch_group):
+            self.assertEqual(self.auditor.refresh()['failed'], ['pg-2'])
+        self.assertIsNone(self.auditor.cluster_parameters('cluster-00002'))
+        self.assertEqual(self.auditor.drift_matrix()['unknown'], ['cluster-00002'])
+
+
+# ============================================================================
+# RELATÓRIO DA FROTA (FleetReportExporter)
+# ============================================================================
+
+try:
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+class FleetReportExporterTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.backend = FakeBackend(clusters=30)
+        self.exporter = exemplos.FleetReportExporter(new_manager(self.backend), batch_size=7,
+                                                     ordered=True)
+        self.ids = [c['DBClusterIdentifier'] for c in self.backend.clusters]
+
+    def test_ndjson_has_one_line_per_cluster_in_listing_order(self):
+        output = io.StringIO()
+        self.assertEqual(self.exporter.write_ndjson(output), 30)
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([line['cluster'] for line in lines], self.ids)
+        self.assertTrue(all(line['error'] is None and len(line['instances']) == 2 for line in lines))
+        self.assertEqual(self.backend.calls['DescribeDBClusters'], 1)
+
+    def test_unknown_clusters_are_reported_not_dropped(self):
+        summaries = list(self.exporter.iter_summaries(['cluster-00003', 'inexistente']))
+        self.assertEqual([s['error'] for s in summaries], [None, 'not_found'])
+
+    def test_csv_requires_explicit_format_and_fixes_extension(self):
+        path = os.path.join(self.directory, 'frota.parquet')
+        self.assertEqual(self.exporter.write_columnar(path, format='csv'), 30)
+        self.assertFalse(os.path.exists(path))
+        with open(os.path.join(self.directory, 'frota.csv'), encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([row['cluster'] for row in rows], self.ids)
+        self.assertEqual(rows[0]['instance_count'], '2')
+
+    @unittest.skipIf(pyarrow is not None, 'pyarrow instalado')
+    def test_parquet_without_pyarrow_fails_clearly(self):
+        path = os.path.join(self.directory, 'frota.parquet')
+        with self.assertRaisesRegex(ImportError, 'pyarrow'):
+            self.exporter.write_columnar(path)
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(self.backend.total_calls, 0)
+
+    @unittest.skipIf(pyarrow is None, 'requer pyarrow')
+    def test_parquet_round_trip(self):
+        path = os.path.join(self.directory, 'frota.parquet')
+        self.assertEqual(self.exporter.write_columnar(path, row_group_size=8), 30)
+        parquet_file = pyarrow.parquet.ParquetFile(path)
+        self.assertEqual(parquet_file.metadata.num_row_groups, 4)
+        table = parquet_file.read()
+        self.assertEqual(table.column('cluster').to_pylist(), self.ids)
+        self.assertEqual(set(table.column('instance_count').to_pylist()), {2})
+        self.assertEqual(table.column_names[:len(self.exporter.COLUMNS)], list(self.exporter.COLUMNS))
+
+
+# ============================================================================
+# ANÁLISE VETORIZADA (MetricAnalytics)
+# ============================================================================
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def reference_percentile(values, percent):
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * percent / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+@unittest.skipIf(numpy is None, 'MetricAnalytics requer NumPy')
+class MetricAnalyticsTest(unittest.TestCase):
+
+    def setUp(self):
+        # Séries de tamanhos diferentes (lacunas no fim) e uma de grande magnitude
+        self.columns = [
+            ([300.0 * n for n in range(12)], [float((n * 7) % 11) for n in range(12)]),
+            ([300.0 * n for n in range(9)], [50.0 + n for n in range(8)] + [400.0]),
+            ([300.0 * n for n in range(10)], [1e12 + (n % 3) for n in range(10)])
+        ]
+        self.keys = [('c1', 'CPUUtilization'), ('c2', 'CPUUtilization'), ('c3', 'VolumeBytesUsed')]
+        self.analytics = exemplos.MetricAnalytics.from_columns(self.keys, self.columns)
+
+    def test_percentiles_match_reference(self):
+        result = self.analytics.percentiles((50, 95, 99))
+        for row, (_, values) in enumerate(self.columns):
+            for column, percent in enumerate((50, 95, 99)):
+                self.assertAlmostEqual(result[row, column], reference_percentile(values, percent),
+                                       places=6)
+
+    def test_zscores_match_reference_for_large_magnitudes(self):
+        zscores = self.analytics.zscores()
+        for row, (_, values) in enumerate(self.columns):
+            mean = statistics.fmean(values)
+            std = statistics.pstdev(values)
+            for column, value in enumerate(values):
+                self.assertAlmostEqual(zscores[row, column], (value - mean) / std, places=6)
+            self.assertTrue(numpy.isnan(zscores[row, len(values):]).all())
+
+    def test_rolling_mean_and_latest_rate(self):
+        rolling = self.analytics.latest_rolling_mean(window=3)
+        rates = self.analytics.latest_rate()
+        for row, (timestamps, values) in enumerate(self.columns):
+            self.assertAlmostEqual(rolling[row], statistics.fmean(values[-3:]), places=6)
+            self.assertAlmostEqual(rates[row], (values[-1] - values[-2]) / (timestamps[-1] - timestamps[-2]))
+
+    def test_spike_is_flagged_and_ranked(self):
+        summary = self.analytics.summary(threshold=2.5)
+        self.assertEqual(list(summary['anomaly_count']), [0, 1, 0])
+        self.assertTrue(summary['latest_anomaly'][1])
+        ranking = self.analytics.rank('CPUUtilization', by='p99', summary=summary)
+        self.assertEqual([item['cluster'] for item in ranking], ['c2', 'c1'])
+
+
+# ============================================================================
+# VALIDADE DO INVENTORYCACHE
+# ============================================================================
+
+class InventoryCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'inventory.json')
+        self.backend = FakeBackend(clusters=5)
+        self.manager = new_manager(self.backend)
+        self.now = 1000.0
+
+    def cache(self, background=False):
+        return exemplos.InventoryCache(self.manager, self.path, max_ages={'clusters': 300},
+                                       background=background, clock=lambda: self.now)
+
+    def add_cluster(self):
+        cluster = dict(self.backend.clusters[0], DBClusterIdentifier='cluster-novo')
+        self.backend.clusters.append(cluster)
+
+    def test_fresh_entries_are_served_without_calls(self):
+        cache = self.cache()
+        self.assertEqual(len(cache.get('clusters')), 5)
+        self.now += 299
+        self.assertEqual(len(cache.get('clusters')), 5)
+        self.assertEqual(len(self.cache().get('clusters')), 5)
+        self.assertEqual(self.backend.calls, {'DescribeDBClusters': 1})
+
+    def test_stale_entries_are_refreshed_before_answering(self):
+        cache = self.cache()
+        cache.get('clusters')
+        self.add_cluster()
+        self.now += 301
+        self.assertEqual(len(cache.get('clusters')), 6)
+        self.assertEqual(cache.age('clusters'), 0)
+        self.assertEqual(self.backend.calls, {'DescribeDBClusters': 2})
+
+    def test_stale_entries_are_revalidated_in_background(self):
+        cache = self.cache(background=True)
+        cache.get('clusters')
+        self.add_cluster()
+        self.now += 301
+        self.assertEqual(len(cache.get('clusters')), 5)
+        cache.wait(timeout=5)
+        self.assertEqual(len(cache.get('clusters')), 6)
+        self.assertEqual(len(self.cache().get('clusters')), 6)
+        self.assertEqual(self.backend.calls, {'DescribeDBClusters': 2})
+
+    def test_force_bypasses_fresh_entries(self):
+        cache = self.cache()
+        cache.get('clusters')
+        self.add_cluster()
+        self.assertEqual(len(cache.get('clusters', force=True)), 6)
+        self.assertEqual(self.backend.calls, {'DescribeDBClusters': 2})
+
+    def test_unknown_resource_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.cache().get('volumes')
+
+    def test_warm_start_summary_makes_no_describe_calls(self):
+        def run_main():
+            with mock.patch.object(exemplos, 'DocumentDBManager', return_value=self.manager), \
+                    mock.patch.object(exemplos, 'configure_logging'), \
+                    mock.patch('sys.stdout', new_callable=io.StringIO) as stdout:
+                exemplos.main(['--cache-path', self.path])
+            return stdout.getvalue()
+
+        run_main()
+        self.backend.reset_counters()
+        output = run_main()
+        self.assertIn('RESUMO DO CLUSTER: cluster-00000', output)
+        self.assertIn('cluster-00000-1', output)
+        self.assertIn('mongodb://docdbadmin:PASSWORD@', output)
+        self.assertEqual(self.backend.calls, {'GetMetricData': 1})
+
+
+
+# ============================================================================
+# MANAGER ASSÍNCRONO (AsyncDocumentDBManager)
+# ============================================================================
+
+class AsyncDocumentDBManagerTest(unittest.TestCase):
+
+    def test_results_match_the_sync_manager(self):
+        backend = FakeBackend(clusters=5)
+        sync = new_manager(backend)
+        expected = (sync.list_clusters(), sync.get_cluster_details('cluster-00002'),
+                    sync.list_instances('cluster-00002'))
+
+        async def collect():
+            async with exemplos.AsyncDocumentDBManager(manager=new_manager(backend)) as manager:
+                return await asyncio.gather(manager.list_clusters(),
+                                            manager.get_cluster_details('cluster-00002'),
+                                            manager.list_instances('cluster-00002'))
+
+        self.assertEqual(tuple(asyncio.run(collect())), expected)
+
+    def test_summary_matches_the_sync_manager(self):
+        backend = FakeBackend(clusters=3)
+        expected = io.StringIO()
+        with contextlib.redirect_stdout(expected):
+            new_manager(backend).print_cluster_summary('cluster-00001')
+        sync_calls = dict(backend.calls)
+        backend.reset_counters()
+
+        async def summary():
+            async with exemplos.AsyncDocumentDBManager(manager=new_manager(backend)) as manager:
+                await manager.print_cluster_summary('cluster-00001')
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            asyncio.run(summary())
+        self.assertEqual(output.getvalue(), expected.getvalue())
+        # A string de conexão reaproveita os detalhes já em cache
+        self.assertEqual(backend.calls, sync_calls)
+
+    def test_concurrency_is_limited(self):
+        manager = new_manager(FakeBackend(clusters=10))
+        lock = threading.Lock()
+        active = [0, 0]
+
+        def slow_details(cluster_identifier):
+            with lock:
+                active[0] += 1
+                active[1] = max(active[1], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            return {'identifier': cluster_identifier}
+
+        manager.get_cluster_details = slow_details
+
+        async def fan_out():
+            async with exemplos.AsyncDocumentDBManager(manager=manager, max_concurrency=3) as async_manager:
+                return await asyncio.gather(*(async_manager.get_cluster_details(f'cluster-{c:05d}')
+                                              for c in range(10)))
+
+        results = asyncio.run(fan_out())
+        self.assertEqual([r['identifier'] for r in results], [f'cluster-{c:05d}' for c in range(10)])
+        self.assertEqual(active[1], 3)
+
+
+# ============================================================================
+# INVENTÁRIO MULTI-REGIÃO (DocumentDBFleetManager)
+# ============================================================================
+
+class FleetManagerTest(unittest.TestCase):
+
+    def fleet(self, backends, **options):
+        fleet = exemplos.DocumentDBFleetManager(list(backends), **options)
+        for region, backend in backends.items():
+            fleet._managers[(None, region)] = new_manager(backend)
+        return fleet
+
+    def test_failed_region_does_not_drop_the_others(self):
+        fleet = self.fleet({'us-east-1': FakeBackend(clusters=3), 'sa-east-1': FakeBackend(clusters=2)})
+        denied = exemplos.AccessDeniedError('sem permissão', 'AccessDenied')
+        with mock.patch.object(fleet.get_manager('sa-east-1'), 'iter_instances', side_effect=denied):
+            inventory = fleet.collect_inventory()
+
+        self.assertEqual(len(inventory['clusters']), 5)
+        self.assertEqual({i['region'] for i in inventory['instances']}, {'us-east-1'})
+        self.assertEqual(len(inventory['snapshots']), 15)
+        stats = inventory['stats']['default']
+        self.assertEqual(list(stats['sa-east-1']['errors']), ['instances'])
+        self.assertEqual(stats['sa-east-1']['items'], {'clusters': 2, 'snapshots': 6})
+        self.assertEqual(stats['us-east-1']['errors'], {})
+
+    def test_slow_region_does_not_hold_threads_of_other_regions(self):
+        fleet = self.fleet({'slow-1': FakeBackend(clusters=1), 'fast-1': FakeBackend(clusters=1)},
+                           max_workers=2, max_per_region=1)
+        fast_done = threading.Event()
+        waits = []
+
+        def slow(page_size=None):
+            waits.append(fast_done.wait(5))
+            return iter([])
+
+        fast = fleet.get_manager('fast-1')
+        fast_snapshots = fast.iter_snapshots
+
+        def last_fast(page_size=None):
+            yield from fast_snapshots(page_size=page_size)
+            fast_done.set()
+
+        slow_manager = fleet.get_manager('slow-1')
+        with mock.patch.object(slow_manager, 'iter_clusters', side_effect=slow), \
+                mock.patch.object(slow_manager, 'iter_instances', side_effect=slow), \
+                mock.patch.object(slow_manager, 'iter_snapshots', side_effect=slow), \
+                mock.patch.object(fast, 'iter_snapshots', side_effect=last_fast):
+            inventory = fleet.collect_inventory()
+
+        # A região lenta só esperou o que dependia dela: a rápida terminou antes
+        self.assertEqual(waits[0], True)
+        self.assertEqual(inventory['stats']['default']['fast-1']['items'],
+                         {'clusters': 1, 'instances': 2, 'snapshots': 3})
+
+if __name__ == "__main__":
+    unittest.main()